@@ -23,6 +23,8 @@ __license__ = "MIT"
 __all__ = [
     "AttributeResemblesVariableWarning",
     "BeautifulSoup",
+    "IncrementalParser",
+    "iterparse",
     "Comment",
     "Declaration",
     "ProcessingInstruction",
@@ -33,6 +35,7 @@ __all__ = [
     "Tag",
     "TemplateString",
     "ElementFilter",
+    "ElementFilterUnion",
     "SoupReplacer",
     "UnicodeDammit",
     "CData",
@@ -63,6 +66,7 @@ if sys.version_info.major < 3:
 from .builder import (
     builder_registry,
     TreeBuilder,
+    TreeBuilderPool,
 )
 from .builder._htmlparser import HTMLParserTreeBuilder
 from .dammit import UnicodeDammit
@@ -85,18 +89,27 @@ from .element import (
     Stylesheet,
     Tag,
     TemplateString,
+    _builder_tag_descriptor,
+    _tree_changed,
 )
 from .formatter import Formatter
-from .filter import ElementFilter, SoupStrainer, SoupReplacer
+from ._serialization import SerializedTree, serialize
+from .filter import ElementFilter, ElementFilterUnion, SoupStrainer, SoupReplacer
 from typing import (
     Any,
     cast,
     Counter as CounterType,
     Dict,
+    FrozenSet,
+    Hashable,
+    IO,
+    Iterable,
     Iterator,
     List,
     Sequence,
     Optional,
+    Set,
+    Tuple,
     Type,
     Union,
 )
@@ -106,6 +119,7 @@ from bs4._typing import (
     _Encodings,
     _IncomingMarkup,
     _InsertableElement,
+    _ParseOnly,
     _RawAttributeValue,
     _RawAttributeValues,
     _RawMarkup,
@@ -125,6 +139,9 @@ from bs4._warnings import (
     XMLParsedAsHTMLWarning,
 )
 
+#: The tree builders used by `BeautifulSoup.fragment`.
+_fragment_builders: TreeBuilderPool = TreeBuilderPool()
+
 
 class BeautifulSoup(Tag):
     """A data structure representing a parsed HTML or XML document.
@@ -170,12 +187,44 @@ class BeautifulSoup(Tag):
     #: during parsing to detect data chunks that seem 'empty'.
     ASCII_SPACES: str = "\x20\x0a\x09\x0c\x0d"
 
+    #: Keyword arguments to the `BeautifulSoup` constructor that
+    #: `BeautifulSoup.fragment` doesn't accept, since they're about
+    #: decoding bytestrings or left over from Beautiful Soup 3.
+    #:
+    #: :meta private:
+    _NOT_FOR_FRAGMENTS: Tuple[str, ...] = (
+        "from_encoding",
+        "exclude_encodings",
+        "fromEncoding",
+        "parseOnlyThese",
+        "convertEntities",
+        "markupMassage",
+        "smartQuotesTo",
+        "selfClosingTags",
+        "isHTML",
+    )
+
     # FUTURE PYTHON:
     element_classes: Dict[Type[PageElement], Type[PageElement]]  #: :meta private:
     builder: TreeBuilder  #: :meta private:
     is_xml: bool
     known_xml: Optional[bool]
-    parse_only: Optional[SoupStrainer]  #: :meta private:
+    parse_only: Optional[ElementFilter]  #: :meta private:
+
+    #: If ``parse_only`` was given a number of filters, this maps the
+    #: label of each filter to a `ResultSet` of the top-level elements
+    #: it allowed to be parsed, in document order. Otherwise this is
+    #: None.
+    parse_only_results: Optional[Dict[Hashable, ResultSet[PageElement]]]
+
+    #: The names of tags that are left out of the tree, along with
+    #: everything inside them.
+    drop_tags: FrozenSet[str]
+
+    #: If this is False, strings that contain nothing but whitespace
+    #: are left out of the tree, unless they're inside a tag like
+    #: <pre> where whitespace matters.
+    keep_whitespace_nodes: bool
 
     # These members are only used while parsing markup.
     markup: Optional[_RawMarkup]  #: :meta private:
@@ -186,6 +235,11 @@ class BeautifulSoup(Tag):
     preserve_whitespace_tag_stack: List[Tag]  #: :meta private:
     string_container_stack: List[Tag]  #: :meta private:
     _most_recent_element: Optional[PageElement]  #: :meta private:
+    _drop_stack: List[str]  #: :meta private:
+
+    # These members are only used by iterparse().
+    _iterparse_names: Optional[Set[str]] = None  #: :meta private:
+    _iterparse_completed: List[Tag]  #: :meta private:
 
     #: Beautiful Soup's best guess as to the character encoding of the
     #: original document.
@@ -207,11 +261,13 @@ class BeautifulSoup(Tag):
         markup: _IncomingMarkup = "",
         features: Optional[Union[str, Sequence[str]]] = None,
         builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
-        parse_only: Optional[SoupStrainer] = None,
+        parse_only: Optional[_ParseOnly] = None,
         from_encoding: Optional[_Encoding] = None,
         exclude_encodings: Optional[_Encodings] = None,
         element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
         replacer=None,
+        drop_tags: Optional[Iterable[str]] = None,
+        keep_whitespace_nodes: bool = True,
         **kwargs: Any,
     ):
         """Constructor.
@@ -235,7 +291,10 @@ class BeautifulSoup(Tag):
         :param parse_only: A SoupStrainer. Only parts of the document
          matching the SoupStrainer will be considered. This is useful
          when parsing part of a document that would otherwise be too
-         large to fit into memory.
+         large to fit into memory. To keep several different parts of
+         the document, pass in a dictionary of labelled
+         `ElementFilter` objects, or a list of them; see
+         `BeautifulSoup.parse_only_results`.
 
         :param from_encoding: A string indicating the encoding of the
          document to be parsed. Pass this in if Beautiful Soup is
@@ -252,6 +311,19 @@ class BeautifulSoup(Tag):
          built. This is useful for subclassing Tag or NavigableString
          to modify default behavior.
 
+        :param drop_tags: The names of tags, such as "script" and
+         "style", to leave out of the tree. Nothing inside these tags
+         is parsed into the tree either, which saves the time and
+         memory it would take to build objects that would just be
+         thrown away.
+
+        :param keep_whitespace_nodes: If this is False, strings that
+         contain nothing but whitespace, such as the indentation in
+         a pretty-printed document, are left out of the tree. This
+         makes the tree smaller, and faster to build, but the
+         document won't be output the same way it came in.
+         Whitespace is kept inside tags like <pre> where it matters.
+
         :param kwargs: For backwards compatibility purposes, the
          constructor accepts certain keyword arguments used in
          Beautiful Soup 3. None of these arguments do anything in
@@ -319,6 +391,7 @@ class BeautifulSoup(Tag):
 
         parse_only = parse_only or deprecated_argument("parseOnlyThese", "parse_only")
         if parse_only is not None:
+            parse_only = ElementFilterUnion.from_parse_only(parse_only)
             # Issue a warning if we can tell in advance that
             # parse_only will exclude the entire tree.
             if parse_only.excludes_everything:
@@ -338,8 +411,6 @@ class BeautifulSoup(Tag):
             )
             from_encoding = None
 
-        self.element_classes = element_classes or dict()
-
         # We need this information to track whether or not the builder
         # was specified well enough that we can omit the 'you need to
         # specify a parser' warning.
@@ -427,13 +498,14 @@ class BeautifulSoup(Tag):
                     "Keyword arguments to the BeautifulSoup constructor will be ignored. These would normally be passed into the TreeBuilder constructor, but a TreeBuilder instance was passed in as `builder`."
                 )
 
-        self.builder = builder
-        self.is_xml = builder.is_xml
-        self.known_xml = self.is_xml
-        self._namespaces = dict()
-        self.parse_only = parse_only
-
-        self.replacer = replacer
+        self._attach(
+            builder,
+            parse_only,
+            element_classes,
+            replacer,
+            drop_tags,
+            keep_whitespace_nodes,
+        )
 
         if hasattr(markup, "read"):  # It's a file-type object.
             markup = markup.read()
@@ -456,37 +528,181 @@ class BeautifulSoup(Tag):
         # it was a file-type object, we've read from it.
         markup = cast(_RawMarkup, markup)
 
-        rejections = []
-        success = False
-        for (
-            self.markup,
-            self.original_encoding,
-            self.declared_html_encoding,
-            self.contains_replacement_characters,
-        ) in self.builder.prepare_markup(
-            markup, from_encoding, exclude_encodings=exclude_encodings
-        ):
-            self.reset()
-            self.builder.initialize_soup(self)
-            try:
-                self._feed()
-                success = True
-                break
-            except ParserRejectedMarkup as e:
-                rejections.append(e)
-                pass
+        try:
+            self._prepare_and_feed(markup, from_encoding, exclude_encodings)
+        finally:
+            # Clear out the markup and remove the builder's circular
+            # reference to this object, even if the markup was
+            # rejected, so the builder can be used again.
+            self.markup = None
+            self.builder.soup = None
 
-        if not success:
-            other_exceptions = [str(e) for e in rejections]
-            raise ParserRejectedMarkup(
-                "The markup you provided was rejected by the parser. Trying a different parser or a different encoding may help.\n\nOriginal exception(s) from parser:\n "
-                + "\n ".join(other_exceptions)
+    def _attach(
+        self,
+        builder: TreeBuilder,
+        parse_only: Optional[ElementFilter],
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]],
+        replacer: Any,
+        drop_tags: Optional[Iterable[str]] = None,
+        keep_whitespace_nodes: bool = True,
+    ) -> None:
+        """Set up the parts of this object that don't depend on the
+        markup being parsed.
+        """
+        self.element_classes = element_classes or dict()
+        self.builder = builder
+        self.is_xml = builder.is_xml
+        self.known_xml = self.is_xml
+        self._namespaces = dict()
+        self.parse_only = parse_only
+        self.parse_only_results = None
+        self.replacer = replacer
+        self.drop_tags = frozenset(drop_tags or ())
+        self.keep_whitespace_nodes = keep_whitespace_nodes
+
+    @classmethod
+    def fragment(
+        cls,
+        markup: str,
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[_ParseOnly] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        replacer: Any = None,
+        drop_tags: Optional[Iterable[str]] = None,
+        keep_whitespace_nodes: bool = True,
+        **kwargs: Any,
+    ) -> "BeautifulSoup":
+        """Parse a small piece of HTML or XML, such as a comment or a
+        product description, as quickly as possible.
+
+        This builds the same tree as the `BeautifulSoup` constructor,
+        but it skips the work that only matters for whole documents
+        and for mistakes in the way the constructor is called. The
+        markup must be a string, so there's no encoding to detect;
+        there are no warnings about markup that looks like a URL or
+        filename, or about the choice of parser; and unless you pass
+        in ``builder`` or keyword arguments for the `TreeBuilder`,
+        the `TreeBuilder` is taken from a `TreeBuilderPool` instead
+        of being created from scratch::
+
+         for comment in comments:
+             soup = BeautifulSoup.fragment(comment, "html.parser")
+
+        The arguments are the same as the constructor's, except that
+        the encoding arguments and the arguments left over from
+        Beautiful Soup 3 aren't accepted. As with the constructor, an
+        HTML parser that's given an XML document may issue an
+        `XMLParsedAsHTMLWarning`.
+
+        :raise TypeError: If ``markup`` isn't a string, or one of the
+            arguments isn't accepted.
+        """
+        if not isinstance(markup, str):
+            raise TypeError(
+                "BeautifulSoup.fragment() can only parse a string, not %s."
+                % type(markup).__name__
             )
+        for name in cls._NOT_FOR_FRAGMENTS:
+            if name in kwargs:
+                raise TypeError(
+                    "BeautifulSoup.fragment() doesn't accept the %r argument. "
+                    "Use the BeautifulSoup constructor instead." % name
+                )
+        if builder is None:
+            if isinstance(features, str):
+                features = [features]
+            if not features:
+                features = cls.DEFAULT_BUILDER_FEATURES
+            if kwargs:
+                builder_class = builder_registry.lookup(*features)
+                if builder_class is None:
+                    raise FeatureNotFound(
+                        "Couldn't find a tree builder with the features you "
+                        "requested: %s. Do you need to install a parser library?"
+                        % ",".join(features)
+                    )
+                builder = builder_class(**kwargs)
+            else:
+                builder = _fragment_builders.acquire(*features)
+        elif isinstance(builder, type):
+            builder = builder(**kwargs)
+        if parse_only is not None:
+            parse_only = ElementFilterUnion.from_parse_only(parse_only)
+
+        soup = cls.__new__(cls)
+        soup._attach(
+            builder,
+            parse_only,
+            element_classes,
+            replacer,
+            drop_tags,
+            keep_whitespace_nodes,
+        )
+        try:
+            if markup.startswith("\N{BYTE ORDER MARK}"):
+                # Some tree builders need to treat this specially.
+                soup._prepare_and_feed(markup)
+            else:
+                soup.markup = markup
+                soup.original_encoding = None
+                soup.declared_html_encoding = None
+                soup.contains_replacement_characters = False
+                soup.reset()
+                builder.initialize_soup(soup)
+                try:
+                    soup._feed()
+                except ParserRejectedMarkup:
+                    # Let the tree builder try something else.
+                    soup._prepare_and_feed(markup)
+        finally:
+            soup.markup = None
+            builder.soup = None
+        return soup
 
-        # Clear out the markup and remove the builder's circular
-        # reference to this object.
-        self.markup = None
-        self.builder.soup = None
+    @classmethod
+    def incremental(
+        cls,
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[_ParseOnly] = None,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        drop_tags: Optional[Iterable[str]] = None,
+        keep_whitespace_nodes: bool = True,
+        **kwargs: Any,
+    ) -> "IncrementalParser":
+        """Get ready to parse a document that will arrive a piece at a time.
+
+        Pass the pieces of the document into `IncrementalParser.feed`
+        as they arrive, then call `IncrementalParser.close`, which
+        returns the finished `BeautifulSoup` object. Parsing happens as
+        the pieces come in, so the whole document never needs to be in
+        memory at once::
+
+         parser = BeautifulSoup.incremental("lxml")
+         for chunk in response.iter_content(chunk_size=65536):
+             parser.feed(chunk)
+         soup = parser.close()
+
+        The arguments are the same as for the `BeautifulSoup`
+        constructor, except that there's no ``markup``. If the pieces
+        are bytestrings and ``from_encoding`` isn't provided, the
+        encoding is determined by looking at the start of the
+        document.
+        """
+        soup = cls(
+            "",
+            features,
+            builder,
+            parse_only,
+            element_classes=element_classes,
+            drop_tags=drop_tags,
+            keep_whitespace_nodes=keep_whitespace_nodes,
+            **kwargs,
+        )
+        return IncrementalParser(soup, from_encoding, exclude_encodings)
 
     def copy_self(self) -> "BeautifulSoup":
         """Create a new BeautifulSoup object with the same TreeBuilder,
@@ -519,20 +735,89 @@ class BeautifulSoup(Tag):
         for descendant in self.descendants:
             yield descendant
 
+    def to_bytes(self) -> bytes:
+        """Convert this parse tree into a compact binary format.
+
+        Use `BeautifulSoup.from_bytes` to turn the result back into a
+        `BeautifulSoup` object. That's much faster than parsing the
+        markup again, so this is a good way to cache a parse tree or
+        send it to another process.
+
+        :raise ValueError: If the tree contains something that can't
+            be represented, such as an instance of a `Tag` subclass
+            with a custom constructor.
+        """
+        return serialize(self)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+    ) -> "BeautifulSoup":
+        """Recreate a parse tree from the output of `BeautifulSoup.to_bytes`,
+        without parsing any markup.
+
+        Like unpickling, this may import the modules that define the
+        classes used in the tree, so you should only load data that you
+        trust.
+
+        :param data: The output of `BeautifulSoup.to_bytes`.
+        :param builder: The `TreeBuilder` to associate with the new
+            `BeautifulSoup` object. By default, the same kind of
+            `TreeBuilder` that built the original tree is used.
+        :raise ValueError: If ``data`` isn't a serialized parse tree.
+        :raise FeatureNotFound: If no ``builder`` is given, and the
+            kind of `TreeBuilder` that built the original tree isn't
+            available.
+        """
+        tree = SerializedTree(data)
+        if builder is None:
+            if tree.builder_name is None:
+                features = cls.DEFAULT_BUILDER_FEATURES
+            else:
+                features = [tree.builder_name]
+            builder = builder_registry.lookup(*features)
+            if builder is None:
+                raise FeatureNotFound(
+                    "Couldn't find the tree builder that built this parse tree: %s. "
+                    "Do you need to install a parser library?" % tree.builder_name
+                )
+        soup = cls("", builder=builder)
+        # Some parsers (html5lib) create a skeleton document even
+        # when there's no markup. Get rid of it.
+        soup.reset()
+        tree.build(soup)
+        soup.is_xml = tree.is_xml
+        soup.known_xml = tree.known_xml
+        soup.original_encoding = tree.original_encoding
+        soup.declared_html_encoding = tree.declared_html_encoding
+        soup.contains_replacement_characters = tree.contains_replacement_characters
+        return soup
+
     def __getstate__(self) -> Dict[str, Any]:
         # Frequently a tree builder can't be pickled.
         d = dict(self.__dict__)
         if "builder" in d and d["builder"] is not None and not self.builder.picklable:
             d["builder"] = type(self.builder)
-        # Store the contents as a Unicode string.
-        d["contents"] = []
-        d["markup"] = self.decode()
+        # The tree itself lives in slots, not in __dict__, so it's not
+        # part of the state. Store it in the binary tree format if
+        # possible; otherwise store the markup, and it will be parsed
+        # again when the object is unpickled.
+        try:
+            d["tree"] = self.to_bytes()
+        except ValueError:
+            d["markup"] = self.decode()
 
         # If _most_recent_element is present, it's a Tag object left
         # over from initial parse. It might not be picklable and we
         # don't need it.
         if "_most_recent_element" in d:
             del d["_most_recent_element"]
+
+        # An ElementIndex is just a cache; it will be rebuilt if it's
+        # needed.
+        d.pop("_element_index", None)
         return d
 
     def __setstate__(self, state: Dict[str, Any]) -> None:
@@ -546,7 +831,12 @@ class BeautifulSoup(Tag):
             self.builder = HTMLParserTreeBuilder()
         self.builder.soup = self
         self.reset()
-        self._feed()
+        tree = state.pop("tree", None)
+        if tree is None:
+            self._feed()
+        else:
+            SerializedTree(tree).build(self)
+        self.builder.soup = None
 
     @classmethod
     @_deprecated(
@@ -664,6 +954,44 @@ class BeautifulSoup(Tag):
         )
         return True
 
+    def _prepare_and_feed(
+        self,
+        markup: _RawMarkup,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ) -> None:
+        """Internal method that tries each of the TreeBuilder's strategies
+        for parsing `markup` until one of them works.
+
+        :raise ParserRejectedMarkup: If every strategy failed.
+        """
+        rejections = []
+        success = False
+        for (
+            self.markup,
+            self.original_encoding,
+            self.declared_html_encoding,
+            self.contains_replacement_characters,
+        ) in self.builder.prepare_markup(
+            markup, from_encoding, exclude_encodings=exclude_encodings
+        ):
+            self.reset()
+            self.builder.initialize_soup(self)
+            try:
+                self._feed()
+                success = True
+                break
+            except ParserRejectedMarkup as e:
+                rejections.append(e)
+                pass
+
+        if not success:
+            other_exceptions = [str(e) for e in rejections]
+            raise ParserRejectedMarkup(
+                "The markup you provided was rejected by the parser. Trying a different parser or a different encoding may help.\n\nOriginal exception(s) from parser:\n "
+                + "\n ".join(other_exceptions)
+            )
+
     def _feed(self) -> None:
         """Internal method that parses previously set markup, creating a large
         number of Tag and NavigableString objects.
@@ -671,8 +999,21 @@ class BeautifulSoup(Tag):
         # Convert the document to Unicode.
         self.builder.reset()
 
-        if self.markup is not None:
-            self.builder.feed(self.markup)
+        parse_only = self.parse_only
+        if parse_only is not None:
+            parse_only._fix_rules(True)
+        try:
+            if self.markup is not None:
+                self.builder.feed(self.markup)
+            self._end_document()
+        finally:
+            if parse_only is not None:
+                parse_only._fix_rules(False)
+
+    def _end_document(self) -> None:
+        """Internal method called once the TreeBuilder has run out of
+        markup.
+        """
         # Close out any unfinished strings and close all the open tags.
         self.endData()
         while (
@@ -686,6 +1027,7 @@ class BeautifulSoup(Tag):
         """
         Tag.__init__(self, self, self.builder, self.ROOT_TAG_NAME)
         self.hidden = True
+        _tree_changed(self)
         self.builder.reset()
         self.current_data = []
         self.currentTag = None
@@ -694,6 +1036,12 @@ class BeautifulSoup(Tag):
         self.preserve_whitespace_tag_stack = []
         self.string_container_stack = []
         self._most_recent_element = None
+        self._drop_stack = []
+        if isinstance(self.parse_only, ElementFilterUnion):
+            self.parse_only_results = {
+                label: ResultSet(element_filter)
+                for label, element_filter in self.parse_only.filters.items()
+            }
         if getattr(self, "replacer", None) is not None:
             reset = getattr(self.replacer, "reset", None)
             if callable(reset):
@@ -825,6 +1173,8 @@ class BeautifulSoup(Tag):
             self.preserve_whitespace_tag_stack.pop()
         if self.string_container_stack and tag == self.string_container_stack[-1]:
             self.string_container_stack.pop()
+        if self._iterparse_names is not None and tag.name in self._iterparse_names:
+            self._iterparse_completed.append(tag)
         # print("Pop", tag.name)
         if self.tagStack:
             self.currentTag = self.tagStack[-1]
@@ -842,9 +1192,10 @@ class BeautifulSoup(Tag):
         self.currentTag = self.tagStack[-1]
         if tag.name != self.ROOT_TAG_NAME:
             self.open_tag_counter[tag.name] += 1
-        if tag.name in self.builder.preserve_whitespace_tags:
+        descriptor = _builder_tag_descriptor(self.builder, tag.name)
+        if descriptor.preserves_whitespace:
             self.preserve_whitespace_tag_stack.append(tag)
-        if tag.name in self.builder.string_containers:
+        if descriptor.string_container is not None:
             self.string_container_stack.append(tag)
 
     def endData(self, containerClass: Optional[Type[NavigableString]] = None) -> None:
@@ -857,36 +1208,56 @@ class BeautifulSoup(Tag):
         :meta private:
         """
         if self.current_data:
-            current_data = "".join(self.current_data)
+            # Most strings arrive in a single chunk.
+            if len(self.current_data) == 1:
+                current_data = self.current_data[0]
+            else:
+                current_data = "".join(self.current_data)
             # If whitespace is not preserved, and this string contains
             # nothing but ASCII spaces, replace it with a single space
             # or newline.
-            if not self.preserve_whitespace_tag_stack:
-                strippable = True
-                for i in current_data:
-                    if i not in self.ASCII_SPACES:
-                        strippable = False
-                        break
-                if strippable:
-                    if "\n" in current_data:
-                        current_data = "\n"
-                    else:
-                        current_data = " "
+            #
+            # isspace() rules out most strings without looking past
+            # their first character, but it also accepts non-ASCII
+            # whitespace, so anything it accepts has to be checked
+            # against ASCII_SPACES.
+            if not self.preserve_whitespace_tag_stack and (
+                not current_data
+                or (current_data.isspace() and not current_data.strip(self.ASCII_SPACES))
+            ):
+                if (
+                    not self.keep_whitespace_nodes
+                    and containerClass is None
+                    and not self.string_container_stack
+                ):
+                    # Leave this string out of the tree altogether.
+                    self.current_data = []
+                    return
+                if "\n" in current_data:
+                    current_data = "\n"
+                else:
+                    current_data = " "
 
             # Reset the data collector.
             self.current_data = []
 
             # Should we add this string to the tree at all?
-            if (
-                self.parse_only
-                and len(self.tagStack) <= 1
-                and (not self.parse_only.allow_string_creation(current_data))
-            ):
-                return
+            labels = None
+            if self.parse_only and len(self.tagStack) <= 1:
+                if self.parse_only_results is not None:
+                    labels = cast(
+                        ElementFilterUnion, self.parse_only
+                    ).labels_allowing_string(current_data)
+                    if not labels:
+                        return
+                elif not self.parse_only.allow_string_creation(current_data):
+                    return
 
             containerClass = self.string_container(containerClass)
             o = containerClass(current_data)
             self.object_was_parsed(o)
+            if labels:
+                self._record_parse_only_result(labels, o)
 
     def object_was_parsed(
         self,
@@ -1051,13 +1422,27 @@ class BeautifulSoup(Tag):
             except Exception:
                 pass
 
-        if (
-            self.parse_only
-            and len(self.tagStack) <= 1
-            and not self.parse_only.allow_tag_creation(nsprefix, name, attrs)
-        ):
+        if self._drop_stack or (self.drop_tags and self._is_dropped(name, nsprefix)):
+            # This tag is being left out of the tree, either because
+            # it's in drop_tags or because it's inside a tag that is.
+            # Keep track of it unless it's an empty-element tag, in
+            # which case the tree builder might not send an end tag.
+            empty_element_tags = self.builder.empty_element_tags
+            if empty_element_tags is None or name not in empty_element_tags:
+                self._drop_stack.append(name)
             return None
 
+        labels = None
+        if self.parse_only and len(self.tagStack) <= 1:
+            if self.parse_only_results is not None:
+                labels = cast(ElementFilterUnion, self.parse_only).labels_allowing_tag(
+                    nsprefix, name, attrs
+                )
+                if not labels:
+                    return None
+            elif not self.parse_only.allow_tag_creation(nsprefix, name, attrs):
+                return None
+
         tag_class = self.element_classes.get(Tag, Tag)
         # Assume that this is either Tag or a subclass of Tag. If not,
         # the user brought type-unsafety upon themselves.
@@ -1090,8 +1475,31 @@ class BeautifulSoup(Tag):
             self._most_recent_element.next_element = tag
         self._most_recent_element = tag
         self.pushTag(tag)
+        if labels:
+            self._record_parse_only_result(labels, tag)
         return tag
 
+    def _is_dropped(self, name: str, nsprefix: Optional[str]) -> bool:
+        """Is a tag with this name one of the `BeautifulSoup.drop_tags`?
+
+        :meta private:
+        """
+        if name in self.drop_tags:
+            return True
+        return nsprefix is not None and "%s:%s" % (nsprefix, name) in self.drop_tags
+
+    def _record_parse_only_result(
+        self, labels: List[Hashable], element: PageElement
+    ) -> None:
+        """Note that the ``parse_only`` filters with the given labels
+        allowed ``element`` to be parsed.
+
+        :meta private:
+        """
+        results = cast(Dict[Hashable, ResultSet[PageElement]], self.parse_only_results)
+        for label in labels:
+            results[label].append(element)
+
     def handle_endtag(self, name: str, nsprefix: Optional[str] = None) -> None:
         """Called by the tree builder when an ending tag is encountered.
 
@@ -1109,6 +1517,21 @@ class BeautifulSoup(Tag):
             except Exception:
                 pass
 
+        if self._drop_stack:
+            # An end tag closes the most recently opened tag with its
+            # name, and everything opened since, just like _popToTag.
+            drop_stack = self._drop_stack
+            for i in range(len(drop_stack) - 1, -1, -1):
+                if drop_stack[i] == name:
+                    del drop_stack[i:]
+                    return
+            if not self.open_tag_counter.get(name):
+                # This end tag doesn't match anything that's open.
+                return
+            # This end tag closes a tag that was opened before the
+            # dropped tag, so the dropped tag is closed too.
+            del drop_stack[:]
+
         self._popToTag(name, nsprefix)
 
     def handle_data(self, data: str) -> None:
@@ -1117,6 +1540,8 @@ class BeautifulSoup(Tag):
 
         :meta private:
         """
+        if self._drop_stack:
+            return
         self.current_data.append(data)
 
     def decode(
@@ -1143,21 +1568,6 @@ class BeautifulSoup(Tag):
             parse tree. This is only used by `Tag.decode_contents` and
             you probably won't need to use it.
         """
-        if self.is_xml:
-            # Print the XML declaration
-            encoding_part = ""
-            declared_encoding: Optional[str] = eventual_encoding
-            if eventual_encoding in PYTHON_SPECIFIC_ENCODINGS:
-                # This is a special Python encoding; it can't actually
-                # go into an XML document because it means nothing
-                # outside of Python.
-                declared_encoding = None
-            if declared_encoding is not None:
-                encoding_part = ' encoding="%s"' % declared_encoding
-            prefix = '<?xml version="1.0"%s?>\n' % encoding_part
-        else:
-            prefix = ""
-
         # Prior to 4.13.0, the first argument to this method was a
         # bool called pretty_print, which gave the method a different
         # signature from its superclass implementation, Tag.decode.
@@ -1187,10 +1597,264 @@ class BeautifulSoup(Tag):
             warnings.warn(warning, DeprecationWarning, stacklevel=2)
         elif indent_level is False or pretty_print is False:
             indent_level = None
-        return prefix + super(BeautifulSoup, self).decode(
+        return super(BeautifulSoup, self).decode(
             indent_level, eventual_encoding, formatter, iterator
         )
 
+    def _decode_pieces(
+        self,
+        indent_level: Optional[int] = None,
+        eventual_encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        formatter: Union[Formatter, str] = "minimal",
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[str]:
+        """Render the parse tree as a sequence of strings, starting
+        with the XML declaration if this is an XML document.
+
+        :meta private:
+        """
+        if self.is_xml:
+            # Print the XML declaration
+            encoding_part = ""
+            declared_encoding: Optional[str] = eventual_encoding
+            if eventual_encoding in PYTHON_SPECIFIC_ENCODINGS:
+                # This is a special Python encoding; it can't actually
+                # go into an XML document because it means nothing
+                # outside of Python.
+                declared_encoding = None
+            if declared_encoding is not None:
+                encoding_part = ' encoding="%s"' % declared_encoding
+            yield '<?xml version="1.0"%s?>\n' % encoding_part
+        yield from super(BeautifulSoup, self)._decode_pieces(
+            indent_level, eventual_encoding, formatter, iterator
+        )
+
+
+class IncrementalParser(object):
+    """Builds a `BeautifulSoup` object out of a document that arrives a
+    piece at a time.
+
+    Don't instantiate this class yourself; call
+    `BeautifulSoup.incremental` instead.
+
+    If the `TreeBuilder` can't parse a document incrementally (the
+    html5lib builder can't), the pieces are collected and parsed all
+    at once when `IncrementalParser.close` is called.
+
+    :param soup: An empty `BeautifulSoup` object which will hold the
+        parse tree.
+    :param from_encoding: The encoding of the incoming bytestrings, if
+        known.
+    :param exclude_encodings: Encodings known not to be the encoding
+        of the incoming bytestrings.
+    """
+
+    #: The `BeautifulSoup` object being built. Until
+    #: `IncrementalParser.close` is called, this will contain only the
+    #: parts of the document parsed so far.
+    soup: BeautifulSoup
+
+    #: Whether `IncrementalParser.close` has been called.
+    closed: bool
+
+    _from_encoding: Optional[_Encoding]
+    _exclude_encodings: Optional[_Encodings]
+    _pieces: Optional[List[_RawMarkup]]
+
+    def __init__(
+        self,
+        soup: BeautifulSoup,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ):
+        self.soup = soup
+        self.closed = False
+        self._from_encoding = from_encoding
+        self._exclude_encodings = exclude_encodings
+
+        builder = soup.builder
+        if not builder.incremental:
+            self._pieces = []
+            return
+        self._pieces = None
+        builder.soup = soup
+        soup.reset()
+        soup.original_encoding = from_encoding
+        soup.declared_html_encoding = None
+        soup.contains_replacement_characters = False
+        builder.initialize_soup(soup)
+        builder.reset()
+        builder.begin_feed(from_encoding, exclude_encodings)
+
+    def feed(self, markup: _RawMarkup) -> None:
+        """Parse the next piece of the document.
+
+        :param markup: A string or bytestring. Every piece of a given
+            document must be the same type.
+        :raise ParserRejectedMarkup: If the parser can't deal with the
+            markup.
+        """
+        if self.closed:
+            raise ValueError("Can't feed markup to a closed IncrementalParser.")
+        # Parsing adds elements to the tree without going through the
+        # methods that normally keep track of tree modifications. They
+        # can only be added underneath the tags that are still open.
+        _tree_changed(self.soup.currentTag or self.soup)
+        if self._pieces is not None:
+            self._pieces.append(markup)
+            return
+        parse_only = self.soup.parse_only
+        if parse_only is not None:
+            parse_only._fix_rules(True)
+        try:
+            self.soup.builder.feed_chunk(markup)
+        finally:
+            if parse_only is not None:
+                parse_only._fix_rules(False)
+
+    def close(self) -> BeautifulSoup:
+        """Signal that the whole document has been fed in.
+
+        :return: The finished `BeautifulSoup` object.
+        """
+        if self.closed:
+            return self.soup
+        self.closed = True
+        soup = self.soup
+        _tree_changed(soup.currentTag or soup)
+        if self._pieces is not None:
+            pieces, self._pieces = self._pieces, None
+            markup: _RawMarkup
+            if pieces and isinstance(pieces[0], bytes):
+                markup = b"".join(cast(List[bytes], pieces))
+            else:
+                markup = "".join(cast(List[str], pieces))
+            del pieces
+            soup._prepare_and_feed(
+                markup, self._from_encoding, self._exclude_encodings
+            )
+        else:
+            parse_only = soup.parse_only
+            if parse_only is not None:
+                parse_only._fix_rules(True)
+            try:
+                soup.builder.end_feed()
+                soup._end_document()
+            finally:
+                if parse_only is not None:
+                    parse_only._fix_rules(False)
+
+        # Clear out the markup and remove the builder's circular
+        # reference to the BeautifulSoup object.
+        soup.markup = None
+        soup.builder.soup = None
+        return soup
+
+
+def iterparse(
+    source: Union[_IncomingMarkup, Iterable[_RawMarkup]],
+    tag: Union[str, Iterable[str]],
+    parser: Union[str, Sequence[str]] = "lxml-xml",
+    chunk_size: int = 64 * 1024,
+    **kwargs: Any,
+) -> Iterator[Tag]:
+    """Parse a document, yielding each tag with a given name as soon as
+    it's been completely parsed.
+
+    This is useful for large documents which consist mostly of a series
+    of similar records, such as product catalogs or sitemaps. Once you're
+    done with a yielded tag (that is, once you ask for the next one), it's
+    removed from the tree, along with any earlier siblings, so the
+    amount of memory used depends on the size of a record rather than
+    the size of the document::
+
+     with open("sitemap.xml", "rb") as fh:
+         for url in iterparse(fh, "url"):
+             print(url.loc.string)
+
+    While a tag is being yielded, it's still connected to the tree,
+    so you can look at its ancestors. To keep a tag around after
+    asking for the next one, make a copy of it.
+
+    If one of the tags you asked for contains another one, the inner
+    tag is yielded first and left in place, so that the outer tag is
+    complete when it's yielded.
+
+    If the tree builder can't parse a document incrementally (see
+    `BeautifulSoup.incremental`), the whole document is parsed before
+    the first tag is yielded.
+
+    :param source: The document to parse: a string or bytestring, an
+        open filehandle, or an iterable of strings or bytestrings.
+    :param tag: The name of the tags to yield, or a list of names.
+    :param parser: Desirable features of the parser to be used, as
+        with the ``features`` argument to the `BeautifulSoup`
+        constructor.
+    :param chunk_size: When reading from a filehandle or a string, the
+        document is passed into the parser this many characters at a time.
+    :param kwargs: Other arguments to `BeautifulSoup.incremental`.
+    """
+    incremental = BeautifulSoup.incremental(parser, **kwargs)
+    soup = incremental.soup
+    if isinstance(tag, str):
+        soup._iterparse_names = {tag}
+    else:
+        soup._iterparse_names = set(tag)
+    completed: List[Tag] = []
+    soup._iterparse_completed = completed
+
+    chunks: Iterable[_RawMarkup]
+    if hasattr(source, "read"):
+        fh = cast(IO[Any], source)
+        chunks = iter(lambda: fh.read(chunk_size), fh.read(0))
+    elif isinstance(source, (str, bytes)):
+        chunks = (
+            source[i : i + chunk_size] for i in range(0, len(source), chunk_size)
+        )
+    else:
+        chunks = cast(Iterable[_RawMarkup], source)
+
+    for chunk in chunks:
+        incremental.feed(chunk)
+        yield from _release_completed_tags(soup, completed)
+    incremental.close()
+    yield from _release_completed_tags(soup, completed)
+
+
+def _release_completed_tags(soup: BeautifulSoup, completed: List[Tag]) -> Iterator[Tag]:
+    """Yield each tag in `completed`, then remove it (and anything
+    that came before it on the same level) from the tree.
+    """
+    names = soup._iterparse_names or ()
+    for tag in completed:
+        yield tag
+        if tag.decomposed or tag.parent is None:
+            # The caller already took this tag out of the tree.
+            continue
+        parent = tag.parent
+        if any(ancestor.name in names for ancestor in tag.parents):
+            # This tag is part of a larger tag that will be yielded
+            # later, either because it's still open or because it
+            # comes later in the list, so it has to stay where it is.
+            continue
+
+        # Everything before the tag on the same level has already
+        # been completely parsed, and has either been yielded or
+        # wasn't wanted in the first place.
+        while parent.contents[0] is not tag:
+            parent.contents[0].extract(_self_index=0)
+
+        last_descendant = tag._last_descendant()
+        previous_element = tag.previous_element
+        tag.extract(_self_index=0)
+
+        # If nothing has been parsed since this tag was closed, the
+        # next element parsed must be connected to whatever came
+        # before this tag, not to the tag itself.
+        if soup._most_recent_element is last_descendant:
+            soup._most_recent_element = previous_element
+    del completed[:]
+
 
 # Aliases to make it easier to get started quickly, e.g. 'from bs4 import _soup'
 _s = BeautifulSoup
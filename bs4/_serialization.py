@@ -0,0 +1,661 @@
+"""A compact binary format for parse trees.
+
+Pickling a `BeautifulSoup` object used to mean turning it back into
+markup, and unpickling it meant parsing that markup all over
+again. This format records the tree itself: the structure, the tag
+names, attributes and namespaces, and the class of every string, so
+that loading it is just a matter of creating the objects and linking
+them together. No parser is involved.
+
+After a short header, the format consists of five arrays of
+integers, each stored using the smallest integer type that fits all
+of its values:
+
+1. The length of every string in the string table.
+2. The string table itself, as UTF-8 bytes.
+3. The tables: the classes used in the tree, and the "shapes" of the
+   elements. A shape is everything about an element that's likely to
+   be the same for many elements: its class, its namespace and
+   prefix, and so on.
+4. A flat stream of integers describing the tree in document
+   order. Each element is described by its shape, followed by the
+   details that are likely to be unique: its text, its name, its
+   attributes and the number of its children.
+5. The source line and position of every tag. These are kept apart
+   from the main stream because they tend to be large numbers.
+
+Strings and classes are referred to by their position in the
+appropriate table, plus one; zero means None.
+
+Since classes are stored by name, loading a tree can import modules,
+just like unpickling. Only load data that you trust.
+"""
+
+from __future__ import annotations
+
+from array import array
+from itertools import accumulate
+import importlib
+import struct
+import sys
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from bs4.element import (
+    AttributeValueWithCharsetSubstitution,
+    NamespacedAttribute,
+    NavigableString,
+    PageElement,
+    Tag,
+    TagDescriptor,
+    _builder_tag_descriptor,
+)
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+#: Identifies the data as a parse tree in this format.
+MAGIC = b"BS4T"
+
+#: The current version of the format.
+VERSION = 1
+
+# Flags describing the BeautifulSoup object.
+_IS_XML = 0x1
+_KNOWN_XML = 0x2
+_CONTAINS_REPLACEMENT_CHARACTERS = 0x4
+_ROOT_LINKED = 0x8
+
+# Flags describing a Tag. Optional booleans take up two bits: 0 for
+# None, 1 for False and 2 for True.
+_HIDDEN = 0x1
+_KNOWN_XML_SHIFT = 1
+_OWN_DESCRIPTOR = 0x8
+_CAN_BE_EMPTY_SHIFT = 4
+_NO_CDATA_LIST_ATTRIBUTES = 0x40
+_NO_PRESERVE_WHITESPACE_TAGS = 0x80
+_NO_INTERESTING_STRING_TYPES = 0x100
+_HAS_NAMESPACES = 0x200
+
+# The kinds of attribute keys (the low bit) and values (the rest).
+_NAMESPACED_KEY = 0x1
+_STRING = 0x0
+_LIST = 0x2
+_CHARSET_SUBSTITUTION = 0x4
+_FALSE = 0x6
+_TRUE = 0x8
+
+# The descriptor fields that can only be recorded as either None or
+# "whatever the TreeBuilder says".
+_DESCRIPTOR_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ("cdata_list_attributes", _NO_CDATA_LIST_ATTRIBUTES),
+    ("preserve_whitespace_tags", _NO_PRESERVE_WHITESPACE_TAGS),
+    ("interesting_string_types", _NO_INTERESTING_STRING_TYPES),
+)
+
+# A shape is stored as this many integers: the class, namespace,
+# prefix, flags, parser class, attribute value list class and
+# attribute dictionary class. A string only uses the first one.
+_SHAPE_SIZE = 7
+
+_OPTIONAL_BOOLS: Tuple[Optional[bool], ...] = (None, False, True)
+
+
+def _optional_bool(value: Optional[bool]) -> int:
+    if value is None:
+        return 0
+    return 2 if value else 1
+
+
+class _Writer(object):
+    """Turns a `BeautifulSoup` object into the binary format."""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self.strings: List[str] = []
+        self.string_refs: Dict[str, int] = {}
+        self.classes: List[type] = []
+        self.class_refs: Dict[type, int] = {}
+        self.shapes: List[Tuple[int, ...]] = []
+        self.shape_refs: Dict[Tuple[int, ...], int] = {}
+        self.stream: List[int] = []
+        self.positions: List[int] = []
+
+    def string(self, value: Optional[str]) -> int:
+        """Find (or create) the reference to a string."""
+        if value is None:
+            return 0
+        ref = self.string_refs.get(value)
+        if ref is None:
+            value = str.__str__(value)
+            self.strings.append(value)
+            ref = self.string_refs[value] = len(self.strings)
+        return ref
+
+    def cls(self, value: Optional[type]) -> int:
+        """Find (or create) the reference to a class."""
+        if value is None:
+            return 0
+        ref = self.class_refs.get(value)
+        if ref is None:
+            found: Any = sys.modules.get(value.__module__)
+            for part in value.__qualname__.split("."):
+                found = getattr(found, part, None)
+            if found is not value:
+                raise ValueError(
+                    "Can't serialize a parse tree that uses %r, because it can't be looked up by name."
+                    % value
+                )
+            self.classes.append(value)
+            ref = self.class_refs[value] = len(self.classes)
+        return ref
+
+    def shape(self, shape: Tuple[int, ...]) -> int:
+        """Find (or create) the reference to a shape."""
+        ref = self.shape_refs.get(shape)
+        if ref is None:
+            self.shapes.append(shape)
+            ref = self.shape_refs[shape] = len(self.shapes) - 1
+        return ref
+
+    def write(self) -> bytes:
+        soup = self.soup
+        out = self.stream
+        string = self.string
+
+        flags = 0
+        if soup.is_xml:
+            flags |= _IS_XML
+        if soup.known_xml:
+            flags |= _KNOWN_XML
+        if soup.contains_replacement_characters:
+            flags |= _CONTAINS_REPLACEMENT_CHARACTERS
+        if soup.contents and soup.next_element is soup.contents[0]:
+            flags |= _ROOT_LINKED
+        out.extend(
+            (
+                string(soup.builder.NAME if soup.builder is not None else None),
+                flags,
+                string(soup.original_encoding),
+                string(soup.declared_html_encoding),
+            )
+        )
+        self.write_namespaces(soup._namespaces)
+
+        # The root's children, then everything else in document order.
+        out.append(len(soup.contents))
+        stack: List[Iterator[PageElement]] = [iter(soup.contents)]
+        while stack:
+            for element in stack[-1]:
+                if isinstance(element, Tag):
+                    self.write_tag(element)
+                    if element.contents:
+                        stack.append(iter(element.contents))
+                        break
+                else:
+                    assert isinstance(element, NavigableString)
+                    self.write_string(element)
+            else:
+                stack.pop()
+
+        tables = [len(self.classes)]
+        for klass in self.classes:
+            tables.append(string(klass.__module__))
+            tables.append(string(klass.__qualname__))
+        tables.append(len(self.shapes))
+        for shape in self.shapes:
+            tables.extend(shape)
+        return _pack(self.strings, tables, out, self.positions)
+
+    def write_namespaces(self, namespaces: Dict[str, str]) -> None:
+        out = self.stream
+        out.append(len(namespaces))
+        for prefix, uri in namespaces.items():
+            out.append(self.string(prefix))
+            out.append(self.string(uri))
+
+    def write_string(self, element: NavigableString) -> None:
+        cls = type(element)
+        if cls.__new__ is not NavigableString.__new__:
+            raise ValueError(
+                "Can't serialize a parse tree containing %r, because it has a custom constructor."
+                % cls
+            )
+        self.stream.append(self.shape((self.cls(cls),) + (0,) * (_SHAPE_SIZE - 1)))
+        self.stream.append(self.string(element))
+
+    def write_tag(self, tag: Tag) -> None:
+        cls = type(tag)
+        if cls.__init__ is not Tag.__init__:
+            raise ValueError(
+                "Can't serialize a parse tree containing %r, because it has a custom constructor."
+                % cls
+            )
+        out = self.stream
+        string = self.string
+        self.positions.append(0 if tag.sourceline is None else tag.sourceline + 1)
+        self.positions.append(0 if tag.sourcepos is None else tag.sourcepos + 1)
+
+        flags = _optional_bool(tag.known_xml) << _KNOWN_XML_SHIFT
+        if tag.hidden:
+            flags |= _HIDDEN
+        descriptor = tag._descriptor
+        if not descriptor.shared:
+            flags |= self.descriptor_flags(tag.name, descriptor)
+        if tag._namespaces:
+            flags |= _HAS_NAMESPACES
+        shape = (
+            self.cls(cls),
+            string(tag.namespace),
+            string(tag.prefix),
+            flags,
+            self.cls(tag.parser_class),
+            self.cls(tag.attribute_value_list_class),
+            self.cls(type(tag.attrs)),
+        )
+        out.append(self.shape(shape))
+        out.append(string(tag.name))
+        out.append(len(tag.attrs))
+        for key, value in tag.attrs.items():
+            self.write_attribute(key, value)
+        if tag._namespaces:
+            self.write_namespaces(tag._namespaces)
+        out.append(len(tag.contents))
+
+    def descriptor_flags(self, name: str, descriptor: TagDescriptor) -> int:
+        """Describe a `TagDescriptor` that isn't shared with other tags.
+
+        Its can_be_empty_element is recorded directly. Each of its
+        other fields must either be None, or be the same as the one
+        the `TreeBuilder` would provide.
+        """
+        flags = _OWN_DESCRIPTOR | (
+            _optional_bool(descriptor.can_be_empty_element) << _CAN_BE_EMPTY_SHIFT
+        )
+        default = _builder_tag_descriptor(self.soup.builder, name)
+        for field, flag in _DESCRIPTOR_FIELDS:
+            value = getattr(descriptor, field)
+            if value is None:
+                flags |= flag
+            elif value != getattr(default, field):
+                raise ValueError(
+                    "Can't serialize a parse tree containing a <%s> tag with a custom %s."
+                    % (name, field)
+                )
+        return flags
+
+    def write_attribute(self, key: str, value: Any) -> None:
+        out = self.stream
+        string = self.string
+        if isinstance(value, AttributeValueWithCharsetSubstitution):
+            kind = _CHARSET_SUBSTITUTION
+        elif isinstance(value, str):
+            kind = _STRING
+        elif isinstance(value, bool):
+            kind = _TRUE if value else _FALSE
+        elif isinstance(value, list) and all(isinstance(x, str) for x in value):
+            kind = _LIST
+        else:
+            raise ValueError(
+                "Can't serialize the value %r of the %r attribute." % (value, key)
+            )
+
+        if isinstance(key, NamespacedAttribute):
+            out.extend(
+                (
+                    kind | _NAMESPACED_KEY,
+                    string(key.prefix),
+                    string(key.name),
+                    string(key.namespace),
+                )
+            )
+        elif isinstance(key, str):
+            out.extend((kind, string(key)))
+        else:
+            raise ValueError("Can't serialize the attribute name %r." % key)
+
+        if kind == _STRING:
+            out.append(string(value))
+        elif kind == _CHARSET_SUBSTITUTION:
+            out.extend((self.cls(type(value)), string(value.original_value)))
+        elif kind == _LIST:
+            out.extend((self.cls(type(value)), len(value)))
+            out.extend(string(x) for x in value)
+
+
+#: Each array is preceded by its type code and the number of items.
+_SECTION_HEADER = struct.Struct("<cQ")
+
+#: The number of arrays in the format.
+_SECTIONS = 5
+
+
+def _pack(strings: List[str], *arrays: List[int]) -> bytes:
+    """Turn a string table and some lists of integers into bytes."""
+    text = "".join(strings).encode("utf8", "surrogatepass")
+    pieces = [MAGIC, bytes((VERSION,))]
+    sections: Tuple[Any, ...] = ([len(x) for x in strings], text) + arrays
+    for values in sections:
+        if isinstance(values, bytes):
+            typecode = "B"
+            packed = values
+            count = len(values)
+        else:
+            typecode = _smallest_typecode(max(values, default=0))
+            data = array(typecode, values)
+            if sys.byteorder == "big":
+                data.byteswap()
+            packed = data.tobytes()
+            count = len(data)
+        pieces.append(_SECTION_HEADER.pack(typecode.encode("ascii"), count))
+        pieces.append(packed)
+    return b"".join(pieces)
+
+
+def _smallest_typecode(maximum: int) -> str:
+    for typecode in "BHIQ":
+        if maximum < 1 << (8 * array(typecode).itemsize):
+            return typecode
+    raise ValueError("Number too large to serialize: %d" % maximum)
+
+
+def _unpack(data: bytes) -> Tuple[List[Optional[str]], List[List[int]]]:
+    """Split serialized data back into a string table and some lists
+    of integers.
+
+    :return: A string table whose first entry is None, so that it can
+        be indexed directly with a string reference, and the other
+        lists of integers.
+    """
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError("This is not a serialized parse tree.")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(
+            "Unsupported version %d of the serialized parse tree format."
+            % data[len(MAGIC)]
+        )
+    position = len(MAGIC) + 1
+    sections: List[Any] = []
+    for i in range(_SECTIONS):
+        typecode_bytes, count = _SECTION_HEADER.unpack_from(data, position)
+        position += _SECTION_HEADER.size
+        typecode = typecode_bytes.decode("ascii")
+        if typecode not in "BHIQ":
+            raise ValueError("This is not a serialized parse tree.")
+        values = array(typecode)
+        size = count * values.itemsize
+        values.frombytes(data[position : position + size])
+        if len(values) != count:
+            raise ValueError("Serialized parse tree is truncated.")
+        position += size
+        if sys.byteorder == "big":
+            values.byteswap()
+        sections.append(values)
+    lengths, text = sections[:2]
+    decoded = text.tobytes().decode("utf8", "surrogatepass")
+    strings: List[Optional[str]] = [None]
+    start = 0
+    for end in accumulate(lengths):
+        strings.append(decoded[start:end])
+        start = end
+    return strings, [x.tolist() for x in sections[2:]]
+
+
+def _find_class(module: str, qualname: str) -> type:
+    """Look up a class by name, importing its module if necessary."""
+    found: Any = sys.modules.get(module)
+    if found is None:
+        found = importlib.import_module(module)
+    for part in qualname.split("."):
+        found = getattr(found, part)
+    if not isinstance(found, type) or not issubclass(
+        found, (PageElement, dict, list, str)
+    ):
+        raise ValueError("%s.%s can't be used in a parse tree." % (module, qualname))
+    return found
+
+
+class SerializedTree(object):
+    """A serialized parse tree that's been unpacked, but not yet turned
+    back into objects.
+
+    :param data: The output of `serialize`.
+    :raise ValueError: If ``data`` isn't a serialized parse tree.
+    """
+
+    #: The name of the `TreeBuilder` that built the original tree.
+    builder_name: Optional[str]
+
+    is_xml: bool
+    known_xml: bool
+    contains_replacement_characters: bool
+    original_encoding: Optional[str]
+    declared_html_encoding: Optional[str]
+
+    def __init__(self, data: bytes):
+        strings, (tables, stream, positions) = _unpack(data)
+        self.strings = strings
+        self._read: Callable[[], int] = iter(stream).__next__
+        self._read_position: Callable[[], int] = iter(positions).__next__
+
+        try:
+            read_table = iter(tables).__next__
+            classes: List[Any] = [None]
+            for i in range(read_table()):
+                module, qualname = strings[read_table()], strings[read_table()]
+                if module is None or qualname is None:
+                    raise ValueError("Serialized parse tree is corrupt.")
+                classes.append(_find_class(module, qualname))
+            self.classes = classes
+
+            # Resolve each shape's references ahead of time.
+            self.shapes: List[Tuple[Any, ...]] = []
+            for i in range(read_table()):
+                (
+                    cls,
+                    namespace,
+                    prefix,
+                    flags,
+                    parser_class,
+                    attribute_value_list_class,
+                    attr_dict_class,
+                ) = [read_table() for j in range(_SHAPE_SIZE)]
+                self.shapes.append(
+                    (
+                        classes[cls],
+                        strings[namespace],
+                        strings[prefix],
+                        flags,
+                        classes[parser_class],
+                        classes[attribute_value_list_class],
+                        classes[attr_dict_class],
+                    )
+                )
+
+            read = self._read
+            self.builder_name = strings[read()]
+            flags = read()
+            self.original_encoding = strings[read()]
+            self.declared_html_encoding = strings[read()]
+        except (IndexError, StopIteration):
+            raise ValueError("Serialized parse tree is corrupt.")
+        self.is_xml = bool(flags & _IS_XML)
+        self.known_xml = bool(flags & _KNOWN_XML)
+        self.contains_replacement_characters = bool(
+            flags & _CONTAINS_REPLACEMENT_CHARACTERS
+        )
+        self.root_linked = bool(flags & _ROOT_LINKED)
+
+    def build(self, soup: BeautifulSoup) -> None:
+        """Recreate the parse tree inside an empty `BeautifulSoup` object.
+
+        :raise ValueError: If the data turns out to be corrupt.
+        """
+        try:
+            self._build(soup)
+        except (IndexError, StopIteration, TypeError):
+            raise ValueError("Serialized parse tree is corrupt.")
+
+    def _namespaces(self) -> Dict[str, str]:
+        read = self._read
+        strings = self.strings
+        namespaces = {}
+        for i in range(read()):
+            prefix = strings[read()]
+            uri = strings[read()]
+            if prefix is None or uri is None:
+                raise ValueError("Serialized parse tree is corrupt.")
+            namespaces[prefix] = uri
+        return namespaces
+
+    def _build(self, soup: BeautifulSoup) -> None:
+        read = self._read
+        strings = self.strings
+        shapes = self.shapes
+        soup._namespaces = self._namespaces()
+
+        previous_element: Optional[PageElement] = soup if self.root_linked else None
+        parent: Tag = soup
+        remaining = read()
+        stack: List[Tuple[Tag, int]] = []
+        while True:
+            while remaining == 0 and stack:
+                parent, remaining = stack.pop()
+            if remaining == 0:
+                break
+            remaining -= 1
+
+            shape = shapes[read()]
+            cls = shape[0]
+            element: PageElement
+            children = 0
+            if issubclass(cls, NavigableString):
+                element = str.__new__(cls, strings[read()])
+            elif issubclass(cls, Tag):
+                element = tag = object.__new__(cls)
+                children = self._build_tag(tag, shape, soup)
+            else:
+                raise ValueError("%r is not a PageElement class." % cls)
+
+            element.parent = parent
+            contents = parent.contents
+            if contents:
+                previous_sibling = contents[-1]
+                previous_sibling.next_sibling = element
+                element.previous_sibling = previous_sibling
+            else:
+                element.previous_sibling = None
+            element.next_sibling = None
+            contents.append(element)
+            element.previous_element = previous_element
+            if previous_element is not None:
+                previous_element.next_element = element
+            previous_element = element
+
+            if children:
+                stack.append((parent, remaining))
+                parent = tag
+                remaining = children
+
+        if previous_element is not None and previous_element is not soup:
+            previous_element.next_element = None
+
+    def _build_tag(self, tag: Tag, shape: Tuple[Any, ...], soup: BeautifulSoup) -> int:
+        """Fill in the state of a newly created `Tag`.
+
+        :return: The number of children the tag has.
+        """
+        read = self._read
+        read_position = self._read_position
+        (
+            cls,
+            tag.namespace,
+            tag.prefix,
+            flags,
+            tag.parser_class,
+            tag.attribute_value_list_class,
+            attr_dict_class,
+        ) = shape
+
+        name = self.strings[read()]
+        if name is None:
+            raise ValueError("Serialized parse tree is corrupt.")
+        tag._name = name
+        sourceline = read_position()
+        tag.sourceline = sourceline - 1 if sourceline else None
+        sourcepos = read_position()
+        tag.sourcepos = sourcepos - 1 if sourcepos else None
+
+        # The dict constructor bypasses the special handling in
+        # AttributeDict.__setitem__; these values don't need it.
+        tag._attrs = attr_dict_class([self._attribute() for i in range(read())])
+        tag._namespaces = self._namespaces() if flags & _HAS_NAMESPACES else {}
+        tag.known_xml = _OPTIONAL_BOOLS[(flags >> _KNOWN_XML_SHIFT) & 3]
+        tag.hidden = bool(flags & _HIDDEN)
+        tag.contents = []
+        tag._attribute_string = None
+        tag._child_positions = None
+
+        descriptor = _builder_tag_descriptor(soup.builder, name)
+        if flags & _OWN_DESCRIPTOR:
+            descriptor = descriptor.copy()
+            descriptor.can_be_empty_element = _OPTIONAL_BOOLS[
+                (flags >> _CAN_BE_EMPTY_SHIFT) & 3
+            ]
+            for field, flag in _DESCRIPTOR_FIELDS:
+                if flags & flag:
+                    setattr(descriptor, field, None)
+            descriptor.preserves_whitespace = bool(
+                descriptor.preserve_whitespace_tags
+                and name in descriptor.preserve_whitespace_tags
+            )
+        tag._descriptor = descriptor
+        return read()
+
+    def _attribute(self) -> Tuple[str, Any]:
+        """Read an attribute's key and value."""
+        read = self._read
+        strings = self.strings
+        kind = read()
+        key: Optional[str]
+        if kind & _NAMESPACED_KEY:
+            prefix = strings[read()]
+            name = strings[read()]
+            key = NamespacedAttribute(prefix, name, strings[read()])
+        else:
+            key = strings[read()]
+        if key is None:
+            raise ValueError("Serialized parse tree is corrupt.")
+
+        kind &= ~_NAMESPACED_KEY
+        value: Any
+        if kind == _STRING:
+            value = strings[read()]
+        elif kind == _LIST:
+            cls = self.classes[read()]
+            value = cls([strings[read()] for i in range(read())])
+        elif kind == _CHARSET_SUBSTITUTION:
+            cls = self.classes[read()]
+            value = cls(strings[read()])
+        elif kind in (_TRUE, _FALSE):
+            value = kind == _TRUE
+        else:
+            raise ValueError("Serialized parse tree is corrupt.")
+        return key, value
+
+
+def serialize(soup: BeautifulSoup) -> bytes:
+    """Convert a `BeautifulSoup` object into the binary format.
+
+    :raise ValueError: If the tree contains something that can't be
+        represented, such as an element class with a custom constructor.
+    """
+    return _Writer(soup).write()
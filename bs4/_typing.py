@@ -22,6 +22,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Hashable,
     IO,
     Iterable,
     Mapping,
@@ -40,6 +41,7 @@ if TYPE_CHECKING:
         ResultSet,
         Tag,
     )
+    from bs4.filter import ElementFilter
 
 
 @runtime_checkable
@@ -194,3 +196,13 @@ _StrainableAttributes: TypeAlias = Dict[str, _StrainableAttribute]
 _OneElement: TypeAlias = Union["PageElement", "Tag", "NavigableString"]
 _AtMostOneElement: TypeAlias = Optional[_OneElement]
 _QueryResults: TypeAlias = "ResultSet[_OneElement]"
+
+#: The parse_only argument to the BeautifulSoup constructor may be a
+#: single ElementFilter, or a number of them. A number of filters may
+#: be labelled by putting them in a dictionary; otherwise each one is
+#: labelled with its position in the sequence.
+_ParseOnly: TypeAlias = Union[
+    "ElementFilter",
+    Mapping[Hashable, "ElementFilter"],
+    Iterable["ElementFilter"],
+]
@@ -0,0 +1,260 @@
+"""Parse a large number of documents in parallel, using a pool of
+worker processes.
+
+Parsing is CPU-bound, and because of the global interpreter lock,
+running several `BeautifulSoup` constructors in threads doesn't make
+anything faster. `parse_many` spreads the work over a
+`concurrent.futures.ProcessPoolExecutor` instead::
+
+    from bs4.batch import parse_many
+
+    def title(soup):
+        return soup.title.string if soup.title else None
+
+    for page_title in parse_many(pages, "html.parser", extract=title):
+        print(page_title)
+
+The ``extract`` function runs inside the worker process, so the only
+thing sent back to your process is whatever it returns. That's much
+cheaper than sending back an entire `BeautifulSoup` object.
+"""
+
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "parse_many",
+]
+
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+import os
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from bs4.exceptions import FeatureNotFound
+
+if TYPE_CHECKING:
+    from bs4._typing import _IncomingMarkup
+    from bs4.builder import TreeBuilder
+    from bs4.filter import ElementFilter
+
+
+class _Worker(object):
+    """Everything a worker process needs to parse documents.
+
+    A worker creates a single `TreeBuilder` and uses it for every
+    document it parses.
+    """
+
+    builder: TreeBuilder
+    parse_only: Optional[ElementFilter]
+    extract: Optional[Callable[[BeautifulSoup], Any]]
+
+    def __init__(
+        self,
+        features: Sequence[str],
+        parse_only: Optional[ElementFilter],
+        extract: Optional[Callable[[BeautifulSoup], Any]],
+        builder_kwargs: Dict[str, Any],
+    ):
+        builder_class = builder_registry.lookup(*features)
+        if builder_class is None:
+            raise FeatureNotFound(
+                "Couldn't find a tree builder with the features you "
+                "requested: %s. Do you need to install a parser library?"
+                % ",".join(features)
+            )
+        self.builder = builder_class(**builder_kwargs)
+        self.parse_only = parse_only
+        self.extract = extract
+
+    def parse(self, markup: _IncomingMarkup) -> Any:
+        """Parse a single document and run the extract function on it."""
+        soup = BeautifulSoup(markup, builder=self.builder, parse_only=self.parse_only)
+        if self.extract is None:
+            return soup
+        return self.extract(soup)
+
+    def parse_chunk(self, chunk: List[_IncomingMarkup]) -> List[Any]:
+        """Parse a number of documents."""
+        return [self.parse(markup) for markup in chunk]
+
+
+#: The `_Worker` for the current worker process.
+_worker: Optional[_Worker] = None
+
+
+def _initialize_worker(*args: Any) -> None:
+    """Set up a worker process; called by the `ProcessPoolExecutor`."""
+    global _worker
+    _worker = _Worker(*args)
+
+
+def _parse_chunk(chunk: List[_IncomingMarkup]) -> List[Any]:
+    """Parse a number of documents in a worker process."""
+    assert _worker is not None
+    return _worker.parse_chunk(chunk)
+
+
+def _chunks(
+    documents: Iterable[_IncomingMarkup], chunk_size: int
+) -> Iterator[Tuple[int, List[_IncomingMarkup]]]:
+    """Split an iterable of documents into lists of at most ``chunk_size``
+    documents, each with the index of its first document.
+    """
+    chunk: List[_IncomingMarkup] = []
+    start = 0
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) >= chunk_size:
+            yield start, chunk
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+def _completed(pending: Dict[Future[List[Any]], int]) -> Iterator[Tuple[int, Any]]:
+    """Wait for at least one chunk to be parsed, then yield
+    ``(index, result)`` 2-tuples for every chunk that's done.
+
+    :param pending: Maps each unfinished `Future` to the index of the
+        first document in its chunk. Finished futures are removed.
+    """
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        start = pending.pop(future)
+        for i, result in enumerate(future.result()):
+            yield start + i, result
+
+
+def parse_many(
+    documents: Iterable[_IncomingMarkup],
+    features: Optional[Union[str, Sequence[str]]] = None,
+    parse_only: Optional[ElementFilter] = None,
+    extract: Optional[Callable[[BeautifulSoup], Any]] = None,
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    chunk_size: int = 16,
+    **kwargs: Any,
+) -> Iterator[Any]:
+    """Parse a number of documents in parallel.
+
+    Documents are read from ``documents`` in chunks as workers become
+    available, so ``documents`` can be a generator that never runs
+    out.
+
+    :param documents: The documents to parse. Each one may be a
+        string, a bytestring, or an open filehandle, as with the
+        `BeautifulSoup` constructor. (But a filehandle can't be sent to
+        another process, so you'll usually want to read it first.)
+    :param features: The parser to use, as with the `BeautifulSoup`
+        constructor.
+    :param parse_only: An `ElementFilter` restricting which parts of
+        each document are parsed.
+    :param extract: A function that's called, in the worker process,
+        on each `BeautifulSoup` object. Its return value is what gets
+        sent back to this process. It must be picklable, so it needs
+        to be defined at the top level of a module. If this is None,
+        the `BeautifulSoup` objects themselves are sent back, which is
+        a lot slower.
+    :param workers: The number of worker processes to use. The default
+        is the number of CPUs. If this is 0, the documents are parsed
+        one at a time in the current process, which can be useful when
+        debugging an ``extract`` function.
+    :param ordered: If True, results are yielded in the same order as
+        ``documents``. If False, ``(index, result)`` 2-tuples are yielded
+        as soon as they're ready, where ``index`` is the position of the
+        corresponding document in ``documents``.
+    :param chunk_size: The number of documents to send to a worker
+        process at once. A bigger chunk means less overhead but more
+        work in progress at any one time.
+    :param kwargs: Keyword arguments for the constructor of the
+        `TreeBuilder` used in each worker process.
+
+    :yield: The result of calling ``extract`` on each document, or the
+        `BeautifulSoup` object itself if there is no ``extract``.
+    :raise FeatureNotFound: If the requested parser isn't available.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 0:
+        raise ValueError("workers can't be negative.")
+    if isinstance(features, str):
+        features = [features]
+    if not features:
+        features = BeautifulSoup.DEFAULT_BUILDER_FEATURES
+    worker_args = (features, parse_only, extract, kwargs)
+    chunks = _chunks(documents, chunk_size)
+
+    if workers == 0:
+        worker = _Worker(*worker_args)
+        for start, chunk in chunks:
+            for i, markup in enumerate(chunk):
+                result = worker.parse(markup)
+                yield result if ordered else (start + i, result)
+        return
+
+    # Make sure the parser is actually available before starting any
+    # worker processes.
+    if builder_registry.lookup(*features) is None:
+        raise FeatureNotFound(
+            "Couldn't find a tree builder with the features you "
+            "requested: %s. Do you need to install a parser library?"
+            % ",".join(features)
+        )
+
+    # Keep every worker busy, with one chunk waiting for each worker,
+    # but don't read any further ahead in ``documents`` than that.
+    max_pending = workers * 2
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_initialize_worker,
+        initargs=worker_args,
+    )
+    try:
+        if ordered:
+            queue: Deque[Future[List[Any]]] = deque()
+            for start, chunk in chunks:
+                queue.append(executor.submit(_parse_chunk, chunk))
+                if len(queue) >= max_pending:
+                    yield from queue.popleft().result()
+            while queue:
+                yield from queue.popleft().result()
+        else:
+            pending: Dict[Future[List[Any]], int] = {}
+            for start, chunk in chunks:
+                pending[executor.submit(_parse_chunk, chunk)] = start
+                if len(pending) >= max_pending:
+                    yield from _completed(pending)
+            while pending:
+                yield from _completed(pending)
+    finally:
+        # If we're stopping early, because of an error or because the
+        # caller stopped asking for results, there's no point in
+        # finishing the chunks that are still queued up.
+        executor.shutdown(wait=True, cancel_futures=True)
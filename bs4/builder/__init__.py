@@ -4,7 +4,10 @@ from __future__ import annotations
 __license__ = "MIT"
 
 from collections import defaultdict
+import importlib
+import importlib.util
 import re
+import threading
 from types import ModuleType
 from typing import (
     Any,
@@ -18,6 +21,7 @@ from typing import (
     Tuple,
     Type,
     TYPE_CHECKING,
+    Union,
 )
 import warnings
 import sys
@@ -30,13 +34,15 @@ from bs4.element import (
     RubyTextString,
     Stylesheet,
     Script,
+    Tag,
+    TagDescriptor,
     TemplateString,
     nonwhitespace_re,
 )
 
 # Exceptions were moved to their own module in 4.13. Import here for
 # backwards compatibility.
-from bs4.exceptions import ParserRejectedMarkup
+from bs4.exceptions import FeatureNotFound, ParserRejectedMarkup
 
 from bs4._typing import (
     _AttributeValues,
@@ -49,7 +55,6 @@ if TYPE_CHECKING:
     from bs4 import BeautifulSoup
     from bs4.element import (
         NavigableString,
-        Tag,
     )
     from bs4._typing import (
         _AttributeValue,
@@ -63,6 +68,7 @@ __all__ = [
     "HTMLTreeBuilder",
     "SAXTreeBuilder",
     "TreeBuilder",
+    "TreeBuilderPool",
     "TreeBuilderRegistry",
 ]
 
@@ -76,6 +82,7 @@ HTML_5 = "html5"
 
 __all__ = [
     "TreeBuilderRegistry",
+    "TreeBuilderPool",
     "TreeBuilder",
     "HTMLTreeBuilder",
     "DetectsXMLParsedAsHTML",
@@ -83,13 +90,53 @@ __all__ = [
     "ParserRejectedMarkup", # backwards compatibility only as of 4.13.0
 ]
 
+class _LazyTreeBuilder(object):
+    """Stands in for a `TreeBuilder` subclass in a `TreeBuilderRegistry`
+    until the subclass is actually needed, so that the module that
+    defines it (and the parser library that module uses) doesn't have
+    to be imported ahead of time.
+
+    :param module: The name of the module that defines the subclass.
+    :param name: The name of the subclass within that module.
+    :param features: The features of the subclass. These must be the
+        same as the subclass's `TreeBuilder.features`.
+    """
+
+    module: str
+    name: str
+    features: List[str]
+
+    def __init__(self, module: str, name: str, features: Iterable[str]):
+        self.module = module
+        self.name = name
+        self.features = list(features)
+
+    def load(self) -> Type[TreeBuilder]:
+        """Import the `TreeBuilder` subclass.
+
+        :raise ImportError: If the module, or the parser library it
+            uses, can't be imported.
+        """
+        module = importlib.import_module(self.module)
+        return cast(Type[TreeBuilder], getattr(module, self.name))
+
+    def __repr__(self) -> str:
+        return "<%s %s.%s>" % (self.__class__.__name__, self.module, self.name)
+
+
+_RegisteredTreeBuilder = Union[Type["TreeBuilder"], _LazyTreeBuilder]
+
+
 class TreeBuilderRegistry(object):
     """A way of looking up TreeBuilder subclasses by their name or by desired
     features.
     """
 
-    builders_for_feature: Dict[str, List[Type[TreeBuilder]]]
-    builders: List[Type[TreeBuilder]]
+    #: The registered builders, by feature. A builder registered with
+    #: `TreeBuilderRegistry.register_lazily` shows up as a
+    #: placeholder until `TreeBuilderRegistry.lookup` picks it.
+    builders_for_feature: Dict[str, List[_RegisteredTreeBuilder]]
+    builders: List[_RegisteredTreeBuilder]
 
     def __init__(self) -> None:
         self.builders_for_feature = defaultdict(list)
@@ -101,9 +148,24 @@ class TreeBuilderRegistry(object):
         :param treebuilder_class: A subclass of `TreeBuilder`. its
            `TreeBuilder.features` attribute should list its features.
         """
-        for feature in treebuilder_class.features:
-            self.builders_for_feature[feature].insert(0, treebuilder_class)
-        self.builders.insert(0, treebuilder_class)
+        self._register(treebuilder_class)
+
+    def register_lazily(self, module: str, name: str, features: Iterable[str]) -> None:
+        """Register a treebuilder without importing the module that
+        defines it. The module will be imported when `TreeBuilderRegistry.lookup`
+        picks the treebuilder. If it turns out that the module can't be
+        imported, the treebuilder is unregistered.
+
+        :param module: The name of the module that defines the treebuilder.
+        :param name: The name of the `TreeBuilder` subclass.
+        :param features: The features of the `TreeBuilder` subclass.
+        """
+        self._register(_LazyTreeBuilder(module, name, features))
+
+    def _register(self, treebuilder: _RegisteredTreeBuilder) -> None:
+        for feature in treebuilder.features:
+            self.builders_for_feature[feature].insert(0, treebuilder)
+        self.builders.insert(0, treebuilder)
 
     def lookup(self, *features: str) -> Optional[Type[TreeBuilder]]:
         """Look up a TreeBuilder subclass with the desired features.
@@ -114,6 +176,45 @@ class TreeBuilderRegistry(object):
         :return: A TreeBuilder subclass, or None if there's no
             registered subclass with all the requested features.
         """
+        treebuilder = self._lookup(*features)
+        if not isinstance(treebuilder, _LazyTreeBuilder):
+            return treebuilder
+
+        # This treebuilder hasn't been imported yet.
+        treebuilder_class: Optional[Type[TreeBuilder]]
+        try:
+            treebuilder_class = treebuilder.load()
+        except ImportError:
+            # Its module can't be imported after all, probably because
+            # the parser library is broken. Forget about it and look
+            # again.
+            treebuilder_class = None
+        self._replace(treebuilder, treebuilder_class)
+        if treebuilder_class is None:
+            return self.lookup(*features)
+        return treebuilder_class
+
+    def _replace(
+        self,
+        placeholder: _LazyTreeBuilder,
+        treebuilder_class: Optional[Type[TreeBuilder]],
+    ) -> None:
+        """Replace a placeholder with the real `TreeBuilder` subclass
+        everywhere it occurs, or remove it if there's no subclass.
+        """
+        for treebuilders in [self.builders] + list(self.builders_for_feature.values()):
+            for i, treebuilder in enumerate(treebuilders):
+                if treebuilder is placeholder:
+                    if treebuilder_class is None:
+                        del treebuilders[i]
+                    else:
+                        treebuilders[i] = treebuilder_class
+                    break
+
+    def _lookup(self, *features: str) -> Optional[_RegisteredTreeBuilder]:
+        """Find the registered treebuilder with the desired features,
+        which may be a placeholder.
+        """
         if len(self.builders) == 0:
             # There are no builders at all.
             return None
@@ -133,7 +234,7 @@ class TreeBuilderRegistry(object):
             feature = feature_list.pop()
             we_have_the_feature = self.builders_for_feature.get(feature, [])
             if len(we_have_the_feature) > 0:
-                if candidates is None:
+                if candidate_set is None:
                     candidates = we_have_the_feature
                     candidate_set = set(candidates)
                 else:
@@ -156,6 +257,69 @@ class TreeBuilderRegistry(object):
 builder_registry: TreeBuilderRegistry = TreeBuilderRegistry()
 
 
+class TreeBuilderPool(object):
+    """Hands out `TreeBuilder` objects that can be reused from one
+    document to the next.
+
+    When you pass a list of features into the `BeautifulSoup`
+    constructor, it looks up a `TreeBuilder` subclass and instantiates
+    it, and the lxml tree builders go on to create a new lxml parser.
+    For a small document this can take as long as the parsing itself.
+    Passing in a builder from a pool skips all of that::
+
+        pool = TreeBuilderPool()
+        for fragment in fragments:
+            soup = BeautifulSoup(fragment, builder=pool.acquire("lxml"))
+
+    A builder is never handed out while it's parsing a document,
+    including a document that's being fed to an `IncrementalParser`,
+    and each thread gets its own builders, so a pool can be shared
+    between threads.
+
+    :param registry: Where to look up `TreeBuilder` subclasses.
+    """
+
+    registry: TreeBuilderRegistry
+
+    def __init__(self, registry: Optional[TreeBuilderRegistry] = None):
+        self.registry = registry or builder_registry
+        self._local = threading.local()
+
+    def acquire(self, *features: str) -> TreeBuilder:
+        """Get a `TreeBuilder` with the desired features that isn't busy
+        parsing a document.
+
+        :param features: The features to look for, as with
+            `TreeBuilderRegistry.lookup`. Builders are created with
+            their default settings; to use different settings,
+            instantiate a `TreeBuilder` yourself and reuse it.
+        :raise FeatureNotFound: If no registered `TreeBuilder` subclass
+            has all of the features.
+        """
+        pool: Optional[Dict[Tuple[str, ...], List[TreeBuilder]]] = getattr(
+            self._local, "builders", None
+        )
+        if pool is None:
+            pool = self._local.builders = {}
+        builders = pool.get(features)
+        if builders is None:
+            builders = pool[features] = []
+        for builder in builders:
+            if builder.soup is None:
+                return builder
+
+        builder_class = self.registry.lookup(*features)
+        if builder_class is None:
+            raise FeatureNotFound(
+                "Couldn't find a tree builder with the features you "
+                "requested: %s. Do you need to install a parser library?"
+                % ",".join(features)
+            )
+        builder = builder_class()
+        builders.append(builder)
+        return builder
+
+
 class TreeBuilder(object):
     """Turn a textual document into a Beautiful Soup object tree.
 
@@ -239,6 +403,8 @@ class TreeBuilder(object):
         self.string_containers = string_containers
         self.attribute_dict_class = attribute_dict_class
         self.attribute_value_list_class = attribute_value_list_class
+        self._tag_descriptors: Dict[str, TagDescriptor] = {}
+        self._tag_descriptor_configuration: Optional[Tuple[Any, ...]] = None
 
     NAME: str = "[Unknown tree builder]"
     ALTERNATE_NAMES: Iterable[str] = []
@@ -247,6 +413,11 @@ class TreeBuilder(object):
     is_xml: bool = False
     picklable: bool = False
 
+    #: Whether this builder can parse a document that arrives a piece
+    #: at a time, through `TreeBuilder.begin_feed`,
+    #: `TreeBuilder.feed_chunk` and `TreeBuilder.end_feed`.
+    incremental: bool = False
+
     soup: Optional[BeautifulSoup]  #: :meta private:
 
     #: A tag will be considered an empty-element
@@ -285,6 +456,29 @@ class TreeBuilder(object):
         """
         self.soup = soup
 
+        # The builder's configuration may have changed since the
+        # last document was parsed. If it hasn't, the tag descriptors
+        # can be used again.
+        configuration = self._configuration_for_tag_descriptors()
+        if configuration != self._tag_descriptor_configuration:
+            self._tag_descriptors.clear()
+            self._tag_descriptor_configuration = configuration
+
+    def _configuration_for_tag_descriptors(self) -> Tuple[Any, ...]:
+        """Summarize the parts of this builder's configuration that go
+        into a `TagDescriptor`.
+        """
+        empty_element_tags = self.empty_element_tags
+        return (
+            None if empty_element_tags is None else frozenset(empty_element_tags),
+            frozenset(self.preserve_whitespace_tags or ()),
+            tuple(self.string_containers.items()),
+            # TagDescriptors share these objects, so changes made to
+            # them don't matter, but replacing them does.
+            id(self.cdata_list_attributes),
+            id(self.preserve_whitespace_tags),
+        )
+
     def reset(self) -> None:
         """Do any work necessary to reset the underlying parser
         for a new document.
@@ -316,10 +510,56 @@ class TreeBuilder(object):
             return True
         return tag_name in self.empty_element_tags
 
+    def tag_descriptor(self, tag_name: str) -> TagDescriptor:
+        """Find out how this builder treats tags with a given name.
+
+        The answer is calculated once per tag name and shared by every
+        `Tag` with that name.
+
+        :param tag_name: The name of a markup tag.
+        """
+        descriptor = self._tag_descriptors.get(tag_name)
+        if descriptor is None:
+            descriptor = TagDescriptor.from_builder(self, tag_name, shared=True)
+            self._tag_descriptors[tag_name] = descriptor
+        return descriptor
+
     def feed(self, markup: _RawMarkup) -> None:
         """Run incoming markup through some parsing process."""
         raise NotImplementedError()
 
+    def begin_feed(
+        self,
+        user_specified_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ) -> None:
+        """Get ready to parse a document that will be passed into
+        `TreeBuilder.feed_chunk` a piece at a time.
+
+        This is only called if `TreeBuilder.incremental` is True.
+
+        :param user_specified_encoding: The user asked to use this
+            encoding for any bytestrings.
+        :param exclude_encodings: The user asked _not_ to use any of
+            these encodings.
+        """
+        raise NotImplementedError()
+
+    def feed_chunk(self, markup: _RawMarkup) -> None:
+        """Run the next piece of a document through the parser.
+
+        :param markup: A string or bytestring.
+        :raise ParserRejectedMarkup: If the parser can't deal with the
+            markup.
+        """
+        raise NotImplementedError()
+
+    def end_feed(self) -> None:
+        """Tell the parser that the whole document has been passed
+        into `TreeBuilder.feed_chunk`.
+        """
+        raise NotImplementedError()
+
     def prepare_markup(
         self,
         markup: _RawMarkup,
@@ -734,8 +974,9 @@ class DetectsXMLParsedAsHTML(object):
         This is much less reliable than doing the check while parsing,
         but some of the tree builders can't do that.
 
-        :param stacklevel: The stacklevel of the code calling this\
-         function.
+        :param stacklevel: Ignored. The warning is attributed to the
+         first line of code outside Beautiful Soup, however the check
+         was reached.
 
         :return: True if the markup looks like non-XHTML XML, False
          otherwise.
@@ -755,19 +996,52 @@ class DetectsXMLParsedAsHTML(object):
             ) and not cls.LOOKS_LIKE_HTML.search(markup)
 
         if looks_like_xml:
-            cls._warn(stacklevel=stacklevel + 2)
+            cls._warn()
             return True
         return False
 
     @classmethod
-    def _warn(cls, stacklevel: int = 5) -> None:
+    def _warn(cls) -> None:
         """Issue a warning about XML being parsed as HTML."""
         warnings.warn(
             XMLParsedAsHTMLWarning.MESSAGE,
             XMLParsedAsHTMLWarning,
-            stacklevel=stacklevel,
+            stacklevel=cls._caller_stacklevel(),
         )
 
+    #: Top-level modules, other than Beautiful Soup itself, whose code
+    #: can be on the stack when a warning is issued, because they run
+    #: a parser that calls back into Beautiful Soup.
+    #:
+    #: :meta private:
+    PARSER_MODULES: Set[str] = {"_markupbase", "html", "html5lib", "lxml"}
+
+    @classmethod
+    def _caller_stacklevel(cls) -> int:
+        """Find the stacklevel that attributes a warning issued by
+        `DetectsXMLParsedAsHTML._warn` to the code that called into
+        Beautiful Soup.
+
+        There are many ways to start a parse (the constructor,
+        `BeautifulSoup.incremental`, `iterparse`, ``parse_only``...),
+        and each puts a different number of frames on the stack, so
+        the frames are counted rather than hard-coded.
+        """
+        # Level 1 is _warn itself.
+        stacklevel = 1
+        frame = sys._getframe(1)
+        while frame.f_back is not None:
+            module = frame.f_globals.get("__name__", "")
+            if module == "bs4" or module.startswith("bs4."):
+                # Beautiful Soup's own test suite counts as calling code.
+                if module.startswith("bs4.tests"):
+                    break
+            elif module.split(".", 1)[0] not in cls.PARSER_MODULES:
+                break
+            frame = frame.f_back
+            stacklevel += 1
+        return stacklevel
+
     def _initialize_xml_detector(self) -> None:
         """Call this method before parsing a document."""
         self._first_processing_instruction = None
@@ -815,7 +1089,7 @@ class DetectsXMLParsedAsHTML(object):
             # We encountered an XML declaration and then a tag other
             # than 'html'. This is a reliable indicator that a
             # non-XHTML document is being parsed as XML.
-            self._warn(stacklevel=10)
+            self._warn()
 
 
 def register_treebuilders_from(module: ModuleType) -> None:
@@ -831,6 +1105,37 @@ def register_treebuilders_from(module: ModuleType) -> None:
             this_module.builder_registry.register(obj)
 
 
+#: Treebuilders that are registered without being imported, since
+#: importing the parser libraries they use takes a while. Each one is
+#: only registered if its parser library is installed.
+_lazy_treebuilders: Dict[str, _LazyTreeBuilder] = {}
+
+
+def _register_lazily_if_installed(
+    library: str, module: str, names_and_features: List[Tuple[str, List[str]]]
+) -> None:
+    if importlib.util.find_spec(library) is None:
+        # They don't have this parser library installed.
+        return
+    for name, features in names_and_features:
+        placeholder = _LazyTreeBuilder(module, name, features)
+        builder_registry._register(placeholder)
+        _lazy_treebuilders[name] = placeholder
+        __all__.append(name)
+
+
+def __getattr__(name: str) -> Any:
+    # Importing a treebuilder from this module imports its parser
+    # library.
+    placeholder = _lazy_treebuilders.get(name)
+    if placeholder is not None:
+        try:
+            return placeholder.load()
+        except ImportError:
+            pass
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Builders are registered in reverse order of priority, so that custom
 # builder registrations will take precedence. In general, we want lxml
 # to take precedence over html5lib, because it's faster. And we only
@@ -838,17 +1143,16 @@ def register_treebuilders_from(module: ModuleType) -> None:
 from . import _htmlparser # noqa: E402
 
 register_treebuilders_from(_htmlparser)
-try:
-    from . import _html5lib
-
-    register_treebuilders_from(_html5lib)
-except ImportError:
-    # They don't have html5lib installed.
-    pass
-try:
-    from . import _lxml
-
-    register_treebuilders_from(_lxml)
-except ImportError:
-    # They don't have lxml installed.
-    pass
+_register_lazily_if_installed(
+    "html5lib",
+    "bs4.builder._html5lib",
+    [("HTML5TreeBuilder", ["html5lib", PERMISSIVE, HTML_5, HTML])],
+)
+_register_lazily_if_installed(
+    "lxml",
+    "bs4.builder._lxml",
+    [
+        ("LXMLTreeBuilderForXML", ["lxml-xml", "lxml", XML, FAST, PERMISSIVE]),
+        ("LXMLTreeBuilder", ["lxml-html", "lxml", HTML, FAST, PERMISSIVE]),
+    ],
+)
@@ -10,6 +10,7 @@ from typing import (
     cast,
     Dict,
     Iterable,
+    List,
     Optional,
     Sequence,
     TYPE_CHECKING,
@@ -104,12 +105,12 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
             if variable:
                 warnings.warn(
                     f"You provided a value for {name}, but the html5lib tree builder doesn't support {name}.",
-                    stacklevel=3,
+                    stacklevel=4,
                 )
 
         # html5lib only parses HTML, so if it's given XML that's worth
         # noting.
-        DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=3)
+        DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup)
 
         yield (markup, None, None, False)
 
@@ -121,7 +122,7 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
         if self.soup is not None and self.soup.parse_only is not None:
             warnings.warn(
                 "You provided a value for parse_only, but the html5lib tree builder doesn't support parse_only. The entire document will be parsed.",
-                stacklevel=4,
+                stacklevel=5,
             )
 
         # self.underlying_builder is probably None now, but it'll be set
@@ -138,6 +139,17 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
 
         doc = parser.parse(markup, **extra_kwargs)
 
+        # html5lib builds the tree itself, so tags that are meant to
+        # be dropped can only be taken out once it's done.
+        if doc.drop_tags:
+            doc.remove_all(doc.find_all(sorted(doc.drop_tags)), decompose=True)
+
+        # For the same reason, html5lib might add more text onto the
+        # end of a string at any time, so strings that are nothing but
+        # whitespace can't be left out until it's done.
+        if not doc.keep_whitespace_nodes:
+            doc.remove_all(self._whitespace_strings(doc))
+
         # Set the character encoding detected by the tokenizer.
         if isinstance(markup, str):
             # We need to special-case this because html5lib sets
@@ -151,6 +163,27 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
             doc.original_encoding = original_encoding
         self.underlying_builder.parser = None
 
+    def _whitespace_strings(self, soup: "BeautifulSoup") -> List[NavigableString]:
+        """Find the strings in a parse tree that contain nothing but
+        whitespace, outside of tags where whitespace matters.
+        """
+        spaces = soup.ASCII_SPACES
+        found = []
+        tags: List[Tag] = [soup]
+        while tags:
+            tag = tags.pop()
+            for child in tag.contents:
+                if isinstance(child, Tag):
+                    descriptor = self.tag_descriptor(child.name)
+                    if (
+                        not descriptor.preserves_whitespace
+                        and descriptor.string_container is None
+                    ):
+                        tags.append(child)
+                elif type(child) is NavigableString and not child.strip(spaces):
+                    found.append(child)
+        return found
+
     def create_treebuilder(
         self, namespaceHTMLElements: bool
     ) -> "TreeBuilderForHtml5lib":
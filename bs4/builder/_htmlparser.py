@@ -9,16 +9,23 @@ __all__ = [
     "HTMLParserTreeBuilder",
 ]
 
+import codecs
+from collections import Counter
 from html.parser import HTMLParser
+import re
 
 from typing import (
     Any,
     Callable,
     cast,
+    Counter as CounterType,
     Dict,
+    FrozenSet,
     Iterable,
     List,
     Optional,
+    Pattern,
+    Set,
     TYPE_CHECKING,
     Tuple,
     Type,
@@ -33,7 +40,7 @@ from bs4.element import (
     Doctype,
     ProcessingInstruction,
 )
-from bs4.dammit import EntitySubstitution, UnicodeDammit
+from bs4.dammit import EncodingDetector, EntitySubstitution, UnicodeDammit
 
 from bs4.builder import (
     DetectsXMLParsedAsHTML,
@@ -43,6 +50,11 @@ from bs4.builder import (
 )
 
 from bs4.exceptions import ParserRejectedMarkup
+from bs4.filter import (
+    ElementFilter,
+    ElementFilterUnion,
+    SoupStrainer,
+)
 
 if TYPE_CHECKING:
     from bs4 import BeautifulSoup
@@ -93,19 +105,21 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         self.attribute_dict_class = soup.builder.attribute_dict_class
         HTMLParser.__init__(self, *args, **kwargs)
 
-        # Keep a list of empty-element tags that were encountered
+        # Keep count of empty-element tags that were encountered
         # without an explicit closing tag. If we encounter a closing tag
         # of this type, we'll associate it with one of those entries.
         #
         # This isn't a stack because we don't care about the
-        # order. It's a list of closing tags we've already handled and
-        # will ignore, assuming they ever show up.
-        self.already_closed_empty_element = []
+        # order. It counts the closing tags we've already handled and
+        # will ignore, assuming they ever show up. (It's a Counter
+        # rather than a list because a large document can have a
+        # great many of these tags.)
+        self.already_closed_empty_element = Counter()
 
         self._initialize_xml_detector()
 
     on_duplicate_attribute: Union[str, _DuplicateAttributeHandler]
-    already_closed_empty_element: List[str]
+    already_closed_empty_element: CounterType[str]
     soup: BeautifulSoup
 
     def error(self, message: str) -> None:
@@ -196,7 +210,7 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
 
             # But we might encounter an explicit closing tag for this tag
             # later on. If so, we want to ignore it.
-            self.already_closed_empty_element.append(name)
+            self.already_closed_empty_element[name] += 1
 
         if self._root_tag_name is None:
             self._root_tag_encountered(name)
@@ -215,7 +229,11 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
             # We've already called handle_endtag() for it, so just
             # check it off the list.
             # print("ALREADY CLOSED", name)
-            self.already_closed_empty_element.remove(name)
+            already_closed = self.already_closed_empty_element
+            if already_closed[name] == 1:
+                del already_closed[name]
+            else:
+                already_closed[name] -= 1
         else:
             self.soup.handle_endtag(name)
 
@@ -327,6 +345,355 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         self.soup.endData(ProcessingInstruction)
 
 
+class _Prescanner(object):
+    """Skips over the parts of a document that a ``parse_only``
+    filter is certain to reject, so that html.parser never has to
+    tokenize them.
+
+    This only works if the filter looks at nothing but tag names.
+    Outside of the tags it lets in, such a filter rejects everything,
+    so the only markup that matters is the markup that starts with a
+    tag it wants, up to the point where that tag is closed.
+
+    Finding candidate start tags is done with a regular expression,
+    which is much faster than html.parser, but it can't tell whether
+    a candidate is really the start of a tag: it might be inside a
+    comment, a <script> tag, or an attribute value. So the markup
+    between candidates is checked, a tag or comment at a time, to
+    make sure html.parser would be back in its normal state by the
+    time the candidate comes up. If there's anything in there that
+    html.parser might handle differently (different versions of
+    Python disagree on some edge cases), the rest of the document is
+    fed into html.parser as usual.
+
+    Finding where a tag ends is left to html.parser itself: markup is
+    fed in through the next end tag that might close the tag, and
+    this keeps happening until nothing is left open.
+
+    :param names: The tag names the filter is interested in.
+    """
+
+    #: A start tag whose end is in the same place no matter which
+    #: version of html.parser tokenizes it. There is no whitespace
+    #: around the equals sign of an attribute, and quotes only show
+    #: up around attribute values. Anything stranger doesn't match.
+    #:
+    #: An unquoted attribute value has to be followed by something
+    #: that can't be part of the value. Otherwise, in something like
+    #: ``a=b/c/d``, there would be many ways to split up the value and
+    #: attribute names, and a tag that didn't match would take
+    #: exponential time to rule out.
+    START_TAG: Pattern[str] = re.compile(
+        r"""<([a-zA-Z][^\t\n\r\f />\x00<"'=]*)"""
+        r"""(?:[\t\n\r\f /]+[^\t\n\r\f />=<"'`]+"""
+        r"""(?:=(?:"[^"]*"|'[^']*'|[^\t\n\r\f >"'<=`]+(?![^\t\n\r\f >"'<=`])))?)*"""
+        r"""[\t\n\r\f /]*>"""
+    )
+
+    #: Something that might end a comment, depending on the version
+    #: of html.parser.
+    COMMENT_END: Pattern[str] = re.compile(r"--(?:\s*|!)>")
+
+    #: The contents of these tags are never parsed as markup.
+    RAW_TEXT_TAGS: Set[str] = {"script", "style"}
+
+    #: Recent versions of html.parser treat the contents of these tags
+    #: as text; older versions parse them as markup. It doesn't
+    #: matter which, so long as the contents contain no markup.
+    MAYBE_TEXT_TAGS: Set[str] = {
+        "iframe",
+        "noembed",
+        "noframes",
+        "noscript",
+        "textarea",
+        "title",
+        "xmp",
+    }
+
+    #: Recent versions of html.parser treat everything after this tag
+    #: as text.
+    PLAINTEXT_TAG: str = "plaintext"
+
+    names: Set[str]
+    candidate_start: Pattern[str]
+    candidate_end: Pattern[str]
+    _skippable: Dict[FrozenSet[str], Pattern[str]]
+
+    def __init__(self, names: Iterable[str]):
+        self.names = set(names)
+        alternatives = "|".join(
+            re.escape(name) for name in sorted(self.names, key=len, reverse=True)
+        )
+        # A match might not be a tag that html.parser would let
+        # through (the name could continue with a character that
+        # isn't alphanumeric), but that's fine: the filter will
+        # reject it. What matters is that every tag that *would* be
+        # let through is found.
+        self.candidate_start = re.compile(
+            "<(?:%s)(?![a-zA-Z0-9])" % alternatives, re.I
+        )
+        self.candidate_end = re.compile(
+            "</(?:%s)(?![a-zA-Z0-9])" % alternatives, re.I
+        )
+        self._skippable = {}
+
+    @classmethod
+    def for_soup(cls, soup: BeautifulSoup) -> Optional[_Prescanner]:
+        """Make a `_Prescanner` for the given `BeautifulSoup` object's
+        ``parse_only`` filter, if it only looks at tag names.
+        """
+        if soup.parse_only is None or getattr(soup, "replacer", None) is not None:
+            # A SoupReplacer can rename a tag before the filter
+            # sees it.
+            return None
+        names = cls._tag_names(soup.parse_only)
+        if not names:
+            return None
+        # A tag that's being dropped has to be seen, so that anything
+        # inside it is dropped along with it.
+        return cls(names | soup.drop_tags)
+
+    @classmethod
+    def _tag_names(cls, parse_only: ElementFilter) -> Optional[Set[str]]:
+        """Find the tag names that would get a tag past a
+        ``parse_only`` filter, assuming that's all it looks at.
+        """
+        if type(parse_only) is ElementFilterUnion:
+            names: Set[str] = set()
+            for element_filter in parse_only.filters.values():
+                filter_names = cls._tag_names(element_filter)
+                if filter_names is None:
+                    return None
+                names.update(filter_names)
+            return names
+        if type(parse_only) is not SoupStrainer:
+            return None
+        if parse_only.attribute_rules or parse_only.string_rules:
+            return None
+        names = set()
+        for rule in parse_only.name_rules:
+            if rule.string is None or not rule.string:
+                return None
+            names.add(rule.string)
+        return names
+
+    def feed(self, parser: BeautifulSoupHTMLParser, markup: str) -> None:
+        """Feed the parts of ``markup`` that might make it past the
+        filter into ``parser``.
+        """
+        track_position = parser.soup.builder.store_line_numbers
+        pos = 0
+        end = len(markup)
+        while pos < end:
+            start = self._skip(markup, pos, parser.already_closed_empty_element)
+            if start is None:
+                # We can't be sure what html.parser would make of
+                # the next bit of markup, so give it everything.
+                break
+            if start >= end:
+                return
+            if track_position:
+                # Tell html.parser where it is in the document, as
+                # though it had seen the markup that was skipped.
+                newlines = markup.count("\n", pos, start)
+                if newlines:
+                    parser.lineno += newlines
+                    parser.offset = start - markup.rindex("\n", pos, start) - 1
+                else:
+                    parser.offset += start - pos
+            pos = start
+
+            # Feed in the candidate start tag, and then everything up to
+            # and including each end tag that might close it, until
+            # html.parser says that no tags are open.
+            match = self.START_TAG.match(markup, pos)
+            if match is None:
+                next_pos = markup.find(">", pos)
+                next_pos = end if next_pos == -1 else next_pos + 1
+            else:
+                next_pos = match.end()
+            while True:
+                parser.feed(markup[pos:next_pos])
+                pos = next_pos
+                if pos >= end or self._at_top_level(parser):
+                    break
+                match = self.candidate_end.search(markup, pos)
+                next_pos = end if match is None else markup.find(">", match.end())
+                next_pos = end if next_pos == -1 else next_pos + 1
+        if pos < end:
+            parser.feed(markup[pos:])
+
+    @classmethod
+    def _at_top_level(cls, parser: BeautifulSoupHTMLParser) -> bool:
+        """Is html.parser in its normal state, with no tags open?"""
+        return (
+            len(parser.soup.tagStack) <= 1
+            and not parser.soup._drop_stack
+            and not parser.rawdata
+            and getattr(parser, "cdata_elem", None) is None
+        )
+
+    def _skip(
+        self, markup: str, pos: int, already_closed: Iterable[str]
+    ) -> Optional[int]:
+        """Find the next candidate start tag, and make sure the markup
+        leading up to it can be skipped.
+
+        :param pos: A position in ``markup`` where html.parser would be
+            in its normal state, with no tags open.
+        :param already_closed: The names in
+            `BeautifulSoupHTMLParser.already_closed_empty_element`.
+            A tag that might check one of these names off the list
+            can't be skipped.
+        :return: The position of the candidate start tag, or of a tag
+            that can't be skipped; the length of ``markup`` if there
+            are no more candidates; or None if it's not certain what
+            html.parser would make of the markup before the next
+            candidate.
+        """
+        end = len(markup)
+        skippable = self._skippable_markup(already_closed)
+        while True:
+            match = self.candidate_start.search(markup, pos)
+            limit = end if match is None else match.start()
+            while True:
+                # Skip over the common, unproblematic cases all at
+                # once, then take a closer look at whatever's next.
+                skipped = skippable.match(markup, pos, limit)
+                if skipped is not None:
+                    pos = skipped.end()
+                lt = markup.find("<", pos, limit)
+                if lt == -1:
+                    return limit
+                next_pos = self._skip_markup(markup, lt)
+                if next_pos is None:
+                    return None
+                if already_closed and next_pos - lt > 1:
+                    text = markup[lt:next_pos].lower()
+                    for name in already_closed:
+                        if name in text:
+                            return lt
+                pos = next_pos
+                if pos > limit:
+                    # The candidate is inside a comment, or
+                    # something like that. Look for the next one.
+                    break
+
+    def _skippable_markup(self, already_closed: Iterable[str]) -> Pattern[str]:
+        """Get a regular expression that matches text, comments,
+        declarations, and tags that can definitely be skipped, given
+        the `BeautifulSoupHTMLParser.already_closed_empty_element`
+        list. Its matches are always a subset of what `_skip_markup`
+        would skip.
+        """
+        key = frozenset(already_closed)
+        pattern = self._skippable.get(key)
+        if pattern is not None:
+            return pattern
+
+        special_tags = "|".join(
+            sorted(self.RAW_TEXT_TAGS | self.MAYBE_TEXT_TAGS | {self.PLAINTEXT_TAG})
+        )
+        start_tag = self.START_TAG.pattern.replace(
+            "<(", "<(?!(?i:%s)(?![a-zA-Z0-9]))(?:" % special_tags, 1
+        )
+        if key:
+            # An end tag, or a tag that might be an empty-element tag,
+            # might check a name off the list.
+            start_tag = start_tag.replace(r"[\t\n\r\f /]*>", r"[\t\n\r\f ]*>")
+            end_tag = r"""</(?:(?!(?i:%s))[^<>"'])*>""" % "|".join(
+                re.escape(name) for name in sorted(key)
+            )
+        else:
+            end_tag = r"""</[^<>"']*>"""
+        pattern = self._skippable[key] = re.compile(
+            "(?:%s)*"
+            % "|".join(
+                [
+                    # Text.
+                    "[^<]+",
+                    "<(?![a-zA-Z/!?])",
+                    # A comment with no "--" in it.
+                    "<!--(?!-?>)(?:[^-]|-(?!-))*-->",
+                    # A declaration or bogus comment.
+                    r"<!(?![-\[])[^>]*>",
+                    start_tag,
+                    end_tag,
+                ]
+            )
+        )
+        return pattern
+
+    def _skip_markup(self, markup: str, pos: int) -> Optional[int]:
+        """Find the end of the markup that starts with the "<" at
+        ``pos``.
+
+        :return: The position just after the markup, or None if
+            html.parser's idea of where it ends is uncertain.
+        """
+        if markup.startswith("<!--", pos):
+            if markup.startswith("<!-->", pos) or markup.startswith("<!--->", pos):
+                return None
+            comment_end = self.COMMENT_END.search(markup, pos + 4)
+            if comment_end is None or comment_end.group(0) != "-->":
+                return None
+            return comment_end.end()
+        if markup.startswith("<![", pos) or markup.startswith("<?", pos):
+            # Marked sections are handled differently by different
+            # versions of html.parser. Processing instructions are
+            # rare, and html.parser needs to see them to spot XML
+            # documents.
+            return None
+        if markup.startswith("<!", pos):
+            return self._end_of(markup, pos + 2)
+        if markup.startswith("</", pos):
+            close = self._end_of(markup, pos + 2)
+            if close is None or markup.find('"', pos, close) != -1:
+                return None
+            if markup.find("'", pos, close) != -1:
+                return None
+            return close
+        if not markup[pos + 1 : pos + 2].isalpha() or not markup[pos + 1].isascii():
+            # This "<" is just text.
+            return pos + 1
+
+        match = self.START_TAG.match(markup, pos)
+        if match is None:
+            return None
+        name = match.group(1).lower()
+        if name not in self.RAW_TEXT_TAGS and name not in self.MAYBE_TEXT_TAGS:
+            if name == self.PLAINTEXT_TAG:
+                return None
+            return match.end()
+        if match.group(0).endswith("/>"):
+            return None
+
+        # Find the end tag. Depending on the version of html.parser,
+        # it might be allowed to have whitespace after the "</", or
+        # more stuff after the tag name; neither is allowed here.
+        if name in self.RAW_TEXT_TAGS:
+            end_tag = re.compile(r"</\s*%s" % name, re.I).search(markup, match.end())
+            if end_tag is None:
+                return None
+            close = end_tag.start()
+        else:
+            close = markup.find("<", match.end())
+            if close == -1:
+                return None
+        end_tag = re.compile(r"</%s[\t\n\r\f ]*>" % name, re.I).match(markup, close)
+        if end_tag is None or not end_tag.group(0).isascii():
+            return None
+        return end_tag.end()
+
+    @classmethod
+    def _end_of(cls, markup: str, pos: int) -> Optional[int]:
+        """Find the position just after the next ">"."""
+        close = markup.find(">", pos)
+        if close == -1:
+            return None
+        return close + 1
+
+
 class HTMLParserTreeBuilder(HTMLTreeBuilder):
     """A Beautiful soup `bs4.builder.TreeBuilder` that uses the
     :py:class:`html.parser.HTMLParser` parser, found in the Python
@@ -344,6 +711,26 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
     #: original file is the source of an element.
     TRACKS_LINE_NUMBERS: bool = True
 
+    #: HTMLParser can be fed a document a piece at a time.
+    incremental: bool = True
+
+    #: When a document is fed in a piece at a time as bytestrings, this
+    #: many bytes are collected before deciding which encoding the
+    #: document is in. This is the amount of markup
+    #: `EncodingDetector.find_declared_encoding` looks at.
+    ENCODING_SNIFF_SIZE: int = 2048
+
+    #: If ``parse_only`` is a `SoupStrainer` that only looks at tag
+    #: names, skip over the parts of the document it would reject
+    #: without running them through HTMLParser. This doesn't change
+    #: the result, only how long it takes to get it.
+    PRESCAN_PARSE_ONLY: bool = True
+
+    _incremental_parser: Optional[BeautifulSoupHTMLParser]
+    _incremental_decoder: Optional[codecs.IncrementalDecoder]
+    _incremental_encodings: Tuple[Optional[_Encoding], Optional[_Encodings]]
+    _undecoded: bytes
+
     def __init__(
         self,
         parser_args: Optional[Iterable[Any]] = None,
@@ -462,13 +849,138 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
         # is set.
         assert self.soup is not None
         parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
+        prescanner = None
+        if self.PRESCAN_PARSE_ONLY:
+            prescanner = _Prescanner.for_soup(self.soup)
 
         try:
-            parser.feed(markup)
+            if prescanner is None:
+                parser.feed(markup)
+            else:
+                prescanner.feed(parser, markup)
             parser.close()
         except AssertionError as e:
             # html.parser raises AssertionError in rare cases to
             # indicate a fatal problem with the markup, especially
             # when there's an error in the doctype declaration.
             raise ParserRejectedMarkup(e)
-        parser.already_closed_empty_element = []
+        parser.already_closed_empty_element = Counter()
+
+    def begin_feed(
+        self,
+        user_specified_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ) -> None:
+        """Get ready to parse a document a piece at a time.
+
+        See `TreeBuilder.begin_feed`.
+        """
+        assert self.soup is not None
+        args, kwargs = self.parser_args
+        self._incremental_parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
+        self._incremental_decoder = None
+        self._incremental_encodings = (user_specified_encoding, exclude_encodings)
+        self._undecoded = b""
+
+    def feed_chunk(self, markup: _RawMarkup) -> None:
+        """Run the next piece of a document through HTMLParser.
+
+        See `TreeBuilder.feed_chunk`.
+        """
+        if isinstance(markup, bytes):
+            if self._incremental_decoder is not None:
+                markup = self._incremental_decoder.decode(markup)
+            else:
+                # We don't know the encoding yet. Hold on to the
+                # bytestring until we've seen enough of the document
+                # to guess.
+                self._undecoded += markup
+                if len(self._undecoded) < self.ENCODING_SNIFF_SIZE:
+                    return
+                markup = self._start_decoding()
+        self._feed_incremental_parser(markup)
+
+    def end_feed(self) -> None:
+        """Finish parsing a document that was fed in a piece at a time.
+
+        See `TreeBuilder.end_feed`.
+        """
+        parser = self._incremental_parser
+        assert parser is not None
+        if self._undecoded:
+            # The document was too short to fill up the buffer.
+            self._feed_incremental_parser(self._start_decoding())
+        if self._incremental_decoder is not None:
+            self._feed_incremental_parser(
+                self._incremental_decoder.decode(b"", final=True)
+            )
+        try:
+            parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        parser.already_closed_empty_element = Counter()
+        self._incremental_parser = None
+        self._incremental_decoder = None
+
+    def _feed_incremental_parser(self, markup: str) -> None:
+        assert self._incremental_parser is not None
+        if not markup:
+            return
+        try:
+            self._incremental_parser.feed(markup)
+        except AssertionError as e:
+            # See the note in feed().
+            raise ParserRejectedMarkup(e)
+
+    def _start_decoding(self) -> str:
+        """Pick an encoding for a document based on its first few
+        bytes, and decode those bytes.
+
+        :return: The decoded bytes.
+        """
+        assert self.soup is not None
+        user_specified_encoding, exclude_encodings = self._incremental_encodings
+        known_definite_encodings: List[_Encoding] = []
+        if user_specified_encoding:
+            known_definite_encodings.append(user_specified_encoding)
+        detector = EncodingDetector(
+            self._undecoded,
+            known_definite_encodings=known_definite_encodings,
+            is_html=True,
+            exclude_encodings=exclude_encodings,
+        )
+        self._undecoded = b""
+
+        # Use the first candidate encoding that can decode the start
+        # of the document. The end of the data may be a partial
+        # character, which is why an incremental decoder is used even
+        # here.
+        chosen: Optional[_Encoding] = None
+        first: Optional[_Encoding] = None
+        for encoding in detector.encodings:
+            try:
+                decoder_class = codecs.getincrementaldecoder(encoding)
+            except LookupError:
+                continue
+            if first is None:
+                first = encoding
+            try:
+                decoder_class().decode(detector.markup)
+            except UnicodeDecodeError:
+                continue
+            chosen = encoding
+            break
+
+        if chosen is None:
+            # No encoding works cleanly. Settle for the most likely
+            # one.
+            chosen = first or "utf-8"
+            self.soup.contains_replacement_characters = True
+
+        # Later pieces of the document might not decode cleanly
+        # either, but by then it's too late to pick a different
+        # encoding, so undecodable bytes become REPLACEMENT CHARACTER.
+        self._incremental_decoder = codecs.getincrementaldecoder(chosen)("replace")
+        self.soup.original_encoding = chosen
+        self.soup.declared_html_encoding = detector.declared_encoding
+        return self._incremental_decoder.decode(detector.markup)
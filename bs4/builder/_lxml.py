@@ -24,6 +24,7 @@ from typing import (
 )
 from typing_extensions import TypeAlias
 
+import codecs
 from io import BytesIO
 from io import StringIO
 from lxml import etree
@@ -79,7 +80,7 @@ class LXMLTreeBuilderForXML(TreeBuilder):
 
     is_xml: bool = True
 
-    processing_instruction_class: Type[ProcessingInstruction]
+    processing_instruction_class: Type[ProcessingInstruction] = XMLProcessingInstruction
 
     NAME: str = "lxml-xml"
     ALTERNATE_NAMES: Iterable[str] = ["xml"]
@@ -89,6 +90,15 @@ class LXMLTreeBuilderForXML(TreeBuilder):
 
     CHUNK_SIZE: int = 512
 
+    #: lxml's parsers can be fed a document a piece at a time.
+    incremental: bool = True
+
+    #: When a document is fed in a piece at a time as bytestrings of
+    #: unknown encoding, this many bytes are collected before guessing
+    #: at the encoding, the same amount the HTML spec looks at when
+    #: searching for a <meta> tag.
+    ENCODING_DETECTION_SIZE: int = 1024
+
     # This namespace mapping is specified in the XML Namespace
     # standard.
     DEFAULT_NSMAPS: _NamespaceMapping = dict(xml="http://www.w3.org/XML/1998/namespace")
@@ -98,8 +108,18 @@ class LXMLTreeBuilderForXML(TreeBuilder):
     nsmaps: List[Optional[_InvertedNamespaceMapping]]
     empty_element_tags: Set[str]
     parser: Any
+    _fed_incrementally: bool
+    _exclude_encodings: Optional[_Encodings]
+    _undetected: Optional[List[bytes]]
     _default_parser: Optional[etree.XMLParser]
 
+    #: Parsers that have finished parsing a document, by encoding.
+    #: Setting up a new lxml parser with a target takes longer than
+    #: parsing a small document, so these are reused by
+    #: `LXMLTreeBuilderForXML.parser_for`.
+    _idle_parsers: Dict[Optional[_Encoding], _LXMLParser]
+    _parser_encoding: Optional[_Encoding]
+
     # NOTE: If we parsed Element objects and looked at .sourceline,
     # we'd be able to see the line numbers from the original document.
     # But instead we build an XMLParser or HTMLParser object to serve
@@ -154,19 +174,35 @@ class LXMLTreeBuilderForXML(TreeBuilder):
         return self.DEFAULT_PARSER_CLASS(target=self, recover=True, encoding=encoding)
 
     def parser_for(self, encoding: Optional[_Encoding]) -> _LXMLParser:
-        """Instantiate an appropriate parser for the given encoding.
+        """Find an appropriate parser for the given encoding, reusing
+        one from an earlier document if possible.
 
         :param encoding: A string.
         :return: A parser object such as an `etree.XMLParser`.
         """
+        self._parser_encoding = encoding
+        idle_parser = self._idle_parsers.pop(encoding, None)
+        if idle_parser is not None:
+            return idle_parser
+
         # Use the default parser.
-        parser = self.default_parser(encoding)
+        parser: _ParserOrParserClass = self.default_parser(encoding)
 
         if callable(parser):
             # Instantiate the parser with default arguments
             parser = parser(target=self, recover=True, encoding=encoding)
         return parser
 
+    def _close_parser(self) -> None:
+        """Tell the current parser the document is over, then keep it
+        around for the next document with the same encoding.
+
+        A parser that raised an exception partway through a document
+        is never reused, since it might be in an inconsistent state.
+        """
+        self.parser.close()
+        self._idle_parsers[self._parser_encoding] = self.parser
+
     def __init__(
         self,
         parser: Optional[etree.XMLParser] = None,
@@ -177,6 +213,8 @@ class LXMLTreeBuilderForXML(TreeBuilder):
         # callable, since that means there's no way to create new
         # parsers for different encodings.
         self._default_parser = parser
+        self._idle_parsers = {}
+        self._parser_encoding = None
         self.soup = None
         self.nsmaps = [self.DEFAULT_NSMAPS_INVERTED]
         self.active_namespace_prefixes = [dict(self.DEFAULT_NSMAPS)]
@@ -231,7 +269,7 @@ class LXMLTreeBuilderForXML(TreeBuilder):
             self.processing_instruction_class = ProcessingInstruction
             # We're in HTML mode, so if we're given XML, that's worth
             # noting.
-            DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=3)
+            DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup)
         else:
             self.processing_instruction_class = XMLProcessingInstruction
 
@@ -302,7 +340,107 @@ class LXMLTreeBuilderForXML(TreeBuilder):
                 data = io.read(self.CHUNK_SIZE)
                 if len(data) != 0:
                     self.parser.feed(data)
-            self.parser.close()
+            self._close_parser()
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
+    def begin_feed(
+        self,
+        user_specified_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ) -> None:
+        """Get ready to parse a document a piece at a time.
+
+        If the pieces are bytestrings and no encoding is specified, the
+        encoding is guessed from the first
+        `LXMLTreeBuilderForXML.ENCODING_DETECTION_SIZE` bytes, using
+        the same `EncodingDetector` as `LXMLTreeBuilderForXML.prepare_markup`.
+
+        See `TreeBuilder.begin_feed`.
+        """
+        assert self.soup is not None
+        self.parser = None
+        if user_specified_encoding is not None:
+            self.parser = self.parser_for(user_specified_encoding)
+        self._exclude_encodings = exclude_encodings
+        self._undetected = None
+        self._fed_incrementally = False
+
+    def feed_chunk(self, markup: _RawMarkup) -> None:
+        """Run the next piece of a document through lxml.
+
+        See `TreeBuilder.feed_chunk`.
+        """
+        if self.parser is None:
+            if isinstance(markup, str):
+                self.parser = self.parser_for(None)
+            else:
+                # Hold on to the bytestrings until there are enough of
+                # them to detect the encoding.
+                if self._undetected is None:
+                    self._undetected = []
+                self._undetected.append(markup)
+                if (
+                    sum(len(x) for x in self._undetected)
+                    < self.ENCODING_DETECTION_SIZE
+                ):
+                    return
+                markup = self._detect_encoding()
+        # Either the parser already existed or one was just created.
+        assert self.parser is not None
+        if not self._fed_incrementally and not self.is_xml:
+            # This is the start of the document. As in prepare_markup,
+            # if an HTML parser is given XML, that's worth noting.
+            DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup)
+        try:
+            self.parser.feed(markup)
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+        self._fed_incrementally = True
+
+    def _detect_encoding(self) -> bytes:
+        """Pick an encoding for the bytestrings collected by
+        `LXMLTreeBuilderForXML.feed_chunk` and create a parser for it.
+
+        :return: The collected bytestrings, ready to be fed to the parser.
+        """
+        assert self._undetected is not None and self.soup is not None
+        data = b"".join(self._undetected)
+        self._undetected = None
+        detector = EncodingDetector(
+            data, is_html=not self.is_xml, exclude_encodings=self._exclude_encodings
+        )
+        encoding = None
+        for candidate in detector.encodings:
+            # The data may end partway through a character, so only
+            # rule out an encoding that fails before then.
+            try:
+                codecs.getincrementaldecoder(candidate)().decode(detector.markup)
+            except (UnicodeDecodeError, LookupError):
+                continue
+            encoding = candidate
+            break
+        self.parser = self.parser_for(encoding)
+        self.soup.original_encoding = encoding
+        return detector.markup
+
+    def end_feed(self) -> None:
+        """Finish parsing a document that was fed in a piece at a time.
+
+        See `TreeBuilder.end_feed`.
+        """
+        if self._undetected is not None:
+            # The whole document was shorter than
+            # ENCODING_DETECTION_SIZE.
+            self.feed_chunk(self._detect_encoding())
+        if self.parser is None:
+            self.parser = self.parser_for(None)
+        try:
+            if not self._fed_incrementally:
+                # Call feed() at least once, even if the markup is
+                # empty, or the parser won't be initialized.
+                self.parser.feed("")
+            self._close_parser()
         except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
             raise ParserRejectedMarkup(e)
 
@@ -470,6 +608,7 @@ class LXMLTreeBuilder(HTMLTreeBuilder, LXMLTreeBuilderForXML):
 
     features: Iterable[str] = list(ALTERNATE_NAMES) + [NAME, HTML, FAST, PERMISSIVE]
     is_xml: bool = False
+    processing_instruction_class: Type[ProcessingInstruction] = ProcessingInstruction
 
     def default_parser(self, encoding: Optional[_Encoding]) -> _ParserOrParserClass:
         return etree.HTMLParser
@@ -481,7 +620,7 @@ class LXMLTreeBuilder(HTMLTreeBuilder, LXMLTreeBuilderForXML):
         try:
             self.parser = self.parser_for(encoding)
             self.parser.feed(markup)
-            self.parser.close()
+            self._close_parser()
         except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
             raise ParserRejectedMarkup(e)
 
@@ -10,17 +10,28 @@ functions is that you don't need to keep passing the `element.Tag` to be
 selected against, since the `CSS` object is permanently scoped to that
 `element.Tag`.
 
+Simple selectors like ``div.price`` or ``ul > li`` don't need
+``soupsieve`` at all; they're run by a `NativeSelector`.
 """
 
 from __future__ import annotations
 
+from collections import OrderedDict
+import re
+import string
+import threading
 from types import ModuleType
 from typing import (
     Any,
     cast,
+    Dict,
+    Hashable,
     Iterable,
     Iterator,
+    List,
+    NamedTuple,
     Optional,
+    Tuple,
     TYPE_CHECKING,
 )
 import warnings
@@ -29,16 +40,510 @@ from bs4._typing import _NamespaceMapping
 if TYPE_CHECKING:
     from soupsieve import SoupSieve
     from bs4 import element
-    from bs4.element import ResultSet, Tag
+    from bs4.element import PageElement, ResultSet, Tag
 
-soupsieve: Optional[ModuleType]
-try:
-    import soupsieve
-except ImportError:
-    soupsieve = None
-    warnings.warn(
-        "The soupsieve package is not installed. CSS selectors cannot be used."
-    )
+# The soupsieve module takes a while to import, and many programs
+# never use CSS selectors (or only simple ones, which NativeSelector
+# can handle), so it's not imported until it's needed.
+_soupsieve: Optional[ModuleType] = None
+_soupsieve_imported: bool = False
+
+
+def _import_soupsieve() -> Optional[ModuleType]:
+    """Import the soupsieve module, if it's installed.
+
+    :return: The module, or None if it isn't installed.
+    """
+    global _soupsieve, _soupsieve_imported
+    if not _soupsieve_imported:
+        try:
+            import soupsieve
+
+            _soupsieve = soupsieve
+        except ImportError:
+            warnings.warn(
+                "The soupsieve package is not installed. Only simple CSS selectors can be used."
+            )
+        _soupsieve_imported = True
+    return _soupsieve
+
+
+def __getattr__(name: str) -> Any:
+    # bs4.css.soupsieve used to be set when this module was imported.
+    if name == "soupsieve":
+        return _import_soupsieve()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class SelectorCacheInfo(NamedTuple):
+    """Statistics about a `SelectorCache`, as returned by
+    `SelectorCache.info`.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+#: Distinguishes a selector that isn't in a `SelectorCache` from one
+#: that compiled to None.
+_MISSING = object()
+
+
+class SelectorCache(object):
+    """A bounded, least-recently-used cache of compiled selectors.
+
+    A single instance of this class, `selector_cache`, is shared by
+    every `CSS` object in the process, so a program that runs the
+    same few selectors against many documents only compiles each
+    selector once.
+
+    :param maxsize: The maximum number of compiled selectors to
+        keep. If this is 0, nothing is cached.
+    """
+
+    #: The default value for ``maxsize``.
+    DEFAULT_MAXSIZE: int = 256
+
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 0:
+            raise ValueError("maxsize can't be negative.")
+        self.maxsize = maxsize
+        self._selectors: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._selectors)
+
+    def info(self) -> SelectorCacheInfo:
+        """Report how well the cache is working."""
+        return SelectorCacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self)
+        )
+
+    def clear(self) -> None:
+        """Forget every compiled selector and reset the statistics."""
+        with self._lock:
+            self._selectors.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum size of the cache, evicting the least
+        recently used selectors if necessary.
+
+        :param maxsize: The new maximum size. 0 disables the cache.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize can't be negative.")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove selectors until the cache is no bigger than maxsize.
+
+        The caller must be holding the lock.
+        """
+        while len(self._selectors) > self.maxsize:
+            self._selectors.popitem(last=False)
+            self.evictions += 1
+
+    def compile(
+        self,
+        api: Any,
+        select: str,
+        namespaces: Optional[_NamespaceMapping],
+        flags: int,
+    ) -> Any:
+        """Compile a selector, or find it in the cache.
+
+        :param api: The ``soupsieve`` module, or anything else with a
+            compatible ``compile()`` function, such as `NativeSelector`.
+        :param select: A CSS selector.
+        :param namespaces: The namespace prefixes used by the selector.
+        :param flags: Flags for `soupsieve.compile()`.
+        :return: Whatever ``api.compile()`` returned.
+        """
+        if self.maxsize == 0:
+            return api.compile(select, namespaces, flags)
+        key: Hashable
+        try:
+            key = (
+                api,
+                select,
+                None if namespaces is None else frozenset(namespaces.items()),
+                flags,
+            )
+            hash(key)
+        except TypeError:
+            # Something in the namespace mapping can't be hashed.
+            return api.compile(select, namespaces, flags)
+        with self._lock:
+            compiled = self._selectors.get(key, _MISSING)
+            if compiled is not _MISSING:
+                self._selectors.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        # Compiling can raise an exception, so do it outside the lock.
+        compiled = api.compile(select, namespaces, flags)
+        with self._lock:
+            self._selectors[key] = compiled
+            self._selectors.move_to_end(key)
+            self._evict()
+        return compiled
+
+
+#: The `SelectorCache` used by every `CSS` object. Call
+#: ``selector_cache.resize(0)`` to turn caching off.
+selector_cache: SelectorCache = SelectorCache()
+
+
+# Simple selectors like "div.price", "#main", "a[href]" and "ul > li"
+# are by far the most common, and Beautiful Soup can run them itself
+# much faster than soupsieve's general-purpose matcher. The rules
+# below only accept identifiers without escapes or non-ASCII
+# characters; anything else is sent to soupsieve.
+_WHITESPACE = "[ \t\r\n\f]"
+_IDENTIFIER = "(?:--|-?[A-Za-z_])[A-Za-z0-9_-]*"
+_TYPE_SELECTOR = re.compile(r"\*|%s" % _IDENTIFIER)
+_SUBCLASS_SELECTOR = re.compile(
+    r"#(%s)|\.(%s)|\[%s*(%s)%s*\]"
+    % (_IDENTIFIER, _IDENTIFIER, _WHITESPACE, _IDENTIFIER, _WHITESPACE)
+)
+_SELECTOR_SEPARATOR = re.compile(r"%s*,%s*" % (_WHITESPACE, _WHITESPACE))
+_COMBINATOR = re.compile(r"%s*(>)%s*|%s+" % (_WHITESPACE, _WHITESPACE, _WHITESPACE))
+_CLASS_NAME = re.compile("[^ \t\r\n\f]+")
+_ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _lower(value: str) -> str:
+    """Lowercase the ASCII letters in a string, and no others, the way
+    soupsieve does.
+    """
+    if value.isascii():
+        return value.lower()
+    return value.translate(_ASCII_LOWERCASE)
+
+
+def _attribute_value(attrs: Dict[str, Any], name: str, default: Any) -> Any:
+    """Look up an attribute of an HTML tag by its lowercase name."""
+    if name in attrs:
+        value = attrs[name]
+    else:
+        for key, value in attrs.items():
+            if _lower(key) == name:
+                break
+        else:
+            return default
+    return "" if value is None else value
+
+
+class _CompoundSelector(object):
+    """A compound selector like ``div#main.fancy[title]``: a
+    series of conditions that must all be true of a single tag.
+    """
+
+    __slots__ = ("name", "ids", "classes", "attributes")
+
+    #: The lowercased tag name, or None to match any tag.
+    name: Optional[str]
+
+    ids: Tuple[str, ...]
+    classes: Tuple[str, ...]
+
+    #: The lowercased names of attributes that must be present.
+    attributes: Tuple[str, ...]
+
+    def __init__(
+        self,
+        name: Optional[str],
+        ids: Tuple[str, ...],
+        classes: Tuple[str, ...],
+        attributes: Tuple[str, ...],
+    ):
+        self.name = name
+        self.ids = ids
+        self.classes = classes
+        self.attributes = attributes
+
+    def matches(self, tag: Tag) -> bool:
+        name = self.name
+        if name is not None:
+            tag_name = tag.name
+            if tag_name != name and (tag_name.islower() or _lower(tag_name) != name):
+                return False
+        if not (self.ids or self.classes or self.attributes):
+            return True
+        attrs = tag.attrs
+        for id in self.ids:
+            if _attribute_value(attrs, "id", "") != id:
+                return False
+        if self.classes:
+            classes = _attribute_value(attrs, "class", [])
+            if isinstance(classes, str):
+                classes = _CLASS_NAME.findall(classes)
+            for cls in self.classes:
+                if cls not in classes:
+                    return False
+        for attribute in self.attributes:
+            if attribute not in attrs and not any(
+                _lower(key) == attribute for key in attrs
+            ):
+                return False
+        return True
+
+
+#: A complex selector like ``div > p span``, as a sequence of
+#: (compound selector, combinator) 2-tuples, from right to left. The
+#: combinator (" " or ">") links a compound selector to the one on its
+#: left; it's None for the leftmost compound selector.
+_ComplexSelector = Tuple[Tuple[_CompoundSelector, Optional[str]], ...]
+
+
+class NativeSelector(object):
+    """A CSS selector simple enough for Beautiful Soup to run by
+    itself, without soupsieve.
+
+    A `NativeSelector` understands type selectors, the universal
+    selector, ID and class selectors, attribute-presence selectors
+    like ``[href]``, the descendant and child combinators, and
+    comma-separated lists of all these. It can only be used on HTML
+    documents, and it finds exactly what soupsieve would find.
+
+    You won't normally create one of these yourself; `CSS` uses one
+    automatically whenever it can. It has the same methods as a
+    compiled `soupsieve.SoupSieve` object.
+    """
+
+    pattern: str
+    selectors: Tuple[_ComplexSelector, ...]
+
+    def __init__(self, pattern: str, selectors: Tuple[_ComplexSelector, ...]):
+        from bs4 import BeautifulSoup
+        from bs4.element import Tag
+
+        self.pattern = pattern
+        self.selectors = selectors
+        self._tag_class = Tag
+        self._document_class = BeautifulSoup
+
+    def __repr__(self) -> str:
+        return "%s(%r)" % (self.__class__.__name__, self.pattern)
+
+    @classmethod
+    def compile(
+        cls,
+        pattern: str,
+        namespaces: Optional[_NamespaceMapping] = None,
+        flags: int = 0,
+    ) -> Optional[NativeSelector]:
+        """Parse a CSS selector.
+
+        This has the same signature as `soupsieve.compile()`, so that
+        `SelectorCache` can treat this class as a replacement for the
+        soupsieve module. The namespaces and flags are ignored.
+
+        :return: A `NativeSelector`, or None if the selector isn't
+            simple enough.
+        """
+        selectors: List[_ComplexSelector] = []
+        compounds: List[Tuple[_CompoundSelector, Optional[str]]] = []
+        combinator = None
+        pos = 0
+        end = len(pattern)
+        while True:
+            compound, pos = cls._parse_compound(pattern, pos)
+            if compound is None:
+                return None
+            compounds.append((compound, combinator))
+            if pos == end:
+                break
+            match = _SELECTOR_SEPARATOR.match(pattern, pos)
+            if match is not None:
+                selectors.append(tuple(reversed(compounds)))
+                compounds = []
+                combinator = None
+            else:
+                match = _COMBINATOR.match(pattern, pos)
+                if match is None:
+                    return None
+                combinator = ">" if match.group(1) else " "
+            pos = match.end()
+        selectors.append(tuple(reversed(compounds)))
+        return cls(pattern, tuple(selectors))
+
+    @staticmethod
+    def _parse_compound(
+        pattern: str, pos: int
+    ) -> Tuple[Optional[_CompoundSelector], int]:
+        """Parse a compound selector starting at ``pos``.
+
+        :return: The selector, or None if there isn't one, and the
+            position just after it.
+        """
+        name = None
+        found = False
+        match = _TYPE_SELECTOR.match(pattern, pos)
+        if match is not None:
+            found = True
+            if match.group() != "*":
+                name = _lower(match.group())
+            pos = match.end()
+        ids: List[str] = []
+        classes: List[str] = []
+        attributes: List[str] = []
+        while True:
+            match = _SUBCLASS_SELECTOR.match(pattern, pos)
+            if match is None:
+                break
+            found = True
+            id, cls, attribute = match.groups()
+            if id is not None:
+                ids.append(id)
+            elif cls is not None:
+                classes.append(cls)
+            else:
+                attributes.append(_lower(attribute))
+            pos = match.end()
+        if not found:
+            return None, pos
+        return (
+            _CompoundSelector(name, tuple(ids), tuple(classes), tuple(attributes)),
+            pos,
+        )
+
+    def _matches(self, tag: Tag) -> bool:
+        """Does ``tag`` match any of the selectors?"""
+        for selector in self.selectors:
+            if selector[0][0].matches(tag) and self._matches_ancestors(
+                tag, selector, 0
+            ):
+                return True
+        return False
+
+    def _matches_ancestors(
+        self, tag: Tag, selector: _ComplexSelector, i: int
+    ) -> bool:
+        """Given that ``tag`` matches the ``i``th compound selector of
+        ``selector``, do its ancestors match the rest of it?
+        """
+        combinator = selector[i][1]
+        if combinator is None:
+            return True
+        compound = selector[i + 1][0]
+        # Like soupsieve, don't treat the BeautifulSoup object as an
+        # ancestor.
+        document_class = self._document_class
+        parent = tag.parent
+        while parent is not None and not isinstance(parent, document_class):
+            if compound.matches(parent) and self._matches_ancestors(
+                parent, selector, i + 1
+            ):
+                return True
+            if combinator == ">":
+                break
+            parent = parent.parent
+        return False
+
+    def _candidates(self, tag: Tag) -> Iterable[PageElement]:
+        """Find the elements underneath ``tag`` that might match,
+        using its `ElementIndex` if it has one.
+        """
+        index = tag._element_index
+        if index is None or len(self.selectors) != 1 or not index.refresh(tag):
+            return tag.descendants
+        compound = self.selectors[0][0][0]
+        if compound.ids:
+            return index.attribute_values["id"].get(compound.ids[0], [])
+        if compound.classes:
+            return index.attribute_values["class"].get(compound.classes[0], [])
+        if compound.name is not None:
+            # Tag names are case-insensitive, so there might be more
+            # than one list to look at.
+            names = [
+                name
+                for name in index.names
+                if name == compound.name or _lower(name) == compound.name
+            ]
+            if not names:
+                return []
+            if len(names) == 1:
+                return index.names[names[0]]
+        return index.tags
+
+    def iselect(self, tag: Tag, limit: int = 0) -> Iterator[Tag]:
+        """Iterate over the tags underneath ``tag`` that match."""
+        tag_class = self._tag_class
+        matches = self._matches
+        matches_ancestors = self._matches_ancestors
+        # With only one selector, check its rightmost compound
+        # selector before doing anything more complicated.
+        single = self.selectors[0] if len(self.selectors) == 1 else None
+        matches_compound = self.selectors[0][0][0].matches
+        for candidate in self._candidates(tag):
+            if not isinstance(candidate, tag_class):
+                continue
+            if single is not None:
+                if matches_compound(candidate) and matches_ancestors(
+                    candidate, single, 0
+                ):
+                    yield candidate
+                    limit -= 1
+                    if limit == 0:
+                        break
+            elif matches(candidate):
+                yield candidate
+                limit -= 1
+                if limit == 0:
+                    break
+
+    def select(self, tag: Tag, limit: int = 0) -> List[Tag]:
+        """Find the tags underneath ``tag`` that match."""
+        return list(self.iselect(tag, limit))
+
+    def select_one(self, tag: Tag) -> Optional[Tag]:
+        """Find the first tag underneath ``tag`` that matches."""
+        for match in self.iselect(tag, 1):
+            return match
+        return None
+
+    def match(self, tag: Tag) -> bool:
+        """Does ``tag`` itself match?"""
+        return (
+            isinstance(tag, self._tag_class)
+            and not isinstance(tag, self._document_class)
+            and self._matches(tag)
+        )
+
+    def closest(self, tag: Tag) -> Optional[Tag]:
+        """Find the closest tag to ``tag``, starting with ``tag`` itself
+        and moving up through its parents, that matches.
+        """
+        current: Optional[Tag] = tag
+        while current is not None and not isinstance(current, self._document_class):
+            if self._matches(current):
+                return current
+            current = current.parent
+        return None
+
+    def filter(self, tag: Tag) -> List[Tag]:
+        """Find the direct children of ``tag`` that match."""
+        tag_class = self._tag_class
+        return [
+            child
+            for child in tag.contents
+            if isinstance(child, tag_class) and self.match(child)
+        ]
 
 
 class CSS(object):
@@ -55,23 +560,36 @@ class CSS(object):
         intended for use in unit tests.
     """
 
+    #: If this is True, simple selectors on HTML documents are run by
+    #: a `NativeSelector` instead of by soupsieve. Set it to False to
+    #: send every selector to soupsieve.
+    NATIVE_SELECTORS: bool = True
+
     def __init__(self, tag: element.Tag, api: Optional[ModuleType] = None):
-        if api is None:
-            api = soupsieve
-        if api is None:
-            raise NotImplementedError(
-                "Cannot execute CSS selectors because the soupsieve package is not installed."
-            )
-        self.api = api
+        self._api = api
         self.tag = tag
 
+    @property
+    def api(self) -> ModuleType:
+        """The ``soupsieve`` module, imported the first time it's needed.
+
+        :raise NotImplementedError: If soupsieve isn't installed.
+        """
+        if self._api is None:
+            self._api = _import_soupsieve()
+            if self._api is None:
+                raise NotImplementedError(
+                    "Cannot execute CSS selectors because the soupsieve package is not installed."
+                )
+        return self._api
+
     def escape(self, ident: str) -> str:
         """Escape a CSS identifier.
 
         This is a simple wrapper around `soupsieve.escape() <https://facelessuser.github.io/soupsieve/api/#soupsieveescape>`_. See the
         documentation for that function for more information.
         """
-        if soupsieve is None:
+        if _import_soupsieve() is None:
             raise NotImplementedError(
                 "Cannot escape CSS identifiers because the soupsieve package is not installed."
             )
@@ -101,6 +619,51 @@ class CSS(object):
 
         return ResultSet(None, results)
 
+    def _native_selectors_work(
+        self, namespaces: Optional[_NamespaceMapping] = None, flags: int = 0
+    ) -> bool:
+        """Would a `NativeSelector` find the same things as soupsieve,
+        given these namespaces and flags?
+        """
+        if namespaces is None:
+            namespaces = self.tag._namespaces
+        return (
+            self.NATIVE_SELECTORS
+            and not flags
+            and not self.tag._is_xml
+            # A default namespace would make soupsieve check each
+            # tag's namespace, which a NativeSelector can't do.
+            and (namespaces is None or "" not in namespaces)
+        )
+
+    def _compile(
+        self,
+        select: str,
+        namespaces: Optional[_NamespaceMapping],
+        flags: int,
+        kwargs: Dict[str, Any],
+        native: bool = True,
+    ) -> Any:
+        """Turn a selector into a compiled `soupsieve.SoupSieve` or
+        `NativeSelector` object, using `selector_cache` when possible.
+
+        :param native: If this is False, always return a `soupsieve.SoupSieve`.
+        """
+        if isinstance(select, str) and not kwargs:
+            if namespaces is None:
+                namespaces = self.tag._namespaces
+            if native and self._native_selectors_work(namespaces, flags):
+                compiled = selector_cache.compile(NativeSelector, select, None, 0)
+                if compiled is not None:
+                    return compiled
+            return selector_cache.compile(self.api, select, namespaces, flags)
+        if native and isinstance(select, NativeSelector):
+            return select
+        # A precompiled pattern is passed through as-is (soupsieve
+        # will complain if it's combined with namespaces or flags),
+        # and custom selectors aren't cached.
+        return self.api.compile(select, self._ns(namespaces, select), flags, **kwargs)
+
     def compile(
         self,
         select: str,
@@ -126,7 +689,7 @@ class CSS(object):
         :return: A precompiled selector object.
         :rtype: soupsieve.SoupSieve
         """
-        return self.api.compile(select, self._ns(namespaces, select), flags, **kwargs)
+        return self._compile(select, namespaces, flags, kwargs, native=False)
 
     def select_one(
         self,
@@ -154,9 +717,7 @@ class CSS(object):
         :param kwargs: Keyword arguments to be passed into Soup Sieve's
            `soupsieve.select_one() <https://facelessuser.github.io/soupsieve/api/#soupsieveselect_one>`_ method.
         """
-        return self.api.select_one(
-            select, self.tag, self._ns(namespaces, select), flags, **kwargs
-        )
+        return self._compile(select, namespaces, flags, kwargs).select_one(self.tag)
 
     def select(
         self,
@@ -190,9 +751,7 @@ class CSS(object):
             limit = 0
 
         return self._rs(
-            self.api.select(
-                select, self.tag, self._ns(namespaces, select), limit, flags, **kwargs
-            )
+            self._compile(select, namespaces, flags, kwargs).select(self.tag, limit)
         )
 
     def iselect(
@@ -226,8 +785,8 @@ class CSS(object):
         :param kwargs: Keyword arguments to be passed into Soup Sieve's
            `soupsieve.iselect() <https://facelessuser.github.io/soupsieve/api/#soupsieveiselect>`_ method.
         """
-        return self.api.iselect(
-            select, self.tag, self._ns(namespaces, select), limit, flags, **kwargs
+        return self._compile(select, namespaces, flags, kwargs).iselect(
+            self.tag, limit
         )
 
     def closest(
@@ -258,9 +817,7 @@ class CSS(object):
            `soupsieve.closest() <https://facelessuser.github.io/soupsieve/api/#soupsieveclosest>`_ method.
 
         """
-        return self.api.closest(
-            select, self.tag, self._ns(namespaces, select), flags, **kwargs
-        )
+        return self._compile(select, namespaces, flags, kwargs).closest(self.tag)
 
     def match(
         self,
@@ -295,9 +852,7 @@ class CSS(object):
         """
         return cast(
             bool,
-            self.api.match(
-                select, self.tag, self._ns(namespaces, select), flags, **kwargs
-            ),
+            self._compile(select, namespaces, flags, kwargs).match(self.tag),
         )
 
     def filter(
@@ -332,7 +887,5 @@ class CSS(object):
             method.
         """
         return self._rs(
-            self.api.filter(
-                select, self.tag, self._ns(namespaces, select), flags, **kwargs
-            )
+            self._compile(select, namespaces, flags, kwargs).filter(self.tag)
         )
@@ -20,7 +20,10 @@ import re
 from logging import Logger, getLogger
 from types import ModuleType
 from typing import (
+    Any,
+    Callable,
     Dict,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -125,6 +128,29 @@ class EntitySubstitution(object):
     #: :meta hide-value:
     CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE: Pattern[str]
 
+    #: A table for use with `str.translate`, which replaces every
+    #: single character matched by CHARACTER_TO_HTML_ENTITY_RE with
+    #: the corresponding named entity.
+    #:
+    #: :meta hide-value:
+    CHARACTER_TO_HTML_ENTITY_TABLE: Dict[int, str]
+
+    #: Like CHARACTER_TO_HTML_ENTITY_TABLE, but it also replaces
+    #: ampersands.
+    #:
+    #: :meta hide-value:
+    CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE: Dict[int, str]
+
+    #: A regular expression that matches the places in a string where
+    #: replacing single characters isn't enough: the first character
+    #: of a multi-character entity, followed by a character that might
+    #: be its second character. If a string doesn't match this, the
+    #: CHARACTER_TO_HTML_ENTITY_TABLE tables give the same result as
+    #: the much slower regular expressions.
+    #:
+    #: :meta hide-value:
+    MULTI_CHARACTER_ENTITY_RE: Pattern[str]
+
     @classmethod
     def _populate_class_variables(cls) -> None:
         """Initialize variables used by this class to manage the plethora of
@@ -148,6 +174,14 @@ class EntitySubstitution(object):
         also matches unescaped ampersands. This is used by the 'html'
         formatted to provide backwards-compatibility, even though the HTML5
         spec allows most ampersands to go unescaped.
+
+        CHARACTER_TO_HTML_ENTITY_TABLE,
+        CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE: Translation
+        tables that do the work of the two regular expressions above,
+        one character at a time.
+
+        MULTI_CHARACTER_ENTITY_RE: A regular expression that finds
+        strings where the translation tables can't be used.
         """
         unicode_to_name = {}
         name_to_unicode = {}
@@ -240,6 +274,16 @@ class EntitySubstitution(object):
         particles.add("&")
         re_definition_with_ampersand = "(%s)" % "|".join(particles)
 
+        # No entity is more than two characters long, so if a string
+        # never has the first character of a multi-character entity
+        # followed by a possible second character, each of its
+        # special characters can be replaced on its own.
+        multi_character_particles = []
+        for first, long_entities in long_entities_by_first_character.items():
+            seconds = "".join(sorted(set(x[1] for x in long_entities if len(x) > 1)))
+            if seconds:
+                multi_character_particles.append("%s[%s]" % (first, seconds))
+
         # If an entity shows up in both html5 and codepoint2name, it's
         # likely that HTML5 gives it several different names, such as
         # 'rsquo' and 'rsquor'. When converting Unicode characters to
@@ -256,6 +300,14 @@ class EntitySubstitution(object):
         cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE = re.compile(
             re_definition_with_ampersand
         )
+        cls.MULTI_CHARACTER_ENTITY_RE = re.compile("|".join(multi_character_particles))
+        table = dict(
+            (ord(character), "&%s;" % unicode_to_name[character])
+            for character in short_entities
+        )
+        cls.CHARACTER_TO_HTML_ENTITY_TABLE = table
+        cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE = dict(table)
+        cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE[ord("&")] = "&amp;"
 
     #: A map of Unicode strings to the corresponding named XML entities.
     #:
@@ -370,8 +422,10 @@ class EntitySubstitution(object):
         :return: A version of ``value`` with special characters replaced
          with named entities.
         """
-        # Escape angle brackets and ampersands.
-        value = cls.AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        # Escape angle brackets and ampersands. str.replace is much
+        # faster than a regular expression for this, and it doesn't
+        # copy a string that contains none of these characters.
+        value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -393,7 +447,12 @@ class EntitySubstitution(object):
         """
         # Escape angle brackets, and ampersands that aren't part of
         # entities.
-        value = cls.BARE_AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        if "&" in value:
+            value = cls.BARE_AMPERSAND_OR_BRACKET.sub(
+                cls._substitute_xml_entity, value
+            )
+        else:
+            value = value.replace("<", "&lt;").replace(">", "&gt;")
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -416,10 +475,26 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # Convert any appropriate characters to HTML entities.
+        if s.isascii():
+            # Only three ASCII characters are turned into entities.
+            return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        if cls.MULTI_CHARACTER_ENTITY_RE.search(s) is None:
+            return s.translate(cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE)
         return cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(
             cls._substitute_html_entity, s
         )
 
+    @classmethod
+    def _substitute_html_characters(cls, s: str) -> str:
+        """Convert any appropriate characters to HTML entities, leaving
+        ampersands alone.
+        """
+        if s.isascii():
+            return s.replace("<", "&lt;").replace(">", "&gt;")
+        if cls.MULTI_CHARACTER_ENTITY_RE.search(s) is None:
+            return s.translate(cls.CHARACTER_TO_HTML_ENTITY_TABLE)
+        return cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
+
     @classmethod
     def substitute_html5(cls, s: str) -> str:
         """Replace certain Unicode characters with named HTML entities
@@ -447,12 +522,11 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # First, escape any HTML entities found in the markup.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
 
         # Next, convert any appropriate characters to unescaped HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
-
-        return s
+        return cls._substitute_html_characters(s)
 
     @classmethod
     def substitute_html5_raw(cls, s: str) -> str:
@@ -470,16 +544,73 @@ class EntitySubstitution(object):
         # First, escape the ampersand for anything that looks like an
         # entity but isn't in the list of recognized entities. All other
         # ampersands can be left alone.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
 
         # Then, convert a range of Unicode characters to unescaped
         # HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
-
-        return s
+        return cls._substitute_html_characters(s)
 
+    @classmethod
+    def substitute_strings(
+        cls, values: Iterable[str], substitute: Callable[[str], str]
+    ) -> List[str]:
+        """Run a number of strings through one of the substitution
+        methods of this class, such as `EntitySubstitution.substitute_xml`,
+        all at once.
+
+        The strings are joined together, substituted in a single
+        call, and split up again. For a large number of small strings
+        this is a lot faster than substituting each one separately.
+
+        :param values: The strings to be substituted.
+        :param substitute: A substitution method of this class. A
+            function that might do something to a null character, or
+            whose output depends on what's at the start or end of a
+            string, can't be used.
+        :return: A list of substituted strings, in the same order as
+            ``values``.
+        """
+        values = list(values)
+        if not values:
+            return []
+        joined = "\x00".join(values)
+        if joined.count("\x00") != len(values) - 1:
+            # The null character can't be used as a separator, because
+            # it occurs in one of the strings.
+            return [substitute(value) for value in values]
+        return substitute(joined).split("\x00")
+
+
+class _LazyEntityTable(object):
+    """Stands in for one of the `EntitySubstitution` class variables
+    that are created by `EntitySubstitution._populate_class_variables`.
+
+    Building those variables takes a noticeable fraction of the time
+    it takes to import Beautiful Soup, and many programs never need
+    them, so it's put off until one of them is actually used. At that
+    point all of them are created, replacing these placeholders.
+    """
 
-EntitySubstitution._populate_class_variables()
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, obj: Any, owner: Any) -> Any:
+        EntitySubstitution._populate_class_variables()
+        return getattr(EntitySubstitution, self.name)
+
+
+for _name in (
+    "HTML_ENTITY_TO_CHARACTER",
+    "CHARACTER_TO_HTML_ENTITY",
+    "CHARACTER_TO_HTML_ENTITY_RE",
+    "CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE",
+    "CHARACTER_TO_HTML_ENTITY_TABLE",
+    "CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE",
+    "MULTI_CHARACTER_ENTITY_RE",
+):
+    setattr(EntitySubstitution, _name, _LazyEntityTable(_name))
+del _name
 
 
 class EncodingDetector:
@@ -9,13 +9,18 @@ from html.parser import HTMLParser
 import bs4
 from bs4 import BeautifulSoup, __version__
 from bs4.builder import builder_registry
+from bs4.element import AttributeValueList, Tag
 from typing import (
     Any,
+    Callable,
+    cast,
+    Dict,
     IO,
     List,
     Optional,
     Tuple,
     TYPE_CHECKING,
+    Union,
 )
 
 if TYPE_CHECKING:
@@ -213,6 +218,19 @@ def rdoc(num_elements: int = 1000) -> str:
     return "<html>" + "\n".join(elements) + "</html>"
 
 
+def _best_of(function: Callable[[], Any], repeat: int) -> float:
+    """Call a function a number of times and return the shortest time
+    it took, in seconds.
+    """
+    times = []
+    for i in range(repeat):
+        a = time.time()
+        function()
+        b = time.time()
+        times.append(b - a)
+    return min(times)
+
+
 def benchmark_parsers(num_elements: int = 100000) -> None:
     """Very basic head-to-head performance benchmark."""
     print(("Comparative parser benchmark on Beautiful Soup %s" % __version__))
@@ -248,6 +266,545 @@ def benchmark_parsers(num_elements: int = 100000) -> None:
     print(("Raw html5lib parsed the markup in %.2fs." % (b - a)))
 
 
+def benchmark_memory(num_elements: int = 100000, parser: str = "html.parser") -> None:
+    """Measure how much memory a parse tree takes up, per node."""
+    import gc
+    import tracemalloc
+
+    print(("Memory benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        soup = BeautifulSoup(data, parser)
+        gc.collect()
+        used, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tags = strings = 0
+    for element in soup.descendants:
+        if isinstance(element, bs4.element.Tag):
+            tags += 1
+        else:
+            strings += 1
+    nodes = tags + strings
+    print(("BS4+%s built %d tags and %d strings." % (parser, tags, strings)))
+    print(
+        (
+            "The tree takes up %d bytes (%.1f bytes per node); peak usage while parsing was %d bytes."
+            % (used, used / max(nodes, 1), peak)
+        )
+    )
+
+
+def benchmark_index(
+    num_elements: int = 100000, num_queries: int = 100, parser: str = "html.parser"
+) -> None:
+    """Compare repeated find_all() calls on a tree with and without an
+    `ElementIndex`.
+    """
+    print(("Index benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+    names = ["p", "div", "span", "i", "b", "script", "table"]
+    queries = [names[i % len(names)] for i in range(num_queries)]
+
+    a = time.time()
+    for name in queries:
+        soup.find_all(name)
+    b = time.time()
+    print(("%d find_all() calls without an index took %.2fs." % (num_queries, b - a)))
+
+    soup.enable_index()
+    a = time.time()
+    for name in queries:
+        soup.find_all(name)
+    b = time.time()
+    print(
+        (
+            "%d find_all() calls with an index took %.2fs, including building the index."
+            % (num_queries, b - a)
+        )
+    )
+
+
+def benchmark_find_all(
+    num_elements: int = 100000, repeat: int = 5, parser: str = "html.parser"
+) -> None:
+    """Measure how quickly find_all() can run a variety of queries
+    that can't be answered without checking every tag.
+    """
+    import re
+
+    print(("find_all() benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+    classes = ["odd", "even", "first", "last"]
+    for i, element in enumerate(soup.find_all(True)):
+        tag = cast(Tag, element)
+        tag["class"] = AttributeValueList([classes[i % 2], classes[2 + i % 3 // 2]])
+        if i % 10 == 0:
+            tag["id"] = "tag%d" % i
+    num_tags = i + 1
+
+    queries: List[Tuple[str, Dict[str, Any]]] = [
+        ("several names", dict(name=["p", "b", "table"])),
+        ("name pattern", dict(name=re.compile("^(p|b)$"))),
+        ("one class", dict(class_="odd")),
+        ("several classes", dict(class_=["first", "last"])),
+        ("name and class", dict(name="p", class_="even")),
+        ("attribute present", dict(id=True)),
+        ("id pattern", dict(id=re.compile("0$"))),
+    ]
+    for description, kwargs in queries:
+        best = _best_of(lambda: soup.find_all(**kwargs), repeat)
+        print(
+            (
+                "%s: %.0f tags checked per second."
+                % (description, num_tags / max(best, 1e-9))
+            )
+        )
+
+
+def benchmark_decode(
+    num_elements: int = 100000, repeat: int = 5, parser: str = "html.parser"
+) -> None:
+    """Compare the first rendering of a document with later renderings,
+    which can reuse each tag's formatted attributes.
+    """
+    print(("decode() benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+    for i, element in enumerate(soup.find_all(True)):
+        tag = cast(Tag, element)
+        tag["class"] = AttributeValueList(["item", "odd" if i % 2 else "even"])
+        tag["id"] = "tag%d" % i
+        tag["title"] = "Tag <%d> & friends" % i
+    data = soup.decode()
+    soup = BeautifulSoup(data, parser)
+    print(("Added attributes to every tag (%d bytes)." % len(data)))
+
+    a = time.time()
+    soup.decode()
+    b = time.time()
+    print(("First decode() took %.2fs." % (b - a)))
+
+    best = _best_of(soup.decode, repeat)
+    print(("Repeated decode() took %.2fs." % best))
+
+
+def benchmark_select(
+    num_elements: int = 100000, repeat: int = 5, parser: str = "html.parser"
+) -> None:
+    """Compare simple CSS selectors run by Beautiful Soup itself with
+    the same selectors run by soupsieve.
+    """
+    from bs4.css import CSS
+
+    print(("select() benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+    classes = ["odd", "even", "first", "last"]
+    for i, element in enumerate(soup.find_all(True)):
+        tag = cast(Tag, element)
+        tag["class"] = AttributeValueList([classes[i % 2], classes[2 + i % 3 // 2]])
+        if i % 10 == 0:
+            tag["id"] = "tag%d" % i
+        if i % 7 == 0:
+            tag["title"] = "title"
+    num_tags = i + 1
+
+    selectors = ["p", "p.odd", "#tag500", "b[title]", "div > p", "table p b"]
+    native_selectors = CSS.NATIVE_SELECTORS
+    try:
+        for native in (True, False):
+            CSS.NATIVE_SELECTORS = native
+            description = "native" if native else "soupsieve"
+            for selector in selectors:
+                try:
+                    best = _best_of(lambda: soup.select(selector), repeat)
+                except NotImplementedError:
+                    print("soupsieve is not installed.")
+                    return
+                print(
+                    (
+                        "%s %r: %.0f tags checked per second."
+                        % (description, selector, num_tags / max(best, 1e-9))
+                    )
+                )
+    finally:
+        CSS.NATIVE_SELECTORS = native_selectors
+
+
+def benchmark_extract(
+    num_elements: int = 100000, repeat: int = 5, parser: str = "html.parser"
+) -> None:
+    """Compare running a number of queries one after another with
+    running them all at once with a `bs4.extract.Plan`.
+    """
+    from bs4.extract import Plan
+    from bs4.filter import SoupStrainer
+
+    print(("Plan.run() benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+    for i, element in enumerate(soup.find_all(True)):
+        if i % 10 == 0:
+            cast(Tag, element)["class"] = "price"
+
+    queries: Dict[str, Union[str, SoupStrainer]] = {
+        "p": "p",
+        "prices": "b.price",
+        "table": SoupStrainer("table"),
+        "div": SoupStrainer("div", class_="price"),
+        "inline": "i, span",
+        "classes": ".price",
+    }
+    plan = Plan(queries)
+
+    def sequential() -> None:
+        for query in queries.values():
+            if isinstance(query, str):
+                soup.select(query)
+            else:
+                soup.find_all(query)
+
+    for description, function in (
+        ("sequential", sequential),
+        ("Plan", lambda: plan.run(soup)),
+    ):
+        best = _best_of(function, repeat)
+        print(
+            (
+                "%s: ran %d queries in %.3fs."
+                % (description, len(queries), best)
+            )
+        )
+
+
+def benchmark_parse_only(
+    num_rows: int = 20000, repeat: int = 5, name: str = "a"
+) -> None:
+    """See how much time html.parser saves by skipping over markup
+    that a ``parse_only`` `SoupStrainer` would reject.
+    """
+    from bs4.builder import HTMLParserTreeBuilder
+    from bs4.filter import SoupStrainer
+
+    print(("parse_only benchmark on Beautiful Soup %s" % __version__))
+    # rdoc() leaves <script> tags open, which would hide most of the
+    # document, so generate a table with well-formed rows instead.
+    rows = []
+    for i in range(num_rows):
+        rows.append(
+            '<tr class="row"><td><img src="/%s.png" alt="%s"></td>'
+            '<td><span class="price">%s</span> %s</td>'
+            '<td><a href="/item/%d">%s</a></td></tr>'
+            % (rword(), rword(), rword(), rsentence(), i, rword())
+        )
+    data = "<html><body><table>%s</table></body></html>" % "\n".join(rows)
+    print(("Generated a large HTML document (%d bytes)." % len(data)))
+    parse_only = SoupStrainer(name)
+
+    old_value = HTMLParserTreeBuilder.PRESCAN_PARSE_ONLY
+    try:
+        for prescan in (False, True):
+            HTMLParserTreeBuilder.PRESCAN_PARSE_ONLY = prescan
+            best = _best_of(
+                lambda: BeautifulSoup(data, "html.parser", parse_only=parse_only),
+                repeat,
+            )
+            soup = BeautifulSoup(data, "html.parser", parse_only=parse_only)
+            print(
+                (
+                    "PRESCAN_PARSE_ONLY=%s: found %d <%s> tags in %.3fs."
+                    % (prescan, len(soup.contents), name, best)
+                )
+            )
+    finally:
+        HTMLParserTreeBuilder.PRESCAN_PARSE_ONLY = old_value
+
+
+def benchmark_pool(num_documents: int = 1000, repeat: int = 5) -> None:
+    """Compare parsing a lot of small documents with and without a
+    `bs4.builder.TreeBuilderPool`.
+    """
+    from bs4.builder import TreeBuilderPool
+
+    print(("TreeBuilderPool benchmark on Beautiful Soup %s" % __version__))
+    documents = []
+    for i in range(num_documents):
+        # Documents of 1-5 KB.
+        documents.append(rdoc(random.randint(60, 300)))
+    total = sum(len(document) for document in documents)
+    print(
+        (
+            "Generated %d small invalid HTML documents (%d bytes on average)."
+            % (num_documents, total // num_documents)
+        )
+    )
+    pool = TreeBuilderPool()
+
+    for parser in ["lxml", "lxml-xml", "html.parser"]:
+        try:
+            pool.acquire(parser)
+        except Exception:
+            print(("%s is not available." % parser))
+            continue
+        for description, function in (
+            ("features", lambda document: BeautifulSoup(document, parser)),
+            (
+                "pool",
+                lambda document: BeautifulSoup(
+                    document, builder=pool.acquire(parser)
+                ),
+            ),
+        ):
+
+            def parse_all() -> None:
+                for document in documents:
+                    function(document)
+
+            best = _best_of(parse_all, repeat)
+            print(
+                (
+                    "%s with %s: %.1f microseconds per document."
+                    % (parser, description, best / num_documents * 1000000)
+                )
+            )
+
+
+def benchmark_fragment(num_fragments: int = 10000, repeat: int = 5) -> None:
+    """Compare parsing a lot of tiny pieces of HTML with the
+    `BeautifulSoup` constructor and with `BeautifulSoup.fragment`.
+    """
+    print(("Fragment parsing benchmark on Beautiful Soup %s" % __version__))
+    fragments = []
+    for i in range(num_fragments):
+        fragments.append(
+            "%s <b>%s</b> %s" % (rsentence(), rword(), rsentence(random.randint(1, 8)))
+        )
+    print(("Generated %d fragments." % num_fragments))
+
+    for parser in ["lxml", "html.parser", "html5lib"]:
+        try:
+            BeautifulSoup.fragment(fragments[0], parser)
+        except Exception:
+            print(("%s is not available." % parser))
+            continue
+        for description, function in (
+            ("BeautifulSoup()", lambda fragment: BeautifulSoup(fragment, parser)),
+            (
+                "BeautifulSoup.fragment()",
+                lambda fragment: BeautifulSoup.fragment(fragment, parser),
+            ),
+        ):
+
+            def parse_all() -> None:
+                for fragment in fragments:
+                    function(fragment)
+
+            best = _best_of(parse_all, repeat)
+            print(
+                (
+                    "%s with %s: %d fragments per second."
+                    % (description, parser, num_fragments / best)
+                )
+            )
+
+
+def benchmark_drop_tags(num_sections: int = 2000, repeat: int = 5) -> None:
+    """Compare dropping <script>, <style> and <svg> tags while
+    parsing with decomposing them afterwards.
+    """
+    print(("drop_tags benchmark on Beautiful Soup %s" % __version__))
+    sections = []
+    for i in range(num_sections):
+        sections.append(
+            "<div><p>%s</p>"
+            '<script>var x%d = "%s";</script><style>.c%d { color: red; }</style>'
+            '<svg><g><path d="M0 0"/><path d="M1 1"/></g></svg></div>'
+            % (rsentence(), i, rsentence(), i)
+        )
+    data = "<html><body>%s</body></html>" % "".join(sections)
+    print(("Generated a %d-byte document." % len(data)))
+    drop = ["script", "style", "svg"]
+
+    def decompose_afterwards(parser: str) -> None:
+        soup = BeautifulSoup(data, parser)
+        soup.find_all(drop).decompose()
+
+    for parser in ["lxml", "html.parser", "html5lib"]:
+        try:
+            BeautifulSoup("", parser)
+        except Exception:
+            print(("%s is not available." % parser))
+            continue
+        for description, function in (
+            ("decompose() afterwards", decompose_afterwards),
+            ("drop_tags", lambda parser: BeautifulSoup(data, parser, drop_tags=drop)),
+        ):
+            best = _best_of(lambda: function(parser), repeat)
+            print(("%s with %s: %.3fs" % (description, parser, best)))
+
+
+def benchmark_text(num_paragraphs: int = 5000, repeat: int = 5) -> None:
+    """Time parsing a pretty-printed document that's mostly text, so
+    that most of the work is turning strings into `NavigableString`
+    objects.
+    """
+    print(("Text parsing benchmark on Beautiful Soup %s" % __version__))
+    paragraphs = "".join(
+        "<p>%s <b>%s</b> %s</p><div>\n  <i>%s</i>\n</div>"
+        % (rsentence(20), rsentence(2), rsentence(30), rsentence(5))
+        for i in range(num_paragraphs)
+    )
+    data = BeautifulSoup(
+        "<html><body>%s</body></html>" % paragraphs, "html.parser"
+    ).prettify()
+    print(("Generated a pretty-printed document (%d bytes)." % len(data)))
+
+    for parser in ["lxml", "html.parser", "html5lib"]:
+        try:
+            BeautifulSoup("", parser)
+        except Exception:
+            print(("%s is not available." % parser))
+            continue
+        best = _best_of(lambda: BeautifulSoup(data, parser), repeat)
+        print(("BS4+%s parsed the markup in %.3fs." % (parser, best)))
+
+
+def benchmark_whitespace_nodes(num_rows: int = 5000, repeat: int = 3) -> None:
+    """Compare the size of a tree built from a pretty-printed document,
+    and how long it takes to build, with and without whitespace nodes.
+    """
+    import gc
+    import tracemalloc
+
+    print(("Whitespace node benchmark on Beautiful Soup %s" % __version__))
+    rows = "".join(
+        "<tr><td>%s</td><td><a href='/%d'>%s</a></td></tr>" % (rword(), i, rsentence())
+        for i in range(num_rows)
+    )
+    data = BeautifulSoup(
+        "<html><body><table>%s</table></body></html>" % rows, "html.parser"
+    ).prettify()
+    print(("Generated a pretty-printed document (%d bytes)." % len(data)))
+
+    for parser in ["lxml", "html.parser", "html5lib"]:
+        try:
+            BeautifulSoup("", parser)
+        except Exception:
+            print(("%s is not available." % parser))
+            continue
+        for keep in (True, False):
+            best = _best_of(
+                lambda: BeautifulSoup(data, parser, keep_whitespace_nodes=keep),
+                repeat,
+            )
+
+            gc.collect()
+            tracemalloc.start()
+            try:
+                soup = BeautifulSoup(data, parser, keep_whitespace_nodes=keep)
+                gc.collect()
+                used, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            nodes = sum(1 for element in soup.descendants)
+            print(
+                (
+                    "%s, keep_whitespace_nodes=%s: %d nodes, %d bytes, %.3fs."
+                    % (parser, keep, nodes, used, best)
+                )
+            )
+
+
+def benchmark_modification(
+    num_children: int = 10000, parser: str = "html.parser"
+) -> None:
+    """Time some operations that remove a lot of children from the
+    same parent.
+    """
+    print(("Tree modification benchmark on Beautiful Soup %s" % __version__))
+    data = "<div>%s</div>" % "".join(
+        '%s<br><div class="ad">%s</div><span>%s</span>' % (rsentence(), rword(), rword())
+        for i in range(num_children // 4)
+    )
+    print(("Generated a <div> with %d children." % num_children))
+
+    for description, operation in (
+        ("extract() every <br>", lambda soup: [x.extract() for x in soup("br")]),
+        (
+            "decompose() every ad",
+            lambda soup: [x.decompose() for x in soup("div", class_="ad")],
+        ),
+        ("unwrap() every <span>", lambda soup: [x.unwrap() for x in soup("span")]),
+        (
+            "extract() every <br>, last first",
+            lambda soup: [x.extract() for x in reversed(soup("br"))],
+        ),
+        ("ResultSet.extract() every <br>", lambda soup: soup("br").extract()),
+        (
+            "ResultSet.decompose() every ad",
+            lambda soup: soup("div", class_="ad").decompose(),
+        ),
+    ):
+        soup = BeautifulSoup(data, parser)
+        a = time.time()
+        operation(soup)
+        b = time.time()
+        print(("%s: %.3fs" % (description, b - a)))
+
+
+def benchmark_import(repeat: int = 5, num_modules: int = 5) -> None:
+    """Measure how long it takes to import Beautiful Soup in a new
+    Python process, using ``python -X importtime``.
+
+    :param repeat: Import Beautiful Soup this many times, each in a
+       new process, and report the fastest.
+    :param num_modules: Also report this many of the modules that
+       took the most time to import on their own.
+    """
+    import subprocess
+
+    print(("Import benchmark on Beautiful Soup %s" % __version__))
+    runs: List[Dict[str, Tuple[int, int]]] = []
+    for i in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import bs4"],
+            capture_output=True,
+            text=True,
+        )
+        # Each line looks like "import time: self | cumulative | name".
+        times: Dict[str, Tuple[int, int]] = {}
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            fields = line[len("import time:") :].split("|")
+            if len(fields) != 3 or not fields[0].strip().isdigit():
+                continue
+            times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+        if "bs4" not in times:
+            print(process.stderr)
+            return
+        runs.append(times)
+    best = min(runs, key=lambda times: times["bs4"][1])
+
+    print(("Importing bs4 took %.1fms." % (best["bs4"][1] / 1000)))
+    slowest = sorted(best.items(), key=lambda x: x[1][0], reverse=True)
+    for name, (self_time, cumulative) in slowest[:num_modules]:
+        print(("%s: %.1fms on its own." % (name, self_time / 1000)))
+
+
 def profile(num_elements: int = 100000, parser: str = "lxml") -> None:
     """Use Python's profiler on a randomly generated document."""
     filehandle = tempfile.NamedTemporaryFile()
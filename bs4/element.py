@@ -3,8 +3,10 @@ from __future__ import annotations
 # Use of this source code is governed by the MIT license.
 __license__ = "MIT"
 
+import codecs
 import re
 import warnings
+import weakref
 
 from bs4.css import CSS
 from bs4._deprecation import (
@@ -24,6 +26,7 @@ from typing import (
     Callable,
     Dict,
     Generic,
+    IO,
     Iterable,
     Iterator,
     List,
@@ -31,6 +34,7 @@ from typing import (
     Optional,
     Pattern,
     Set,
+    SupportsIndex,
     TYPE_CHECKING,
     Tuple,
     Type,
@@ -97,6 +101,32 @@ DEFAULT_OUTPUT_ENCODING: str = "utf-8"
 #: A regular expression that can be used to split on whitespace.
 nonwhitespace_re: Pattern[str] = re.compile(r"\S+")
 
+#: Every `ElementIndex` currently in use. While there aren't any,
+#: changes to parse trees don't need to be tracked.
+#:
+#: :meta private:
+_live_indexes: weakref.WeakSet[ElementIndex] = weakref.WeakSet()
+
+
+def _tree_changed(tag: Optional[Tag]) -> None:
+    """Note that ``tag`` has been modified in a way that might make an
+    `ElementIndex` out of date: an element was inserted into it or
+    removed from it, or it was renamed, or its attributes changed.
+
+    Only an `ElementIndex` belonging to ``tag`` or one of its
+    ancestors is affected.
+
+    :meta private:
+    """
+    if not _live_indexes:
+        return
+    while tag is not None:
+        index = tag._element_index
+        if index is not None:
+            index.stale = True
+        tag = tag.parent
+
+
 #: These encodings are recognized by Python (so `Tag.encode`
 #: could theoretically support them) but XML and HTML don't recognize
 #: them (so they should not show up in an XML or HTML document as that
@@ -214,27 +244,171 @@ class CharsetMetaAttributeValue(AttributeValueWithCharsetSubstitution):
         return eventual_encoding
 
 
-class AttributeValueList(List[str]):
+class _AttributeContainer(object):
+    """Behavior shared by `AttributeValueList` and `AttributeDict`.
+
+    Once a `Tag` depends on one of these objects staying the same (by
+    memoizing its attribute string, or by being covered by an
+    `ElementIndex`), the object keeps a reference to that tag, and
+    tells it when it changes.
+
+    :meta private:
+    """
+
+    __slots__ = ()
+
+    _tag: Optional[Tag]
+
+    def _changed(self) -> None:
+        """Note that this object has changed."""
+        tag = getattr(self, "_tag", None)
+        if tag is not None:
+            tag._attribute_string = None
+            _tree_changed(tag)
+
+    def __getstate__(self) -> None:
+        # The reference to a Tag is not part of this object's state.
+        return None
+
+
+def _claim(container: Union[AttributeValueList, AttributeDict], tag: Tag) -> bool:
+    """Make sure that changes to an `AttributeValueList` or
+    `AttributeDict` will be reported to ``tag``.
+
+    :return: False if changes are already being reported to some
+        other tag which is still using the container. A container can
+        only report to one tag.
+
+    :meta private:
+    """
+    owner = getattr(container, "_tag", None)
+    if owner is not None and owner is not tag and owner._uses(container):
+        return False
+    container._tag = tag
+    return True
+
+
+class AttributeValueList(_AttributeContainer, List[str]):
     """Class for the list used to hold the values of attributes which
-    have multiple values (such as HTML's 'class'). It's just a regular
-    list, but you can subclass it and pass it in to the TreeBuilder
+    have multiple values (such as HTML's 'class'). It works like a
+    regular list, but it tells the `Tag` using it when it's
+    modified. You can subclass it and pass it in to the TreeBuilder
     constructor as attribute_value_list_class, to have your subclass
     instantiated instead.
     """
 
+    # Changing one of these lists changes the attributes of some tag,
+    # which might make an ElementIndex or a memoized attribute string
+    # out of date.
+
+    __slots__ = ("_tag",)
+
+    def __setitem__(self, *args: Any) -> None:
+        self._changed()
+        super().__setitem__(*args)
+
+    def __delitem__(self, *args: Any) -> None:
+        self._changed()
+        super().__delitem__(*args)
+
+    # The in-place operators are defined under another name and
+    # aliased, because mypy won't accept a direct override whose
+    # signature differs from the corresponding binary operator's.
+    def _iadd(self, other: Iterable[str]) -> Self:
+        self._changed()
+        return super().__iadd__(other)
+
+    __iadd__ = _iadd
+
+    def append(self, value: str) -> None:
+        self._changed()
+        super().append(value)
+
+    def extend(self, values: Iterable[str]) -> None:
+        self._changed()
+        super().extend(values)
+
+    def insert(self, index: SupportsIndex, value: str) -> None:
+        self._changed()
+        super().insert(index, value)
+
+    def remove(self, value: str) -> None:
+        self._changed()
+        super().remove(value)
+
+    def pop(self, index: SupportsIndex = -1) -> str:
+        self._changed()
+        return super().pop(index)
+
+    def clear(self) -> None:
+        self._changed()
+        super().clear()
 
-class AttributeDict(dict[Any,Any]):
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._changed()
+        super().sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        self._changed()
+        super().reverse()
+
+
+class AttributeDict(_AttributeContainer, dict[Any,Any]):
     """Superclass for the dictionary used to hold a tag's
-    attributes. You can use this, but it's just a regular dict with no
-    special logic.
+    attributes. It works like a regular dict, but it tells the
+    `Tag` using it when it's modified, so the tag can throw away
+    anything it's calculated from its old attributes.
     """
 
+    # Changing one of these dictionaries changes the attributes of
+    # some tag, which might make an ElementIndex or a memoized
+    # attribute string out of date.
+
+    __slots__ = ("_tag",)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._changed()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self._changed()
+        super().__delitem__(key)
+
+    # See AttributeValueList._iadd.
+    def _ior(self, other: Any) -> Self:
+        self._changed()
+        return super().__ior__(other)
+
+    __ior__ = _ior
+
+    def clear(self) -> None:
+        self._changed()
+        super().clear()
+
+    def pop(self, *args: Any) -> Any:
+        self._changed()
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[Any, Any]:
+        self._changed()
+        return super().popitem()
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._changed()
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self._changed()
+        super().update(*args, **kwargs)
+
 
 class XMLAttributeDict(AttributeDict):
     """A dictionary for holding a Tag's attributes, which processes
     incoming values for consistency with the HTML spec.
     """
 
+    __slots__ = ()
+
     def __setitem__(self, key: str, value: Any) -> None:
         """Set an attribute value, possibly modifying it to comply with
         the XML spec.
@@ -273,6 +447,8 @@ class HTMLAttributeDict(AttributeDict):
     around boolean attributes that XML doesn't have.
     """
 
+    __slots__ = ()
+
     def __setitem__(self, key: str, value: Any) -> None:
         """Set an attribute value, possibly modifying it to comply
         with the HTML spec,
@@ -353,6 +529,14 @@ class PageElement(object):
     meaning "a `Tag` or a `NavigableString`."
     """
 
+    # PageElement can't put the linkage attributes in its own
+    # __slots__: NavigableString is also a subclass of str, and two
+    # bases with non-empty slot layouts conflict. The concrete classes
+    # declare those slots themselves. Declaring __dict__ here (it's
+    # only allocated when actually used) keeps PageElement's own
+    # attribute assignments valid for type checkers.
+    __slots__ = ("__dict__", "__weakref__")
+
     #: In general, we can't tell just by looking at an element whether
     #: it's contained in an XML document or an HTML document. But for
     #: `Tag` objects (q.v.) we can store this information at parse time.
@@ -593,10 +777,14 @@ class PageElement(object):
 
         :return: this `PageElement`, no longer part of the tree.
         """
-        if self.parent is not None:
+        parent = self.parent
+        if parent is not None:
+            _tree_changed(parent)
             if _self_index is None:
-                _self_index = self.parent.index(self)
-            del self.parent.contents[_self_index]
+                _self_index = parent.index(self)
+            del parent.contents[_self_index]
+            if parent._child_positions is not None:
+                parent._child_positions.removed(_self_index, self)
 
         # Find the two elements that would be next to each other if
         # this element (and any children) hadn't been parsed. Connect
@@ -644,11 +832,24 @@ class PageElement(object):
         `PageElement.decomposed` property.
         """
         self.extract()
+        self._wipe()
+
+    def _wipe(self) -> None:
+        """Wipe out this `PageElement` and everything beneath it. It
+        must already have been extracted from the tree.
+
+        :meta private:
+        """
         e: _AtMostOneElement = self
         next_up: _AtMostOneElement = None
         while e is not None:
             next_up = e.next_element
             e.__dict__.clear()
+            for slot in _instance_slots(type(e)):
+                try:
+                    delattr(e, slot)
+                except AttributeError:
+                    pass
             if isinstance(e, Tag):
                 e.contents = []
             e._decomposed = True
@@ -1083,10 +1284,19 @@ class PageElement(object):
         string: Optional[_StrainableString],
         limit: Optional[int],
         generator: Iterator[PageElement],
+        _index: Optional[ElementIndex] = None,
+        /,
         _stacklevel: int = 3,
         **kwargs: _StrainableAttribute,
     ) -> _QueryResults:
-        """Iterates over a generator looking for things that match."""
+        """Iterates over a generator looking for things that match.
+
+        :param _index: An up-to-date `ElementIndex` covering everything
+            in ``generator``. If the index can narrow down the
+            possible matches, only those elements will be checked.
+            This can't be passed as a keyword argument, so it can't be
+            confused with an attribute filter in ``kwargs``.
+        """
 
         if string is None and "text" in kwargs:
             string = kwargs.pop("text")
@@ -1114,6 +1324,11 @@ class PageElement(object):
         else:
             matcher = SoupStrainer(name, attrs, string, **kwargs)
 
+        if _index is not None:
+            candidates = _index.candidates(matcher)
+            if candidates is not None:
+                generator = iter(candidates)
+
         result: Iterable[_OneElement]
         if string is None and not limit and not attrs and not kwargs:
             if name is True or name is None:
@@ -1288,6 +1503,19 @@ class NavigableString(str, PageElement):
     #: in an HTML comment.
     SUFFIX: str = ""
 
+    # Every parsed string carries these five references, so they live
+    # in slots rather than in a per-instance __dict__. The __dict__
+    # slot inherited from PageElement means arbitrary attributes can
+    # still be set on a string; it's only allocated if someone
+    # actually does that.
+    __slots__ = (
+        "parent",
+        "next_element",
+        "previous_element",
+        "next_sibling",
+        "previous_sibling",
+    )
+
     def __new__(cls, value: Union[str, bytes]) -> Self:
         """Create a new NavigableString.
 
@@ -1300,7 +1528,6 @@ class NavigableString(str, PageElement):
             u = str.__new__(cls, value)
         else:
             u = str.__new__(cls, value, DEFAULT_OUTPUT_ENCODING)
-        u.hidden = False
         u.setup()
         return u
 
@@ -1566,6 +1793,138 @@ class RubyParenthesisString(NavigableString):
     """
 
 
+class TagDescriptor(object):
+    """Everything a `TreeBuilder` has to say about tags with a
+    particular name.
+
+    A `TreeBuilder` creates one `TagDescriptor` for each distinct tag
+    name it encounters, and every `Tag` with that name refers to
+    it. A `Tag` created without a `TreeBuilder` gets a `TagDescriptor`
+    of its own.
+
+    :param name: The tag name being described.
+    :param can_be_empty_element: If True, a tag with this name should be
+        represented as <tag/> when it has no contents. If False, it should
+        be represented as <tag></tag>.
+    :param cdata_list_attributes: A dictionary of attributes whose values
+        should be parsed as lists of strings if they ever show up on a tag
+        with this name.
+    :param preserve_whitespace_tags: Names of tags whose contents
+        should have their whitespace preserved.
+    :param interesting_string_types: The types of strings considered
+        interesting by methods like `Tag.strings` and `PageElement.get_text`.
+    :param string_container: The `NavigableString` subclass to use for
+        strings found inside a tag with this name, if it's not the default.
+    :param shared: If True, this object is shared between many `Tag`
+        objects and must not be modified. A `Tag` that needs to modify
+        its descriptor will make itself a copy first.
+    """
+
+    __slots__ = (
+        "name",
+        "can_be_empty_element",
+        "cdata_list_attributes",
+        "preserve_whitespace_tags",
+        "interesting_string_types",
+        "string_container",
+        "preserves_whitespace",
+        "shared",
+    )
+
+    name: str
+    can_be_empty_element: Optional[bool]
+    cdata_list_attributes: Optional[Dict[str, Set[str]]]
+    preserve_whitespace_tags: Optional[Set[str]]
+    interesting_string_types: Optional[Set[Type[NavigableString]]]
+    string_container: Optional[Type[NavigableString]]
+
+    #: Whether the name being described shows up in
+    #: `TagDescriptor.preserve_whitespace_tags`.
+    preserves_whitespace: bool
+    shared: bool
+
+    def __init__(
+        self,
+        name: str,
+        can_be_empty_element: Optional[bool] = None,
+        cdata_list_attributes: Optional[Dict[str, Set[str]]] = None,
+        preserve_whitespace_tags: Optional[Set[str]] = None,
+        interesting_string_types: Optional[Set[Type[NavigableString]]] = None,
+        string_container: Optional[Type[NavigableString]] = None,
+        shared: bool = False,
+    ):
+        self.name = name
+        self.can_be_empty_element = can_be_empty_element
+        self.cdata_list_attributes = cdata_list_attributes
+        self.preserve_whitespace_tags = preserve_whitespace_tags
+        self.interesting_string_types = interesting_string_types
+        self.string_container = string_container
+        self.preserves_whitespace = bool(
+            preserve_whitespace_tags and name in preserve_whitespace_tags
+        )
+        self.shared = shared
+
+    @classmethod
+    def from_builder(
+        cls, builder: TreeBuilder, name: str, shared: bool = False
+    ) -> TagDescriptor:
+        """Calculate how a `TreeBuilder` treats tags with a given name.
+
+        :param builder: The `TreeBuilder` to consult. Only its
+            configuration attributes and its ``can_be_empty_element``
+            method are used.
+        :param name: The tag name being described.
+        :param shared: Whether the new descriptor will be shared
+            between many `Tag` objects.
+        """
+        string_container = builder.string_containers.get(name)
+        if string_container is None:
+            interesting_string_types = Tag.MAIN_CONTENT_STRING_TYPES
+        else:
+            # This sort of tag uses a special string container
+            # subclass for most of its strings.
+            interesting_string_types = {string_container}
+        return cls(
+            name,
+            can_be_empty_element=builder.can_be_empty_element(name),
+            cdata_list_attributes=builder.cdata_list_attributes,
+            preserve_whitespace_tags=builder.preserve_whitespace_tags,
+            interesting_string_types=interesting_string_types,
+            string_container=string_container,
+            shared=shared,
+        )
+
+    def copy(self) -> TagDescriptor:
+        """Create an unshared copy of this descriptor."""
+        return TagDescriptor(
+            self.name,
+            self.can_be_empty_element,
+            self.cdata_list_attributes,
+            self.preserve_whitespace_tags,
+            self.interesting_string_types,
+            self.string_container,
+        )
+
+    def __repr__(self) -> str:
+        return "<%s for %r>" % (self.__class__.__name__, self.name)
+
+
+def _builder_tag_descriptor(builder: TreeBuilder, name: str) -> TagDescriptor:
+    """Find the `TagDescriptor` a `TreeBuilder` uses for tags with a
+    given name.
+
+    A builder that doesn't subclass `TreeBuilder` may not implement
+    `TreeBuilder.tag_descriptor`; in that case a new descriptor is
+    calculated from the builder's configuration each time.
+
+    :meta private:
+    """
+    tag_descriptor = getattr(builder, "tag_descriptor", None)
+    if tag_descriptor is None:
+        return TagDescriptor.from_builder(builder, name)
+    return tag_descriptor(name)
+
+
 class Tag(PageElement):
     """An HTML or XML tag that is part of a parse tree, along with its
     attributes, contents, and relationships to other parts of the tree.
@@ -1615,6 +1974,39 @@ class Tag(PageElement):
 
     """
 
+    # The per-tag state set up by __init__ lives in slots rather than
+    # in a per-instance __dict__, which makes a parsed tree noticeably
+    # smaller. The __dict__ slot inherited from PageElement keeps it
+    # possible to set arbitrary attributes on a Tag (BeautifulSoup
+    # itself relies on this); it's only allocated if someone actually
+    # does that.
+    #
+    # Every one of these slots must be given a value in __init__;
+    # otherwise, reading an unset slot would fall through to
+    # Tag.__getattr__ and turn into a search of the tree.
+    __slots__ = (
+        "parent",
+        "next_element",
+        "previous_element",
+        "next_sibling",
+        "previous_sibling",
+        "parser_class",
+        "_name",
+        "namespace",
+        "_namespaces",
+        "prefix",
+        "sourceline",
+        "sourcepos",
+        "attribute_value_list_class",
+        "_attrs",
+        "known_xml",
+        "contents",
+        "hidden",
+        "_descriptor",
+        "_attribute_string",
+        "_child_positions",
+    )
+
     def __init__(
         self,
         parser: Optional[BeautifulSoup] = None,
@@ -1645,7 +2037,10 @@ class Tag(PageElement):
             self.parser_class = parser.__class__
         if name is None:
             raise ValueError("No value provided for new tag's name.")
-        self.name = name
+        # A brand new tag can't be part of anyone's index yet, so
+        # name and attrs are set up without going through their
+        # setters.
+        self._name = name
         self.namespace = namespace
         self._namespaces = namespaces or {}
         self.prefix = prefix
@@ -1672,14 +2067,14 @@ class Tag(PageElement):
         self.attribute_value_list_class = attribute_value_list_class
 
         if attrs is None:
-            self.attrs = attr_dict_class()
+            self._attrs = attr_dict_class()
         else:
             if builder is not None and builder.cdata_list_attributes:
-                self.attrs = builder._replace_cdata_list_attribute_values(
-                    self.name, attrs
+                self._attrs = builder._replace_cdata_list_attribute_values(
+                    name, attrs
                 )
             else:
-                self.attrs = attr_dict_class()
+                self._attrs = attr_dict_class()
                 # Make sure that the values of any multi-valued
                 # attributes (e.g. when a Tag is copied) are stored in
                 # new lists.
@@ -1695,62 +2090,153 @@ class Tag(PageElement):
         else:
             self.known_xml = is_xml
         self.contents: List[PageElement] = []
+        self._child_positions = None
         self.setup(parent, previous)
         self.hidden = False
+        self._attribute_string = None
 
         if builder is None:
             # In the absence of a TreeBuilder, use whatever values were
             # passed in here. They're probably None, unless this is a copy of some
             # other tag.
-            self.can_be_empty_element = can_be_empty_element
-            self.cdata_list_attributes = cdata_list_attributes
-            self.preserve_whitespace_tags = preserve_whitespace_tags
-            self.interesting_string_types = interesting_string_types
+            self._descriptor = TagDescriptor(
+                name,
+                can_be_empty_element,
+                cdata_list_attributes,
+                preserve_whitespace_tags,
+                interesting_string_types,
+            )
         else:
+            # Everything the TreeBuilder can tell us about tags with
+            # this name (whether they might be empty-element tags,
+            # which attributes might need to be treated as lists,
+            # which string types are interesting, etc.) is
+            # calculated once and shared between all such tags.
+            self._descriptor = _builder_tag_descriptor(builder, name)
+
             # Set up any substitutions for this tag, such as the charset in a META tag.
             self.attribute_value_list_class = builder.attribute_value_list_class
             builder.set_up_substitutions(self)
 
-            # Ask the TreeBuilder whether this tag might be an empty-element tag.
-            self.can_be_empty_element = builder.can_be_empty_element(name)
-
-            # Keep track of the list of attributes of this tag that
-            # might need to be treated as a list.
-            #
-            # For performance reasons, we store the whole data structure
-            # rather than asking the question of every tag. Asking would
-            # require building a new data structure every time, and
-            # (unlike can_be_empty_element), we almost never need
-            # to check this.
-            self.cdata_list_attributes = builder.cdata_list_attributes
-
-            # Keep track of the names that might cause this tag to be treated as a
-            # whitespace-preserved tag.
-            self.preserve_whitespace_tags = builder.preserve_whitespace_tags
-
-            if self.name in builder.string_containers:
-                # This sort of tag uses a special string container
-                # subclass for most of its strings. We need to be able
-                # to look up the proper container subclass.
-                self.interesting_string_types = {builder.string_containers[self.name]}
-            else:
-                self.interesting_string_types = self.MAIN_CONTENT_STRING_TYPES
-
     parser_class: Optional[type[BeautifulSoup]]
-    name: str
     namespace: Optional[str]
     prefix: Optional[str]
-    attrs: _AttributeValues
     sourceline: Optional[int]
     sourcepos: Optional[int]
     known_xml: Optional[bool]
     contents: List[PageElement]
     hidden: bool
-    interesting_string_types: Optional[Set[Type[NavigableString]]]
+    _descriptor: TagDescriptor  #: :meta private:
+    _name: str  #: :meta private:
 
-    can_be_empty_element: Optional[bool]
-    cdata_list_attributes: Optional[Dict[str, Set[str]]]
-    preserve_whitespace_tags: Optional[Set[str]]
+    #: The last attribute string produced by `Tag._format_tag`, along
+    #: with the `Formatter._attribute_token` and encoding used to
+    #: produce it.
+    #:
+    #: :meta private:
+    _attribute_string: Optional[Tuple[object, Optional[str], str]]
+    _attrs: _AttributeValues  #: :meta private:
+
+    #: Where each of this tag's children can be found in
+    #: `Tag.contents`, once `Tag.index` has needed to know.
+    #:
+    #: :meta private:
+    _child_positions: Optional[_ChildPositions]
+
+    #: An `ElementIndex` covering this tag's descendants, if
+    #: `Tag.enable_index` has been called.
+    #:
+    #: :meta private:
+    _element_index: Optional[ElementIndex] = None
+
+    @property
+    def name(self) -> str:
+        """The name of this tag, e.g. "p" or "a"."""
+        return self._name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        _tree_changed(self)
+        self._name = value
+
+    @property
+    def attrs(self) -> _AttributeValues:
+        """This tag's attributes, as a dictionary."""
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, value: _AttributeValues) -> None:
+        _tree_changed(self)
+        self._attrs = value
+        self._attribute_string = None
+
+    def _uses(self, container: Any) -> bool:
+        """Is the given object this tag's attribute dictionary, or
+        one of its attribute values?
+
+        :meta private:
+        """
+        attrs = self._attrs
+        return container is attrs or any(
+            value is container for value in attrs.values()
+        )
+
+    def _unshared_descriptor(self) -> TagDescriptor:
+        """Make sure this tag's `TagDescriptor` isn't shared with any other
+        tag, so it can be safely modified.
+
+        :meta private:
+        """
+        descriptor = self._descriptor
+        if descriptor.shared:
+            descriptor = self._descriptor = descriptor.copy()
+        return descriptor
+
+    @property
+    def can_be_empty_element(self) -> Optional[bool]:
+        """If True, this tag should be represented as <tag/> when it has
+        no contents. If False, it should be represented as <tag></tag>.
+        """
+        return self._descriptor.can_be_empty_element
+
+    @can_be_empty_element.setter
+    def can_be_empty_element(self, value: Optional[bool]) -> None:
+        self._unshared_descriptor().can_be_empty_element = value
+
+    @property
+    def cdata_list_attributes(self) -> Optional[Dict[str, Set[str]]]:
+        """Attributes whose values should be parsed as lists of strings
+        if they show up on this tag.
+        """
+        return self._descriptor.cdata_list_attributes
+
+    @cdata_list_attributes.setter
+    def cdata_list_attributes(self, value: Optional[Dict[str, Set[str]]]) -> None:
+        self._unshared_descriptor().cdata_list_attributes = value
+
+    @property
+    def preserve_whitespace_tags(self) -> Optional[Set[str]]:
+        """Names of tags whose contents should have their whitespace
+        preserved.
+        """
+        return self._descriptor.preserve_whitespace_tags
+
+    @preserve_whitespace_tags.setter
+    def preserve_whitespace_tags(self, value: Optional[Set[str]]) -> None:
+        self._unshared_descriptor().preserve_whitespace_tags = value
+
+    @property
+    def interesting_string_types(self) -> Optional[Set[Type[NavigableString]]]:
+        """The types of strings that are interesting enough to be
+        considered by methods like `Tag.strings` and `PageElement.get_text`.
+        """
+        return self._descriptor.interesting_string_types
+
+    @interesting_string_types.setter
+    def interesting_string_types(
+        self, value: Optional[Set[Type[NavigableString]]]
+    ) -> None:
+        self._unshared_descriptor().interesting_string_types = value
 
     #: :meta private:
     parserClass = _deprecated_alias("parserClass", "parser_class", "4.0.0")
@@ -1933,6 +2419,7 @@ class Tag(PageElement):
         return inserted
 
     def _insert(self, position: int, new_child: _InsertableElement) -> List[PageElement]:
+        _tree_changed(self)
         if new_child is None:
             raise ValueError("Cannot insert None into a tag.")
         if new_child is self:
@@ -1962,7 +2449,9 @@ class Tag(PageElement):
                     # We're 'inserting' an element into its current location.
                     # This is a no-op.
                     return [new_child]
-            new_child.extract()
+                new_child.extract(_self_index=current_index)
+            else:
+                new_child.extract()
 
         new_child.parent = self
         previous_child = None
@@ -2016,6 +2505,8 @@ class Tag(PageElement):
                 new_childs_last_element
             )
         self.contents.insert(position, new_child)
+        if self._child_positions is not None:
+            self._child_positions.inserted(position, new_child)
 
         return [new_child]
 
@@ -2098,11 +2589,44 @@ class Tag(PageElement):
             more destructive method) will be called instead of
             `PageElement.extract`.
         """
-        for element in self.contents[:]:
-            if decompose:
-                element.decompose()
-            else:
-                element.extract()
+        _remove_elements(list(self.contents), decompose)
+
+    def remove_all(
+        self, elements: Iterable[PageElement], decompose: bool = False
+    ) -> None:
+        """Remove a lot of elements from beneath this `Tag` at once.
+
+        This does the same thing as calling `PageElement.extract` on
+        each element, but the elements are grouped by parent, so each
+        parent's .contents is only rebuilt once, no matter how many
+        of its children are removed.
+
+        :param elements: The `PageElement` objects to remove. Each one
+            must be somewhere beneath this `Tag`.
+
+        :param decompose: If this is True, the elements will be
+            destroyed, as with `PageElement.decompose`.
+
+        :raise ValueError: If one of the elements isn't beneath this
+            `Tag`. In that case nothing is removed.
+        """
+        elements = list(elements)
+
+        # Make sure every element is beneath this Tag before changing
+        # anything. Remember the tags known to be beneath this one, so
+        # that most elements only need to look at their immediate
+        # parent.
+        inside: Set[int] = {id(self)}
+        for element in elements:
+            path = []
+            parent = element.parent
+            while parent is not None and id(parent) not in inside:
+                path.append(id(parent))
+                parent = parent.parent
+            if parent is None:
+                raise ValueError("Tag.remove_all: element not inside tag")
+            inside.update(path)
+        _remove_elements(elements, decompose)
 
     def smooth(self) -> None:
         """Smooth out the children of this `Tag` by consolidating consecutive
@@ -2152,10 +2676,9 @@ class Tag(PageElement):
 
         :param element: Look for this `PageElement` in this object's contents.
         """
-        for i, child in enumerate(self.contents):
-            if child is element:
-                return i
-        raise ValueError("Tag.index: element not in tag")
+        if self._child_positions is None:
+            self._child_positions = _ChildPositions()
+        return self._child_positions.find(self.contents, element)
 
     def get(
         self, key: str, default: Optional[_AttributeValue] = None
@@ -2357,7 +2880,123 @@ class Tag(PageElement):
             parse tree. This is only used by `Tag.decode_contents` and
             you probably won't need to use it.
         """
-        pieces = []
+        return "".join(
+            self._decode_pieces(indent_level, eventual_encoding, formatter, iterator)
+        )
+
+    def iter_encode(
+        self,
+        encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+        buffer_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        """Render this `Tag` and its contents as a series of bytestrings.
+
+        Joining the bytestrings together gives the same result as
+        `Tag.encode`, but the whole document never has to be in
+        memory at once.
+
+        :param encoding: The encoding to use when converting to
+           bytestrings.
+        :param indent_level: As with `Tag.encode`.
+        :param formatter: Either a `Formatter` object, or a string naming one of
+            the standard formatters.
+        :param errors: An error handling strategy, as with `Tag.encode`.
+        :param buffer_size: Output is gathered up until there are
+            at least this many characters of it, then encoded and
+            yielded as a single bytestring.
+        """
+        encoder = codecs.getincrementalencoder(encoding)(errors)
+        for chunk in self._buffered_pieces(
+            indent_level, encoding, formatter, buffer_size
+        ):
+            data = encoder.encode(chunk)
+            if data:
+                yield data
+        data = encoder.encode("", True)
+        if data:
+            yield data
+
+    def write_to(
+        self,
+        fp: IO[Any],
+        encoding: Optional[_Encoding] = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+        buffer_size: int = 64 * 1024,
+    ) -> int:
+        """Write this `Tag` and its contents to a file, a piece at a time.
+
+        This produces the same output as writing the result of
+        `Tag.encode` (or `Tag.decode`, if ``encoding`` is None), but
+        it doesn't build the entire document in memory first.
+
+        :param fp: A file-like object. If ``encoding`` is None, it must
+            accept strings; otherwise it must accept bytestrings.
+        :param encoding: The encoding to use, or None to write Unicode
+            strings.
+        :param indent_level: As with `Tag.encode`.
+        :param formatter: Either a `Formatter` object, or a string naming one of
+            the standard formatters.
+        :param errors: An error handling strategy, as with `Tag.encode`.
+        :param buffer_size: The approximate number of characters
+            to write in each call to ``fp.write``.
+        :return: The number of characters or bytes written.
+        """
+        chunks: Iterable[Union[str, bytes]]
+        if encoding is None:
+            chunks = self._buffered_pieces(
+                indent_level, DEFAULT_OUTPUT_ENCODING, formatter, buffer_size
+            )
+        else:
+            chunks = self.iter_encode(
+                encoding, indent_level, formatter, errors, buffer_size
+            )
+        written = 0
+        for chunk in chunks:
+            fp.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _buffered_pieces(
+        self,
+        indent_level: Optional[int],
+        eventual_encoding: _Encoding,
+        formatter: _FormatterOrName,
+        buffer_size: int,
+    ) -> Iterator[str]:
+        """Gather the output of `Tag._decode_pieces` into strings of at
+        least ``buffer_size`` characters (except, possibly, the last one).
+        """
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1.")
+        buffer: List[str] = []
+        buffered = 0
+        for piece in self._decode_pieces(indent_level, eventual_encoding, formatter):
+            buffer.append(piece)
+            buffered += len(piece)
+            if buffered >= buffer_size:
+                yield "".join(buffer)
+                buffer = []
+                buffered = 0
+        if buffer:
+            yield "".join(buffer)
+
+    def _decode_pieces(
+        self,
+        indent_level: Optional[int] = None,
+        eventual_encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        formatter: _FormatterOrName = "minimal",
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[str]:
+        """Render this `Tag` and its contents as a sequence of strings
+        which, when joined together, make up the output of `Tag.decode`.
+
+        :meta private:
+        """
         # First off, turn a non-Formatter `formatter` into a Formatter
         # object. This will stop the lookup from happening over and
         # over again.
@@ -2437,8 +3076,7 @@ class Tag(PageElement):
                         )
                 if event == Tag.START_ELEMENT_EVENT:
                     indent_level += 1
-            pieces.append(piece)
-        return "".join(pieces)
+            yield piece
 
     class _TreeTraversalEvent(object):
         """An internal class representing an event in the process
@@ -2548,27 +3186,27 @@ class Tag(PageElement):
         # Then a list of attribute values, if this is an opening tag.
         attribute_string = ""
         if opening:
-            attributes = formatter.attributes(self)
-            attrs = []
-            for key, val in attributes:
-                if val is None:
-                    decoded = key
-                else:
-                    if isinstance(val, list) or isinstance(val, tuple):
-                        val = " ".join(val)
-                    elif not isinstance(val, str):
-                        val = str(val)
-                    elif (
-                        isinstance(val, AttributeValueWithCharsetSubstitution)
-                        and eventual_encoding is not None
-                    ):
-                        val = val.substitute_encoding(eventual_encoding)
-
-                    text = formatter.attribute_value(val)
-                    decoded = str(key) + "=" + formatter.quoted_attribute_value(text)
-                attrs.append(decoded)
-            if attrs:
-                attribute_string = " " + " ".join(attrs)
+            # Formatting the attributes is relatively expensive, so
+            # the result is kept around until the attributes change,
+            # or a formatter with a different configuration is used.
+            token = formatter._attribute_token
+            memo = self._attribute_string
+            if (
+                memo is not None
+                and memo[0] is token
+                and memo[1] == eventual_encoding
+            ):
+                attribute_string = memo[2]
+            else:
+                attribute_string, memoizable = self._format_attributes(
+                    eventual_encoding, formatter
+                )
+                if memoizable and token is not None:
+                    self._attribute_string = (
+                        token,
+                        eventual_encoding,
+                        attribute_string,
+                    )
 
         # Then an optional closing slash (for a void element in an
         # XML document).
@@ -2587,6 +3225,52 @@ class Tag(PageElement):
             + ">"
         )
 
+    def _format_attributes(
+        self, eventual_encoding: Optional[str], formatter: Formatter
+    ) -> Tuple[str, bool]:
+        """Format this tag's attributes for use in its opening tag.
+
+        :return: A 2-tuple (attribute_string, memoizable). If this tag
+            couldn't find out about a change to its attributes (e.g.
+            because an attribute value is a plain list rather than an
+            `AttributeValueList`), ``memoizable`` is False.
+        """
+        attrs_dict = self._attrs
+        memoizable = isinstance(attrs_dict, AttributeDict) and _claim(
+            attrs_dict, self
+        )
+        attrs = []
+        for key, val in formatter.attributes(self):
+            if val is None:
+                decoded = key
+            else:
+                if isinstance(val, list) or isinstance(val, tuple):
+                    if isinstance(val, AttributeValueList):
+                        if memoizable and not _claim(val, self):
+                            memoizable = False
+                    elif not isinstance(val, tuple):
+                        memoizable = False
+                    val = " ".join(val)
+                elif not isinstance(val, str):
+                    memoizable = False
+                    val = str(val)
+                elif isinstance(val, PageElement):
+                    # Whether a NavigableString is substituted depends
+                    # on where it is in its own tree.
+                    memoizable = False
+                elif (
+                    isinstance(val, AttributeValueWithCharsetSubstitution)
+                    and eventual_encoding is not None
+                ):
+                    val = val.substitute_encoding(eventual_encoding)
+
+                text = formatter.attribute_value(val)
+                decoded = str(key) + "=" + formatter.quoted_attribute_value(text)
+            attrs.append(decoded)
+        if attrs:
+            return " " + " ".join(attrs), memoizable
+        return "", memoizable
+
     def _should_pretty_print(self, indent_level: int = 1) -> bool:
         """Should this tag be pretty-printed?
 
@@ -2738,12 +3422,40 @@ class Tag(PageElement):
         :kwargs: Additional filters on attribute values.
         """
         generator = self.descendants
+        index = None
         if not recursive:
             generator = self.children
+        elif self._element_index is not None and self._element_index.refresh(self):
+            index = self._element_index
         return self._find_all(
-            name, attrs, string, limit, generator, _stacklevel=_stacklevel + 1, **kwargs
+            name,
+            attrs,
+            string,
+            limit,
+            generator,
+            index,
+            _stacklevel=_stacklevel + 1,
+            **kwargs,
         )
 
+    def enable_index(self) -> None:
+        """Speed up repeated calls to `Tag.find_all` and `Tag.find`
+        on this tag by keeping an `ElementIndex` of its descendants.
+
+        The index is built lazily, the first time it's needed, and
+        rebuilt whenever the tree has changed since the last
+        search. It helps the most when you run many searches by tag
+        name, id or class against a tree you're not modifying.
+        """
+        if self._element_index is None:
+            self._element_index = ElementIndex()
+
+    def disable_index(self) -> None:
+        """Stop keeping an `ElementIndex` for this tag, and free up the
+        memory it was using.
+        """
+        self._element_index = None
+
     findAll = _deprecated_function_alias("findAll", "find_all", "4.0.0")
     findChildren = _deprecated_function_alias("findChildren", "find_all", "3.0.0")
 
@@ -2858,6 +3570,363 @@ class Tag(PageElement):
 _PageElementT = TypeVar("_PageElementT", bound=PageElement)
 
 
+_SLOT_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def _instance_slots(cls: type) -> Tuple[str, ...]:
+    """Find the names of all the slots holding per-instance state
+    for objects of the given class.
+
+    :meta private:
+    """
+    names = _SLOT_NAMES.get(cls)
+    if names is None:
+        found: List[str] = []
+        for base in cls.__mro__:
+            for name in base.__dict__.get("__slots__", ()):
+                if name not in ("__dict__", "__weakref__") and name not in found:
+                    found.append(name)
+        names = _SLOT_NAMES[cls] = tuple(found)
+    return names
+
+
+def _remove_elements(
+    elements: Iterable[PageElement], decompose: bool = False
+) -> None:
+    """Remove many elements from their parse trees at once.
+
+    The result is the same as calling `PageElement.extract` (or
+    `PageElement.decompose`) on each element in turn, but each
+    affected parent has its .contents rebuilt once, and the
+    next_element/previous_element chain is repaired once for each
+    run of neighboring children that are removed together.
+
+    :meta private:
+    """
+    removed: List[PageElement] = []
+    seen: Set[int] = set()
+    by_parent: Dict[int, Tuple[Tag, Set[int]]] = {}
+    orphans: List[PageElement] = []
+    for element in elements:
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        removed.append(element)
+        parent = element.parent
+        if parent is None:
+            orphans.append(element)
+            continue
+        group = by_parent.get(id(parent))
+        if group is None:
+            group = by_parent[id(parent)] = (parent, set())
+        group[1].add(id(element))
+
+    # Find all the runs of children to remove before changing
+    # anything, so that a child whose .parent is wrong doesn't leave
+    # the tree half-modified.
+    plans = []
+    for parent, doomed in by_parent.values():
+        _tree_changed(parent)
+        runs = []
+        start = None
+        found = 0
+        for i, child in enumerate(parent.contents):
+            if id(child) in doomed:
+                found += 1
+                if start is None:
+                    start = i
+            elif start is not None:
+                runs.append((start, i))
+                start = None
+        if start is not None:
+            runs.append((start, len(parent.contents)))
+        if found != len(doomed):
+            raise ValueError("Tag.index: element not in tag")
+        plans.append((parent, runs))
+
+    for parent, runs in plans:
+        contents = parent.contents
+        for start, end in runs:
+            # Detach each element in the run, remembering what came
+            # before the run and what comes after it.
+            before = contents[start].previous_element
+            after = None
+            for child in contents[start:end]:
+                last_child = cast(PageElement, child._last_descendant())
+                after = last_child.next_element
+                child.previous_element = None
+                last_child.next_element = None
+                child.parent = None
+                child.previous_sibling = child.next_sibling = None
+
+            # Then connect the elements on either side of the run,
+            # both in parse order and as siblings.
+            if before is not None:
+                before.next_element = after
+            if after is not None:
+                after.previous_element = before
+            left = contents[start - 1] if start > 0 else None
+            right = contents[end] if end < len(contents) else None
+            if left is not None:
+                left.next_sibling = right
+            if right is not None:
+                right.previous_sibling = left
+
+        doomed = by_parent[id(parent)][1]
+        contents[:] = [child for child in contents if id(child) not in doomed]
+        parent._child_positions = None
+
+    for element in orphans:
+        element.extract()
+    if decompose:
+        for element in removed:
+            element._wipe()
+
+
+class _ChildPositions(object):
+    """Keeps track of where a `Tag`'s children are in its
+    `Tag.contents`, so that `Tag.index` doesn't have to look through
+    the whole list every time an element is extracted or inserted.
+
+    A position is only a hint, and it's checked before it's used, so
+    nothing goes wrong if `Tag.contents` is modified directly.
+
+    :meta private:
+    """
+
+    __slots__ = ("positions", "valid_until")
+
+    #: Maps the id() of each child to its last known position.
+    positions: Dict[int, int]
+
+    #: Every child before this position is known to be where
+    #: `_ChildPositions.positions` says it is.
+    valid_until: int
+
+    def __init__(self) -> None:
+        self.positions = {}
+        self.valid_until = 0
+
+    def find(self, contents: List[PageElement], element: PageElement) -> int:
+        """Find the position of ``element`` in ``contents``.
+
+        :raise ValueError: If ``element`` isn't there.
+        """
+        position = self.positions.get(id(element))
+        if (
+            position is not None
+            and position < len(contents)
+            and contents[position] is element
+        ):
+            return position
+
+        # Number the children, starting with the first one whose
+        # position might have changed. When children are removed one
+        # after another, this only has to look at the stretch between
+        # one and the next.
+        start = min(self.valid_until, len(contents))
+        position = self._renumber(contents, element, start)
+        if position is None and start > 0:
+            # Tag.contents must have been modified directly. Start
+            # over from the beginning.
+            self.positions.clear()
+            position = self._renumber(contents, element, 0)
+        if position is None:
+            raise ValueError("Tag.index: element not in tag")
+        return position
+
+    def _renumber(
+        self, contents: List[PageElement], element: PageElement, start: int
+    ) -> Optional[int]:
+        positions = self.positions
+        for i in range(start, len(contents)):
+            child = contents[i]
+            positions[id(child)] = i
+            if child is element:
+                self.valid_until = i + 1
+                return i
+        self.valid_until = len(contents)
+        return None
+
+    def removed(self, position: int, element: PageElement) -> None:
+        """Note that ``element`` was removed from ``position``, moving
+        everything after it up by one.
+        """
+        self.positions.pop(id(element), None)
+        if position < self.valid_until:
+            self.valid_until = position
+
+    def inserted(self, position: int, element: PageElement) -> None:
+        """Note that ``element`` was inserted at ``position``, moving
+        everything after it down by one.
+        """
+        self.positions[id(element)] = position
+        if position <= self.valid_until:
+            self.valid_until = position + 1
+
+
+class ElementIndex(object):
+    """A lookup table of the tags underneath some `Tag`, organized by
+    tag name and by the values of the 'id' and 'class' attributes.
+
+    An `ElementIndex` lets `Tag.find_all` jump straight to the tags
+    that might match a query like ``find_all("a")`` or
+    ``find_all(id="main")``, instead of looking at every element in
+    the tree. You won't normally create one of these yourself; call
+    `Tag.enable_index` instead.
+
+    The index is built the first time it's needed. Any change to the
+    tree underneath the tag makes it out of date, and it's rebuilt the
+    next time it's used.
+
+    Changes to a tag's attributes can only be noticed if they're kept
+    in an `AttributeDict`, with multi-valued attributes in
+    `AttributeValueList` objects, as they are in a parsed
+    document. If some tag's attributes are stored any other way (say,
+    a plain dict assigned to `Tag.attrs`), the index isn't used until
+    that changes.
+    """
+
+    #: Attributes whose values are indexed.
+    INDEXED_ATTRIBUTES: Tuple[str, ...] = ("id", "class")
+
+    #: One value of a whitespace-separated, multi-valued attribute.
+    _ONE_VALUE: Pattern[str] = re.compile("[^ \t\r\n\f]+")
+
+    #: Whether the tree has changed since this index was last built.
+    stale: bool
+
+    #: Whether every change that could make this index out of date
+    #: will be noticed. If not, the index can't be used.
+    reliable: bool
+
+    #: All the tags in the index, in document order.
+    tags: List[Tag]
+
+    #: Lists of tags, in document order, keyed by tag name.
+    names: Dict[str, List[Tag]]
+
+    #: For each attribute in `ElementIndex.INDEXED_ATTRIBUTES`, lists
+    #: of tags, in document order, keyed by attribute value. A
+    #: multi-valued attribute like 'class' is indexed under each
+    #: individual value and under the space-separated combination of
+    #: all its values.
+    attribute_values: Dict[str, Dict[str, List[Tag]]]
+
+    def __init__(self) -> None:
+        self.stale = True
+        self.reliable = False
+        self.tags = []
+        self.names = {}
+        self.attribute_values = {}
+        _live_indexes.add(self)
+
+    def refresh(self, tag: Tag) -> bool:
+        """Make sure this index reflects the current state of the
+        descendants of ``tag``, rebuilding it if necessary.
+
+        :return: Whether the index can be used.
+        """
+        if not self.stale:
+            return self.reliable
+        reliable = True
+        tags: List[Tag] = []
+        names: Dict[str, List[Tag]] = {}
+        attribute_values: Dict[str, Dict[str, List[Tag]]] = {
+            attr: {} for attr in self.INDEXED_ATTRIBUTES
+        }
+        for element in tag.descendants:
+            if not isinstance(element, Tag):
+                continue
+            tags.append(element)
+            names.setdefault(element.name, []).append(element)
+            attrs = element._attrs
+            if not isinstance(attrs, AttributeDict) or not _claim(attrs, element):
+                # An attribute might be added without the index
+                # finding out.
+                reliable = False
+            if not attrs:
+                continue
+            for attr, by_value in attribute_values.items():
+                value = attrs.get(attr)
+                if value is None:
+                    continue
+                if isinstance(value, AttributeValueList):
+                    if not _claim(value, element):
+                        reliable = False
+                elif not isinstance(value, str):
+                    reliable = False
+                for key in self._keys(value):
+                    by_value.setdefault(key, []).append(element)
+        self.tags = tags
+        self.names = names
+        self.attribute_values = attribute_values
+        self.stale = False
+        self.reliable = reliable
+        return reliable
+
+    @classmethod
+    def _keys(cls, value: Any) -> Set[str]:
+        """The keys under which a tag with the given attribute value
+        should be indexed.
+        """
+        if isinstance(value, str):
+            # A 'class' attribute that wasn't split into a list
+            # still matches each of its values in a CSS selector.
+            keys = set(cls._ONE_VALUE.findall(value))
+            keys.add(value)
+            return keys
+        if isinstance(value, list):
+            keys = set(x for x in value if isinstance(x, str))
+            if len(value) > 1 and all(isinstance(x, str) for x in value):
+                keys.add(" ".join(value))
+            return keys
+        return set()
+
+    def candidates(self, matcher: ElementFilter) -> Optional[List[Tag]]:
+        """Find the tags that might match the given `ElementFilter`.
+
+        :return: A list of tags, in document order, which includes every
+            tag in the index that ``matcher`` would match (and possibly
+            some that it wouldn't), or None if the index can't help and
+            every element needs to be checked.
+        """
+        if not isinstance(matcher, SoupStrainer):
+            return None
+        cls = type(matcher)
+        if cls.match is not SoupStrainer.match or (
+            cls.matches_tag is not SoupStrainer.matches_tag
+        ):
+            # A subclass has its own ideas about matching, which might
+            # have nothing to do with its rules.
+            return None
+        if matcher.string_rules or not (
+            matcher.name_rules or matcher.attribute_rules
+        ):
+            # The index only knows about tags, and a SoupStrainer with
+            # no name or attribute rules might match strings.
+            return None
+
+        best = self.tags
+        name_rules = matcher.name_rules
+        if len(name_rules) == 1:
+            rule = name_rules[0]
+            if rule.string is not None and ":" not in rule.string:
+                # A tag with a namespace prefix might match on its
+                # prefixed name, but an unprefixed name can only match
+                # on Tag.name.
+                best = self.names.get(rule.string, [])
+
+        for attr, rules in matcher.attribute_rules.items():
+            by_value = self.attribute_values.get(attr)
+            if by_value is None or len(rules) != 1 or rules[0].string is None:
+                continue
+            possible = by_value.get(rules[0].string, [])
+            if len(possible) < len(best):
+                best = possible
+        return best
+
+
 class ResultSet(List[_PageElementT], Generic[_PageElementT]):
     """A ResultSet is a list of `PageElement` objects, gathered as the result
     of matching an :py:class:`ElementFilter` against a parse tree. Basically, a list of
@@ -2872,6 +3941,25 @@ class ResultSet(List[_PageElementT], Generic[_PageElementT]):
         super(ResultSet, self).__init__(result)
         self.source = source
 
+    def extract(self) -> Self:
+        """Remove every element in this `ResultSet` from its parse tree.
+
+        This does the same thing as calling `PageElement.extract` on
+        each element, but it's much faster when a lot of the elements
+        share a parent.
+
+        :return: This `ResultSet`, whose elements are no longer part
+            of any tree.
+        """
+        _remove_elements(self)
+        return self
+
+    def decompose(self) -> None:
+        """Destroy every element in this `ResultSet`, as with
+        `PageElement.decompose`.
+        """
+        _remove_elements(self, decompose=True)
+
     def __getattr__(self, key: str) -> None:
         """Raise a helpful exception to explain a common code fix."""
         raise AttributeError(
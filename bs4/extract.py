@@ -0,0 +1,215 @@
+"""Run many queries against a parse tree in a single pass.
+
+Scraping a page often means pulling out dozens of fields, and each
+call to `Tag.find_all` or `Tag.select` looks at every element in
+the tree. A `Plan` looks at each element only once, and hands it to
+every query that might be interested in it::
+
+    from bs4.extract import Plan
+    from bs4.filter import SoupStrainer
+
+    plan = Plan({
+        "title": "h1",
+        "prices": SoupStrainer("span", class_="price"),
+        "links": "div.content a[href]",
+    })
+    for page in pages:
+        results = plan.run(BeautifulSoup(page, "html.parser"))
+        print(results["title"], results["prices"])
+
+Make a `Plan` once and reuse it; setting it up is the expensive part.
+"""
+
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "Plan",
+]
+
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4.css import NativeSelector, _lower
+from bs4.element import ResultSet, Tag
+from bs4.filter import ElementFilter, SoupStrainer
+
+if TYPE_CHECKING:
+    from bs4.element import PageElement
+
+#: A query for a `Plan`: a CSS selector, or an `ElementFilter`
+#: such as a `SoupStrainer`.
+_Query = Union[str, ElementFilter]
+
+#: A function that decides whether a query matches a `PageElement`.
+_Matcher = Callable[["PageElement"], bool]
+
+#: A function that decides whether a query matches a `Tag`. Queries
+#: that can only match tags are never called with strings, so they can
+#: use this narrower signature.
+_TagMatcher = Callable[["Tag"], bool]
+
+
+class _DispatchTable(object):
+    """Decides which queries in a `Plan` need to look at which
+    elements.
+    """
+
+    #: Queries that are only interested in tags with a certain name,
+    #: keyed by that name. Names from CSS type selectors are
+    #: lowercase.
+    by_name: Dict[str, List[Tuple[str, _TagMatcher]]]
+
+    #: Queries that might be interested in any tag.
+    every_tag: List[Tuple[str, _TagMatcher]]
+
+    #: Queries that might be interested in strings as well as tags.
+    every_element: List[Tuple[str, _Matcher]]
+
+    #: CSS selectors that have to be run separately, by soupsieve.
+    separate: Dict[str, str]
+
+    def __init__(self, queries: Dict[str, _Query], native: bool):
+        self.by_name = {}
+        self.every_tag = []
+        self.every_element = []
+        self.separate = {}
+        for name, query in queries.items():
+            if isinstance(query, str):
+                selector = NativeSelector.compile(query) if native else None
+                if selector is None:
+                    self.separate[name] = query
+                else:
+                    self._add_selector(name, selector)
+            else:
+                self._add_filter(name, query)
+
+    def _add_selector(self, name: str, selector: NativeSelector) -> None:
+        # Only descendants are matched, and those are always Tags
+        # other than the BeautifulSoup object, so the type checks in
+        # NativeSelector.match can be skipped.
+        matcher = selector._matches
+        tag_names = set()
+        for complex_selector in selector.selectors:
+            tag_name = complex_selector[0][0].name
+            if tag_name is None:
+                self.every_tag.append((name, matcher))
+                return
+            tag_names.add(tag_name)
+        for tag_name in tag_names:
+            self.by_name.setdefault(tag_name, []).append((name, matcher))
+
+    def _add_filter(self, name: str, query: ElementFilter) -> None:
+        if isinstance(query, SoupStrainer) and not query.string_rules:
+            if query.name_rules or query.attribute_rules:
+                # This SoupStrainer can only match tags. If it's
+                # looking for one exact name without a namespace
+                # prefix, it can only match tags with that name.
+                rules = query.name_rules
+                if (
+                    len(rules) == 1
+                    and rules[0].string is not None
+                    and ":" not in rules[0].string
+                ):
+                    self.by_name.setdefault(rules[0].string, []).append(
+                        (name, query.match)
+                    )
+                else:
+                    self.every_tag.append((name, query.match))
+                return
+        self.every_element.append((name, query.match))
+
+
+class Plan(object):
+    """A set of named queries that can be run against a parse tree
+    all at once.
+
+    :param queries: Maps a name to a query. A query can be a CSS
+        selector, which finds the same things as `Tag.select`, or an
+        `ElementFilter` (such as a `SoupStrainer`), which finds the
+        same things as passing it into `Tag.find_all`.
+
+        CSS selectors that are too complicated for a `NativeSelector`
+        still work, but each one is run separately, by soupsieve,
+        after the single pass over the tree. So are all the CSS
+        selectors, if the tree is an XML document.
+
+    :raise TypeError: If one of the queries isn't a string or an
+        `ElementFilter`.
+    """
+
+    #: The queries, in the order they were given.
+    queries: Dict[str, _Query]
+
+    _tables: Dict[bool, _DispatchTable]
+
+    def __init__(self, queries: Mapping[str, _Query]):
+        self.queries = dict(queries)
+        for name, query in self.queries.items():
+            if not isinstance(query, (str, ElementFilter)):
+                raise TypeError(
+                    "Query %r is a %s, not a CSS selector or an ElementFilter."
+                    % (name, type(query).__name__)
+                )
+        self._tables = {}
+
+    def _table(self, native: bool) -> _DispatchTable:
+        """Get the `_DispatchTable` to use, depending on whether or not
+        CSS selectors can be run by a `NativeSelector`.
+        """
+        table = self._tables.get(native)
+        if table is None:
+            table = self._tables[native] = _DispatchTable(self.queries, native)
+        return table
+
+    def run(self, tag: Tag) -> Dict[str, ResultSet[PageElement]]:
+        """Run every query against the descendants of ``tag``.
+
+        :return: A dictionary mapping the name of each query to a
+            `ResultSet` of the elements it matched, in document order.
+        """
+        results: Dict[str, ResultSet[PageElement]] = {}
+        for name, query in self.queries.items():
+            source = query if isinstance(query, ElementFilter) else None
+            results[name] = ResultSet(source)
+
+        table = self._table(tag.css._native_selectors_work())
+        by_name = table.by_name
+        every_tag = table.every_tag
+        every_element = table.every_element
+        for element in tag.descendants:
+            for name, element_matcher in every_element:
+                if element_matcher(element):
+                    results[name].append(element)
+            if not isinstance(element, Tag):
+                continue
+            tag_name = element.name
+            interested = by_name.get(tag_name)
+            if interested is not None:
+                for name, matcher in interested:
+                    if matcher(element):
+                        results[name].append(element)
+            if not tag_name.islower():
+                # CSS type selectors are case-insensitive, so a tag
+                # called "P" needs to be checked against "p" selectors.
+                lowercase_name = _lower(tag_name)
+                if lowercase_name != tag_name:
+                    for name, matcher in by_name.get(lowercase_name, ()):
+                        if matcher(element):
+                            results[name].append(element)
+            for name, matcher in every_tag:
+                if matcher(element):
+                    results[name].append(element)
+
+        for name, selector in table.separate.items():
+            results[name].extend(tag.select(selector))
+        return results
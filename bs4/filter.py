@@ -6,9 +6,11 @@ from typing import (
     Callable,
     cast,
     Dict,
+    Hashable,
     Iterator,
     Iterable,
     List,
+    Mapping,
     Optional,
     Sequence,
     Tuple,
@@ -30,6 +32,7 @@ from bs4._typing import (
     _AttributeValue,
     _OneElement,
     _PageElementMatchFunction,
+    _ParseOnly,
     _QueryResults,
     _RawAttributeValues,
     _RegularExpressionProtocol,
@@ -182,6 +185,17 @@ class ElementFilter(object):
         """
         return True
 
+    def _fix_rules(self, fixed: bool) -> None:
+        """Called with True when this `ElementFilter` is about to be
+        used for a parse, and with False when the parse is over. In
+        between, its rules can be assumed not to change, so a subclass
+        that compiles its rules doesn't have to keep checking whether
+        they're still current.
+
+        :meta private:
+        """
+        pass
+
 
 class MatchRule(object):
     """Each MatchRule encapsulates the logic behind a single argument
@@ -195,6 +209,13 @@ class MatchRule(object):
     # ``function``, but the type of the function depends on the
     # subclass.
 
+    #: How many times any `MatchRule` has been modified after it was
+    #: created. A `MatchPlan` compiled before a modification has to
+    #: check whether the modified rule was one of its own.
+    #:
+    #: :meta private:
+    _modifications: int = 0
+
     def __init__(
         self,
         string: Optional[Union[str, bytes]] = None,
@@ -228,6 +249,11 @@ class MatchRule(object):
                 "At most one of string, pattern, function and present must be provided."
             )
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__dict__:
+            MatchRule._modifications += 1
+        object.__setattr__(self, name, value)
+
     def _base_match(self, string: Optional[str]) -> Optional[bool]:
         """Run the 'cheap' portion of a match, trying to get an answer without
         calling a potentially expensive custom function.
@@ -311,6 +337,275 @@ class StringMatchRule(MatchRule):
     function: Optional[_StringMatchFunction]
 
 
+class CompiledRules(object):
+    """A list of `MatchRule` objects, reorganized so they can be
+    checked quickly against a value.
+
+    Exact string matches become a set lookup, regular expressions have
+    their ``search`` methods pre-bound, and functions are only called
+    if none of the cheaper rules match.
+
+    :param rules: The `MatchRule` objects to compile. At least one
+       must match for the value to be considered a match.
+    """
+
+    #: Strings that match exactly.
+    strings: frozenset[str]
+
+    #: The bound ``search`` methods of regular expressions.
+    searches: Tuple[Callable[[str], Any], ...]
+
+    #: Functions to call if nothing else matches.
+    functions: Tuple[Callable[..., Any], ...]
+
+    #: Whether any value other than None is a match.
+    match_present: bool
+
+    #: Whether None (i.e. a missing value) is a match.
+    match_absent: bool
+
+    def __init__(self, rules: Iterable[MatchRule]):
+        strings = set()
+        searches = []
+        functions = []
+        self.match_present = False
+        self.match_absent = False
+        for rule in rules:
+            if rule.present is True:
+                self.match_present = True
+            elif rule.present is False:
+                self.match_absent = True
+            elif rule.string is not None:
+                strings.add(rule.string)
+            elif rule.pattern is not None:
+                searches.append(rule.pattern.search)
+            elif rule.function is not None:
+                functions.append(rule.function)
+        self.strings = frozenset(strings)
+        self.searches = tuple(searches)
+        self.functions = tuple(functions)
+
+    def matches_string(self, string: Optional[str], check_strings: bool = True) -> bool:
+        """Does any of the rules match the given string?
+
+        :param check_strings: If False, the exact string matches are
+            assumed to have been checked already.
+        """
+        if string is None:
+            if self.match_absent:
+                return True
+        else:
+            if self.match_present:
+                return True
+            if check_strings and string in self.strings:
+                return True
+            for search in self.searches:
+                if search(string) is not None:
+                    return True
+        for function in self.functions:
+            if function(string):
+                return True
+        return False
+
+    def matches_attribute_value(self, value: Optional[_AttributeValue]) -> bool:
+        """Does any of the rules match the given attribute value?
+
+        If the value has multiple parts (such as the value of HTML's
+        'class' attribute), a rule can match any one of the parts, or
+        the whole value joined into a single string.
+        """
+        if not isinstance(value, list):
+            return self.matches_string(value)
+        strings = self.strings
+        if strings and not strings.isdisjoint(value):
+            return True
+        for part in value:
+            if self.matches_string(part, check_strings=False):
+                return True
+        if len(value) > 1:
+            return self.matches_string(" ".join(value))
+        return False
+
+
+class MatchPlan(object):
+    """The rules of a `SoupStrainer`, compiled into a form that can be
+    checked quickly against many elements.
+
+    :param strainer: The `SoupStrainer` to compile.
+    """
+
+    #: The rules this plan was compiled from, used to notice when
+    #: rules are added to or removed from the `SoupStrainer`.
+    name_rules: List[TagNameMatchRule]
+    attribute_rules: Dict[str, List[AttributeValueMatchRule]]
+    string_rules: List[StringMatchRule]
+
+    #: The contents of those rules, used to notice when one of them
+    #: is modified in place.
+    snapshot: Tuple[Any, ...]
+
+    #: The value of `MatchRule._modifications` when the snapshot was
+    #: last known to be current.
+    modifications: int
+
+    #: Compiled rules for tag names, or None if there are no name rules.
+    names: Optional[CompiledRules]
+
+    #: Compiled rules for each attribute that has rules.
+    attributes: Tuple[Tuple[str, CompiledRules], ...]
+
+    #: Compiled rules for strings, or None if there are no string rules.
+    strings: Optional[CompiledRules]
+
+    #: Checks a tag's .string against the string rules, or None if
+    #: there are no string rules. This is the `SoupStrainer`'s own
+    #: `SoupStrainer.matches_any_string_rule` if a subclass has
+    #: overridden it.
+    string_matcher: Optional[Callable[[str], bool]]
+
+    def __init__(self, strainer: SoupStrainer):
+        self.name_rules = list(strainer.name_rules)
+        self.attribute_rules = {
+            attr: list(rules) for attr, rules in strainer.attribute_rules.items()
+        }
+        self.string_rules = list(strainer.string_rules)
+        self.snapshot = self._snapshot(strainer)
+        self.modifications = MatchRule._modifications
+
+        self.names = CompiledRules(self.name_rules) if self.name_rules else None
+        self.attributes = tuple(
+            (attr, CompiledRules(rules))
+            for attr, rules in self.attribute_rules.items()
+        )
+        self.strings = CompiledRules(self.string_rules) if self.string_rules else None
+        if self.strings is None:
+            self.string_matcher = None
+        elif (
+            type(strainer).matches_any_string_rule
+            is SoupStrainer.matches_any_string_rule
+        ):
+            self.string_matcher = self.strings.matches_string
+        else:
+            self.string_matcher = strainer.matches_any_string_rule
+
+    @classmethod
+    def _snapshot(cls, strainer: SoupStrainer) -> Tuple[Any, ...]:
+        """Copy everything about a `SoupStrainer`'s rules that affects
+        what they match. The `MatchRule` objects themselves can't be
+        kept, since they might be modified in place.
+        """
+
+        def contents(rules: Iterable[MatchRule]) -> Tuple[Any, ...]:
+            return tuple(
+                (type(rule), rule.string, rule.pattern, rule.function, rule.present)
+                for rule in rules
+            )
+
+        return (
+            contents(strainer.name_rules),
+            tuple(
+                (attr, contents(rules))
+                for attr, rules in strainer.attribute_rules.items()
+            ),
+            contents(strainer.string_rules),
+        )
+
+    def is_current(self, strainer: SoupStrainer) -> bool:
+        """Was this plan compiled from the current rules of the given
+        `SoupStrainer`?
+        """
+        if not (
+            strainer.name_rules == self.name_rules
+            and strainer.attribute_rules == self.attribute_rules
+            and strainer.string_rules == self.string_rules
+        ):
+            return False
+        if self.modifications != MatchRule._modifications:
+            # Some rule has been modified in place since the last
+            # check. It might not be one of this plan's rules.
+            if self._snapshot(strainer) != self.snapshot:
+                return False
+            self.modifications = MatchRule._modifications
+        return True
+
+    def match(self, element: PageElement) -> bool:
+        """The compiled equivalent of `SoupStrainer.match`."""
+        if isinstance(element, Tag):
+            return self.matches_tag(element)
+        if self.names is not None or self.attributes or self.strings is None:
+            # A NavigableString can only match a SoupStrainer that
+            # has string rules and no name or attribute rules.
+            return False
+        return self.strings.matches_string(cast(NavigableString, element))
+
+    def matches_tag(self, tag: Tag) -> bool:
+        """The compiled equivalent of `SoupStrainer.matches_tag`."""
+        names = self.names
+        if names is None:
+            # String rules cannot not match a Tag on their own.
+            if not self.attributes:
+                return False
+        else:
+            # The name must match, either with or without the
+            # namespace prefix. A function rule is passed the Tag
+            # itself and then the prefixed name.
+            name = tag.name
+            if not (names.match_present or name in names.strings):
+                prefix = tag.prefix
+                prefixed_name = f"{prefix}:{name}" if prefix else None
+                if not (
+                    (prefixed_name is not None and prefixed_name in names.strings)
+                    or self._name_matches_search(name, prefixed_name)
+                    or self._name_matches_function(tag, prefixed_name)
+                ):
+                    return False
+
+        if self.attributes:
+            attrs = tag.attrs
+            for attr, rules in self.attributes:
+                if not rules.matches_attribute_value(attrs.get(attr)):
+                    return False
+
+        string_matcher = self.string_matcher
+        if string_matcher is not None:
+            _str = tag.string
+            if _str is None or not string_matcher(_str):
+                return False
+        return True
+
+    def _name_matches_search(self, name: str, prefixed_name: Optional[str]) -> bool:
+        for search in cast(CompiledRules, self.names).searches:
+            if search(name) is not None or (
+                prefixed_name is not None and search(prefixed_name) is not None
+            ):
+                return True
+        return False
+
+    def _name_matches_function(self, tag: Tag, prefixed_name: Optional[str]) -> bool:
+        for function in cast(CompiledRules, self.names).functions:
+            if function(tag) or (prefixed_name is not None and function(prefixed_name)):
+                return True
+        return False
+
+    def allow_tag_creation(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
+    ) -> bool:
+        """The compiled equivalent of `SoupStrainer.allow_tag_creation`."""
+        if self.strings is not None:
+            return False
+        names = self.names
+        if names is not None and not names.matches_string(name):
+            if not nsprefix or not names.matches_string(f"{nsprefix}:{name}"):
+                return False
+        if self.attributes:
+            if attrs is None:
+                attrs = {}
+            for attr, rules in self.attributes:
+                if not rules.matches_attribute_value(attrs.get(attr)):
+                    return False
+        return True
+
+
 class SoupStrainer(ElementFilter):
     """The `ElementFilter` subclass used internally by Beautiful Soup.
 
@@ -390,6 +685,18 @@ class SoupStrainer(ElementFilter):
             List[StringMatchRule], list(self._make_match_rules(string, StringMatchRule))
         )
 
+        #: The compiled form of the rules above; see `SoupStrainer._match_plan`.
+        #:
+        #: :meta private:
+        self._plan: Optional[MatchPlan] = None
+
+        #: Whether the rules are known not to change, so that
+        #: `SoupStrainer._match_plan` doesn't have to check; see
+        #: `ElementFilter._fix_rules`.
+        #:
+        #: :meta private:
+        self._rules_fixed = False
+
         #: DEPRECATED 4.13.0: You shouldn't need to check this under
         #: any name (.string or .text), and if you do, you're probably
         #: not taking into account all of the types of values this
@@ -473,6 +780,22 @@ class SoupStrainer(ElementFilter):
         else:
             yield rule_class(string=str(obj))
 
+    def _match_plan(self) -> MatchPlan:
+        """Get a `MatchPlan` for this `SoupStrainer`'s current rules,
+        compiling one if necessary.
+
+        :meta private:
+        """
+        plan = self._plan
+        if plan is None or not (self._rules_fixed or plan.is_current(self)):
+            plan = self._plan = MatchPlan(self)
+        return plan
+
+    def _fix_rules(self, fixed: bool) -> None:
+        if fixed and self._plan is not None and not self._plan.is_current(self):
+            self._plan = None
+        self._rules_fixed = fixed
+
     def matches_tag(self, tag: Tag) -> bool:
         """Do the rules of this `SoupStrainer` trigger a match against the
         given `Tag`?
@@ -488,95 +811,7 @@ class SoupStrainer(ElementFilter):
         but a `SoupStrainer` that *only* contains `StringMatchRule`
         cannot match a `Tag`, only a `NavigableString`.
         """
-        # String rules cannot not match a Tag on their own.
-        if not self.name_rules and not self.attribute_rules:
-            return False
-
-        # Optimization for a very common case where the user is
-        # searching for a tag with one specific name, and we're
-        # looking at a tag with a different name.
-        if (
-            not tag.prefix
-            and len(self.name_rules) == 1
-            and self.name_rules[0].string is not None
-            and tag.name != self.name_rules[0].string
-        ):
-            return False
-
-        # If there are name rules, at least one must match. It can
-        # match either the Tag object itself or the prefixed name of
-        # the tag.
-        prefixed_name = None
-        if tag.prefix:
-            prefixed_name = f"{tag.prefix}:{tag.name}"
-        if self.name_rules:
-            name_matches = False
-            for rule in self.name_rules:
-                # attrs = " ".join(
-                #     [f"{k}={v}" for k, v in sorted(tag.attrs.items())]
-                # )
-                # print(f"Testing <{tag.name} {attrs}>{tag.string}</{tag.name}> against {rule}")
-                if rule.matches_tag(tag) or (
-                    prefixed_name is not None and rule.matches_string(prefixed_name)
-                ):
-                    name_matches = True
-                    break
-
-            if not name_matches:
-                return False
-
-        # If there are attribute rules for a given attribute, at least
-        # one of them must match. If there are rules for multiple
-        # attributes, each attribute must have at least one match.
-        for attr, rules in self.attribute_rules.items():
-            attr_value = tag.get(attr, None)
-            this_attr_match = self._attribute_match(attr_value, rules)
-            if not this_attr_match:
-                return False
-
-        # If there are string rules, at least one must match.
-        if self.string_rules:
-            _str = tag.string
-            if _str is None:
-                return False
-            if not self.matches_any_string_rule(_str):
-                return False
-        return True
-
-    def _attribute_match(
-        self,
-        attr_value: Optional[_AttributeValue],
-        rules: Iterable[AttributeValueMatchRule],
-    ) -> bool:
-        attr_values: Sequence[Optional[str]]
-        if isinstance(attr_value, list):
-            attr_values = attr_value
-        else:
-            attr_values = [cast(str, attr_value)]
-
-        def _match_attribute_value_helper(attr_values: Sequence[Optional[str]]) -> bool:
-            for rule in rules:
-                for attr_value in attr_values:
-                    if rule.matches_string(attr_value):
-                        return True
-            return False
-
-        this_attr_match = _match_attribute_value_helper(attr_values)
-        if not this_attr_match and len(attr_values) > 1:
-            # This cast converts Optional[str] to plain str.
-            #
-            # We know if there's more than one value, there can't be
-            # any None in the list, because Beautiful Soup never uses
-            # None as a value of a multi-valued attribute, and if None
-            # is passed in as attr_value, it's turned into a list with
-            # a single element (thus len(attr_values) > 1 fails).
-            attr_values = cast(Sequence[str], attr_values)
-
-            # Try again but treat the attribute value
-            # as a single string.
-            joined_attr_value = " ".join(attr_values)
-            this_attr_match = _match_attribute_value_helper([joined_attr_value])
-        return this_attr_match
+        return self._match_plan().matches_tag(tag)
 
     def allow_tag_creation(
         self, nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
@@ -584,40 +819,15 @@ class SoupStrainer(ElementFilter):
         """Based on the name and attributes of a tag, see whether this
         `SoupStrainer` will allow a `Tag` object to even be created.
 
+        A `SoupStrainer` that has string rules can't be used to
+        manage tag creation, because the string rule can't be
+        evaluated until after the tag and all of its contents
+        have been parsed.
+
         :param name: The name of the prospective tag.
         :param attrs: The attributes of the prospective tag.
         """
-        if self.string_rules:
-            # A SoupStrainer that has string rules can't be used to
-            # manage tag creation, because the string rule can't be
-            # evaluated until after the tag and all of its contents
-            # have been parsed.
-            return False
-        prefixed_name = None
-        if nsprefix:
-            prefixed_name = f"{nsprefix}:{name}"
-        if self.name_rules:
-            # At least one name rule must match.
-            name_match = False
-            for rule in self.name_rules:
-                for x in name, prefixed_name:
-                    if x is not None:
-                        if rule.matches_string(x):
-                            name_match = True
-                            break
-            if not name_match:
-                return False
-
-        # For each attribute that has rules, at least one rule must
-        # match.
-        if attrs is None:
-            attrs = AttributeDict()
-        for attr, rules in self.attribute_rules.items():
-            attr_value = attrs.get(attr)
-            if not self._attribute_match(attr_value, rules):
-                return False
-
-        return True
+        return self._match_plan().allow_tag_creation(nsprefix, name, attrs)
 
     def allow_string_creation(self, string: str) -> bool:
         """Based on the content of a markup string, see whether this
@@ -641,12 +851,10 @@ class SoupStrainer(ElementFilter):
         """See whether the content of a string matches any of
         this `SoupStrainer`'s string rules.
         """
-        if not self.string_rules:
+        strings = self._match_plan().strings
+        if strings is None:
             return True
-        for string_rule in self.string_rules:
-            if string_rule.matches_string(string):
-                return True
-        return False
+        return strings.matches_string(string)
 
     def match(self, element: PageElement) -> bool:
         """Does the given `PageElement` match the rules set down by this
@@ -659,14 +867,27 @@ class SoupStrainer(ElementFilter):
         """
         if isinstance(element, Tag):
             return self.matches_tag(element)
-        assert isinstance(element, NavigableString)
-        if not (self.name_rules or self.attribute_rules):
-            # A NavigableString can only match a SoupStrainer that
-            # does not define any name or attribute restrictions.
-            for rule in self.string_rules:
-                if rule.matches_string(element):
-                    return True
-        return False
+        return self._match_plan().match(element)
+
+    def filter(self, generator: Iterator[PageElement]) -> Iterator[_OneElement]:
+        """Acts like Python's built-in `filter`, using
+        `SoupStrainer.match` as the filtering function.
+
+        The rules are compiled into a `MatchPlan` once, at the start
+        of the search, rather than being checked for changes as each
+        element is matched.
+        """
+        cls = type(self)
+        if cls.match is not SoupStrainer.match or (
+            cls.matches_tag is not SoupStrainer.matches_tag
+        ):
+            # A subclass has its own ideas about matching.
+            yield from super(SoupStrainer, self).filter(generator)
+            return
+        match = self._match_plan().match
+        for i in generator:
+            if i and match(i):
+                yield cast("_OneElement", i)
 
     @_deprecated("allow_tag_creation", "4.13.0")
     def search_tag(self, name: str, attrs: Optional[_RawAttributeValues]) -> bool:
@@ -683,6 +904,114 @@ class SoupStrainer(ElementFilter):
         return element if self.match(element) else None
 
 
+class ElementFilterUnion(ElementFilter):
+    """An `ElementFilter` that combines a number of other
+    `ElementFilter` objects, each with its own label. It matches an
+    element, or allows markup to become a `PageElement`, if any one of
+    them would.
+
+    Passing one of these into the ``parse_only`` argument of the
+    `BeautifulSoup` constructor lets a single parse keep several
+    unrelated parts of a document, and
+    `BeautifulSoup.parse_only_results` shows which filter allowed
+    each part to be kept.
+
+    :param filters: A dictionary mapping labels to `ElementFilter`
+        objects, or a sequence of `ElementFilter` objects, in which
+        case each one is labelled with its position in the sequence.
+    """
+
+    #: The filters, keyed by label.
+    filters: Dict[Hashable, ElementFilter]
+
+    def __init__(
+        self,
+        filters: Union[Mapping[Hashable, ElementFilter], Iterable[ElementFilter]],
+    ):
+        super(ElementFilterUnion, self).__init__()
+        if isinstance(filters, Mapping):
+            self.filters = dict(filters)
+        else:
+            self.filters = dict(enumerate(filters))
+        for label, element_filter in self.filters.items():
+            if not isinstance(element_filter, ElementFilter):
+                raise TypeError(
+                    "Filter %r is a %s, not an ElementFilter."
+                    % (label, type(element_filter).__name__)
+                )
+
+    @classmethod
+    def from_parse_only(cls, parse_only: _ParseOnly) -> ElementFilter:
+        """Turn the ``parse_only`` argument to the `BeautifulSoup`
+        constructor into a single `ElementFilter`.
+
+        :meta private:
+        """
+        if isinstance(parse_only, ElementFilter):
+            return parse_only
+        return cls(parse_only)
+
+    def __repr__(self) -> str:
+        return "<%s %r>" % (self.__class__.__name__, self.filters)
+
+    @property
+    def excludes_everything(self) -> bool:
+        """A union excludes everything if each of its filters does."""
+        for element_filter in self.filters.values():
+            if not element_filter.excludes_everything:
+                return False
+        return True
+
+    def match(self, element: PageElement) -> bool:
+        """Does any of the filters match the given `PageElement`?"""
+        for element_filter in self.filters.values():
+            if element_filter.match(element):
+                return True
+        return False
+
+    def allow_tag_creation(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
+    ) -> bool:
+        """Will any of the filters allow this tag to be created?"""
+        for element_filter in self.filters.values():
+            if element_filter.allow_tag_creation(nsprefix, name, attrs):
+                return True
+        return False
+
+    def _fix_rules(self, fixed: bool) -> None:
+        for element_filter in self.filters.values():
+            element_filter._fix_rules(fixed)
+
+    def allow_string_creation(self, string: str) -> bool:
+        """Will any of the filters allow this string to be created?"""
+        for element_filter in self.filters.values():
+            if element_filter.allow_string_creation(string):
+                return True
+        return False
+
+    def labels_allowing_tag(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
+    ) -> List[Hashable]:
+        """Find the labels of all the filters that would allow this
+        tag to be created.
+        """
+        return [
+            label
+            for label, element_filter in self.filters.items()
+            if element_filter.allow_tag_creation(nsprefix, name, attrs)
+        ]
+
+    def labels_allowing_string(self, string: str) -> List[Hashable]:
+        """Find the labels of all the filters that would allow this
+        string to be created.
+        """
+        return [
+            label
+            for label, element_filter in self.filters.items()
+            if element_filter.allow_string_creation(string)
+        ]
+
+
 class SoupReplacer:
     """
     Two styles:
@@ -1,5 +1,16 @@
 from __future__ import annotations
-from typing import Callable, Dict, Iterable, Optional, Set, Tuple, TYPE_CHECKING, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 from typing_extensions import TypeAlias
 from bs4.dammit import EntitySubstitution
 
@@ -63,6 +74,24 @@ class Formatter(EntitySubstitution):
     #: rendered this way.)
     empty_attributes_are_booleans: bool
 
+    #: The methods that decide how a tag's attributes are formatted.
+    _ATTRIBUTE_FORMATTING_METHODS: Tuple[str, ...] = (
+        "attributes",
+        "attribute_value",
+        "substitute",
+        "quoted_attribute_value",
+    )
+
+    #: An object that stands for this formatter's current
+    #: configuration. It's replaced whenever the configuration
+    #: changes, so a `bs4.element.Tag` can tell whether an attribute
+    #: string it formatted earlier can be reused. None means the
+    #: attribute string must be formatted every time, because one of
+    #: `Formatter._ATTRIBUTE_FORMATTING_METHODS` has been overridden.
+    #:
+    #: :meta private:
+    _attribute_token: Optional[object] = None
+
     def _default(
         self, language: str, value: Optional[Set[str]], kwarg: str
     ) -> Set[str]:
@@ -135,6 +164,23 @@ class Formatter(EntitySubstitution):
             indent_str = " "
         self.indent = indent_str
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name != "_attribute_token":
+            super().__setattr__("_attribute_token", self._new_attribute_token())
+
+    def _new_attribute_token(self) -> Optional[object]:
+        """Create a new `Formatter._attribute_token`."""
+        for name in self._ATTRIBUTE_FORMATTING_METHODS:
+            if name in self.__dict__:
+                return None
+            for cls in type(self).__mro__:
+                if name in cls.__dict__:
+                    break
+            if cls not in Formatter.__mro__:
+                return None
+        return object()
+
     def substitute(self, ns: str) -> str:
         """Process a string that needs to undergo entity substitution.
         This may be a string encountered in an attribute value or as
@@ -146,18 +192,54 @@ class Formatter(EntitySubstitution):
         """
         if not self.entity_substitution:
             return ns
-        from .element import NavigableString
-
-        if (
-            isinstance(ns, NavigableString)
-            and ns.parent is not None
-            and ns.parent.name in self.cdata_containing_tags
-        ):
+        if self._in_cdata_containing_tag(ns):
             # Do nothing.
             return ns
         # Substitute.
         return self.entity_substitution(ns)
 
+    def substitute_many(self, strings: Iterable[str]) -> List[str]:
+        """Process a number of strings that need to undergo entity
+        substitution, all at once.
+
+        :param strings: The strings to process.
+        :return: A list of the processed strings, in the same order.
+        """
+        strings = list(strings)
+        entity_substitution = self.entity_substitution
+        if not entity_substitution:
+            return strings
+        if entity_substitution not in _BATCHABLE_SUBSTITUTIONS:
+            # We don't know whether this function can be used with
+            # EntitySubstitution.substitute_many.
+            return [self.substitute(ns) for ns in strings]
+
+        # Substitute all the strings that need it in one call.
+        indexes = [
+            i for i, ns in enumerate(strings) if not self._in_cdata_containing_tag(ns)
+        ]
+        substituted = self.substitute_strings(
+            [strings[i] for i in indexes], entity_substitution
+        )
+        for i, ns in zip(indexes, substituted):
+            strings[i] = ns
+        return strings
+
+    def _in_cdata_containing_tag(self, ns: str) -> bool:
+        """Is this string a `bs4.element.NavigableString` found inside a
+        tag such as <script>, whose contents shouldn't be substituted?
+        """
+        # This is called for every string in a document, so rather
+        # than importing NavigableString (which would create an
+        # import cycle, and is surprisingly slow to do inside a
+        # function), we check for a NavigableString's .parent
+        # attribute. A plain str, like most attribute values, skips
+        # the check entirely.
+        if ns.__class__ is str:
+            return False
+        parent = getattr(ns, "parent", None)
+        return parent is not None and parent.name in self.cdata_containing_tags
+
     def attribute_value(self, value: str) -> str:
         """Process the value of an attribute.
 
@@ -235,6 +317,16 @@ class XMLFormatter(Formatter):
 
 
 # Set up aliases for the default formatters.
+#: Entity substitution functions that are known to work with
+#: `EntitySubstitution.substitute_strings`.
+_BATCHABLE_SUBSTITUTIONS = (
+    EntitySubstitution.substitute_xml,
+    EntitySubstitution.substitute_xml_containing_entities,
+    EntitySubstitution.substitute_html,
+    EntitySubstitution.substitute_html5,
+    EntitySubstitution.substitute_html5_raw,
+)
+
 HTMLFormatter.REGISTRY["html"] = HTMLFormatter(
     entity_substitution=EntitySubstitution.substitute_html
 )
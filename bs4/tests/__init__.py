@@ -16,6 +16,7 @@ from bs4.element import (
     Comment,
     ContentMetaAttributeValue,
     Doctype,
+    NavigableString,
     PageElement,
     PYTHON_SPECIFIC_ENCODINGS,
     Script,
@@ -375,6 +376,87 @@ class TreeBuilderSmokeTest(SoupTest):
         assert isinstance(tag["attr2"], MyCustomAttributeValueList)
 
 
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_incremental_parse(self, chunk_size):
+        # Feeding a document in a piece at a time gives the same
+        # result as parsing it all at once.
+        markup = (
+            '<html><head><title>A title</title></head><body><p class="a b">'
+            "Some &amp; t\N{SNOWMAN}xt</p><pre>\n  kept  </pre><!--comment-->"
+            "</body></html>"
+        )
+        for data in (markup, markup.encode("utf8")):
+            expect = self.soup(data).decode()
+            parser = BeautifulSoup.incremental(builder=self.default_builder)
+            for i in range(0, len(data), chunk_size):
+                parser.feed(data[i : i + chunk_size])
+            soup = parser.close()
+            assert soup is parser.soup
+            assert soup.decode() == expect
+
+    def test_fragment(self):
+        # BeautifulSoup.fragment() gives the same result as the
+        # constructor.
+        for markup in (
+            "Some text",
+            "<p>Some &amp; <b>bold</b> t\N{SNOWMAN}xt",
+            "<?pi data?><!--comment--><a href='x'>link</a>",
+            "\N{BYTE ORDER MARK}<p>text</p>",
+            "",
+        ):
+            expect = self.soup(markup)
+            for soup in (
+                BeautifulSoup.fragment(markup, builder=self.default_builder),
+                BeautifulSoup.fragment(markup, self.default_builder.NAME),
+            ):
+                assert soup.decode() == expect.decode()
+                assert soup.builder.soup is None
+                assert soup.original_encoding is None
+
+    def test_drop_tags(self):
+        # Tags in drop_tags are left out of the tree along with
+        # everything inside them, as though they had been decomposed
+        # after parsing.
+        markup = (
+            "<div><p>a<script>var x = 1;</script>b</p>"
+            "<svg><g><path/><style>x</style></g></svg><p>c<br/>d</p></div>"
+        )
+        drop = ["script", "style", "svg", "br"]
+        expect = self.soup(markup)
+        expect.find_all(drop).decompose()
+        soup = self.soup(markup, drop_tags=drop)
+        assert soup.decode() == expect.decode()
+        assert soup.drop_tags == frozenset(drop)
+        assert soup.find(drop) is None
+        assert ["a", "b", "c", "d"] == list(soup.div.stripped_strings)
+
+    def test_whitespace_nodes_can_be_left_out(self):
+        # With keep_whitespace_nodes=False, the strings that are
+        # nothing but indentation are left out of the tree.
+        markup = (
+            "<doc>\n  <a>1</a>\n  <b> <c>2</c> </b>\n"
+            "  <!-- --><d>3 </d>\n</doc>\n"
+        )
+        expect = self.soup(markup)
+        whitespace = [
+            s
+            for s in expect.find_all(string=True)
+            if type(s) is NavigableString and not s.strip()
+        ]
+        assert len(whitespace) >= 5
+        nodes = len(list(expect.descendants))
+        expect.remove_all(whitespace)
+
+        soup = self.soup(markup, keep_whitespace_nodes=False)
+        assert soup.decode() == expect.decode()
+        assert len(list(soup.descendants)) == nodes - len(whitespace)
+
+        # Other strings are untouched, even comments and strings
+        # with whitespace around them.
+        assert " " == soup.find(string=lambda s: isinstance(s, Comment)).strip("-")
+        assert "3 " == soup.d.string
+
+
 class HTMLTreeBuilderSmokeTest(TreeBuilderSmokeTest):
     """A basic test of a treebuilder's competence.
 
@@ -436,6 +518,29 @@ class HTMLTreeBuilderSmokeTest(TreeBuilderSmokeTest):
         assert loaded.__class__ == BeautifulSoup
         assert loaded.decode() == tree.decode()
 
+    def test_to_bytes_and_from_bytes(self):
+        # A tree turned into bytes and back is identical to the
+        # original, right down to the classes of the strings.
+        markup = (
+            '<html><head><meta charset="utf-8"/><script>if (a < b) {}</script>'
+            '</head><body><!--a comment--><p class="one two" id="x">foo<br/>bar'
+            "</p></body></html>"
+        )
+        tree = self.soup(markup)
+        loaded = BeautifulSoup.from_bytes(tree.to_bytes())
+        assert loaded.__class__ == BeautifulSoup
+        assert loaded.builder.NAME == tree.builder.NAME
+        assert loaded.decode() == tree.decode()
+        assert [type(x) for x in loaded.descendants] == [
+            type(x) for x in tree.descendants
+        ]
+        assert [tag.sourceline for tag in loaded.find_all(True)] == [
+            tag.sourceline for tag in tree.find_all(True)
+        ]
+        assert loaded.p["class"] == ["one", "two"]
+        assert loaded.body.next_element.next_element.name == "p"
+        assert loaded.find(string="bar").previous_sibling.name == "br"
+
     def assertDoctypeHandled(self, doctype_fragment: str) -> None:
         """Assert that a given doctype string is handled correctly."""
         doctype_str, soup = self._document_with_doctype(doctype_fragment)
@@ -543,6 +648,21 @@ class HTMLTreeBuilderSmokeTest(TreeBuilderSmokeTest):
         assert isinstance(warning.message, XMLParsedAsHTMLWarning)
         assert str(warning.message) == XMLParsedAsHTMLWarning.MESSAGE
 
+        # The warning is attributed to the code that created the
+        # BeautifulSoup object, not to Beautiful Soup itself.
+        assert warning.filename == __file__
+
+        # The same is true when the document is parsed a piece at a
+        # time.
+        for data in markup, markup.decode("utf8"):
+            with warnings.catch_warnings(record=True) as w:
+                parser = BeautifulSoup.incremental(builder=self.default_builder)
+                parser.feed(data)
+                parser.close()
+            [warning] = w
+            assert isinstance(warning.message, XMLParsedAsHTMLWarning)
+            assert warning.filename == __file__
+
         # NOTE: the warning is not issued if the document appears to
         # be XHTML (tested with test_real_xhtml_document in the
         # superclass) or if there is no XML declaration (tested with
@@ -652,6 +772,18 @@ Hello, world!
         soup = self.soup("<textarea></textarea>")
         assert soup.textarea.prettify() == "<textarea></textarea>\n"
 
+    def test_whitespace_nodes_kept_in_pre_and_textarea(self):
+        # Even if whitespace nodes are being left out, whitespace
+        # still matters in <pre> and <textarea> tags.
+        soup = self.soup(
+            "<div>\n<pre>  </pre>\n<textarea>  </textarea>\n<p> </p></div>",
+            keep_whitespace_nodes=False,
+        )
+        assert "  " == soup.pre.string
+        assert "  " == soup.textarea.string
+        assert [] == soup.p.contents
+        assert ["pre", "textarea", "p"] == [tag.name for tag in soup.div.contents]
+
     def test_nested_inline_elements(self):
         """Inline elements can be nested indefinitely."""
         b_tag = "<b>Inside a B tag</b>"
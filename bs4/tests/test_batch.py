@@ -0,0 +1,94 @@
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4.batch import parse_many
+from bs4.exceptions import FeatureNotFound
+from bs4.filter import SoupStrainer
+
+from . import SoupTest
+
+
+def title(soup):
+    # The extract function has to be defined at the top level of a
+    # module so it can be sent to the worker processes.
+    return soup.title.string
+
+
+def tag_names(soup):
+    return [tag.name for tag in soup.find_all(True)]
+
+
+class TestParseMany(SoupTest):
+    def documents(self, count):
+        # A generator, so parse_many can't find out how many
+        # documents there are ahead of time.
+        for i in range(count):
+            yield "<html><title>Page %d</title><p>Text</p></html>" % i
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_ordered(self, workers):
+        results = list(
+            parse_many(
+                self.documents(25),
+                "html.parser",
+                extract=title,
+                workers=workers,
+                chunk_size=3,
+            )
+        )
+        assert ["Page %d" % i for i in range(25)] == results
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_unordered(self, workers):
+        results = list(
+            parse_many(
+                self.documents(25),
+                "html.parser",
+                extract=title,
+                workers=workers,
+                ordered=False,
+                chunk_size=4,
+            )
+        )
+        assert 25 == len(results)
+        assert [(i, "Page %d" % i) for i in range(25)] == sorted(results)
+
+    def test_parse_only(self):
+        results = list(
+            parse_many(
+                self.documents(3),
+                "html.parser",
+                parse_only=SoupStrainer("p"),
+                extract=tag_names,
+                workers=1,
+            )
+        )
+        assert [["p"]] * 3 == results
+
+    def test_no_extract_function(self):
+        [soup] = list(parse_many(["<b>bold</b>"], "html.parser", workers=1))
+        assert isinstance(soup, BeautifulSoup)
+        assert "bold" == soup.b.string
+
+    def test_stopping_early(self):
+        # parse_many can be used on a never-ending stream of
+        # documents; it only reads as far ahead as it needs to.
+        consumed = []
+
+        def endless():
+            i = 0
+            while True:
+                consumed.append(i)
+                yield "<title>%d</title>" % i
+                i += 1
+
+        results = parse_many(endless(), "html.parser", extract=title, workers=1, chunk_size=2)
+        assert ["0", "1", "2"] == [next(results) for i in range(3)]
+        results.close()
+        assert len(consumed) < 10
+
+    def test_errors(self):
+        with pytest.raises(FeatureNotFound):
+            list(parse_many(["<b>"], "no-such-parser", workers=1))
+        with pytest.raises(ValueError):
+            list(parse_many(["<b>"], "html.parser", chunk_size=0))
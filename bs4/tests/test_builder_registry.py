@@ -1,6 +1,7 @@
 """Tests of the builder registry."""
 
 import pytest
+import threading
 import warnings
 from typing import Type
 
@@ -8,8 +9,10 @@ from bs4 import BeautifulSoup
 from bs4.builder import (
     builder_registry as registry,
     TreeBuilder,
+    TreeBuilderPool,
     TreeBuilderRegistry,
 )
+from bs4.exceptions import FeatureNotFound
 from bs4.builder._htmlparser import HTMLParserTreeBuilder
 
 from . import (
@@ -60,6 +63,35 @@ class TestBuiltInRegistry(object):
 
         assert registry.lookup("html.parser") == HTMLParserTreeBuilder
 
+    def test_lazily_registered_builders_have_correct_features(self):
+        # The features of the lxml and html5lib builders are
+        # listed in bs4.builder, so that the builders can be registered
+        # without being imported. They must match the features of the
+        # real classes.
+        from bs4.builder import _lazy_treebuilders
+
+        for name, placeholder in _lazy_treebuilders.items():
+            assert placeholder.features == list(placeholder.load().features)
+        assert ("LXMLTreeBuilder" in _lazy_treebuilders) == LXML_PRESENT
+        assert ("HTML5TreeBuilder" in _lazy_treebuilders) == HTML5LIB_PRESENT
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml seems not to be present")
+    def test_lazy_lxml_features_match_real_classes(self):
+        from bs4.builder import _lazy_treebuilders
+
+        for cls in (LXMLTreeBuilder, LXMLTreeBuilderForXML):
+            placeholder = _lazy_treebuilders[cls.__name__]
+            assert placeholder.features == list(cls.features)
+
+    @pytest.mark.skipif(
+        not HTML5LIB_PRESENT, reason="html5lib seems not to be present"
+    )
+    def test_lazy_html5lib_features_match_real_class(self):
+        from bs4.builder import _lazy_treebuilders
+
+        placeholder = _lazy_treebuilders["HTML5TreeBuilder"]
+        assert placeholder.features == list(HTML5TreeBuilder.features)
+
     def test_beautifulsoup_constructor_does_lookup(self):
         with warnings.catch_warnings(record=True):
             # This will create a warning about not explicitly
@@ -137,3 +169,103 @@ class TestRegistry(object):
         self.builder_for_features("foo", "bar")
         self.builder_for_features("foo", "baz")
         assert self.registry.lookup("bar", "baz") is None
+
+    def test_register_lazily(self):
+        self.builder_for_features("html")
+        self.registry.register_lazily(
+            "bs4.builder._htmlparser",
+            "HTMLParserTreeBuilder",
+            ["html.parser", "html", "strict"],
+        )
+        placeholder = self.registry.builders[0]
+        assert placeholder in self.registry.builders_for_feature["html"]
+
+        # The placeholder is replaced with the real class when a lookup
+        # picks it.
+        assert self.registry.lookup("html") is HTMLParserTreeBuilder
+        assert self.registry.builders[0] is HTMLParserTreeBuilder
+        for feature in ("html.parser", "html", "strict"):
+            assert self.registry.builders_for_feature[feature][0] is HTMLParserTreeBuilder
+        assert placeholder not in self.registry.builders
+        assert self.registry.lookup("strict") is HTMLParserTreeBuilder
+
+    def test_register_lazily_module_cannot_be_imported(self):
+        fallback = self.builder_for_features("html")
+        self.registry.register_lazily(
+            "bs4.builder._no_such_module", "NoSuchTreeBuilder", ["html", "fast"]
+        )
+        assert len(self.registry.builders) == 2
+
+        # The builder that can't be imported is removed, and the next
+        # best builder is used instead.
+        assert self.registry.lookup("html") is fallback
+        assert self.registry.builders == [fallback]
+        assert self.registry.builders_for_feature["fast"] == []
+        assert self.registry.lookup("fast") is None
+
+
+class TestTreeBuilderPool(object):
+    def test_idle_builder_is_reused(self):
+        pool = TreeBuilderPool()
+        builder = pool.acquire("html.parser")
+        assert isinstance(builder, HTMLParserTreeBuilder)
+        soup = BeautifulSoup("<p>one</p>", builder=builder)
+        assert soup.builder is builder
+        assert builder.soup is None
+        assert pool.acquire("html.parser") is builder
+
+        soup2 = BeautifulSoup("<p>two</p>", builder=pool.acquire("html.parser"))
+        assert soup2.builder is builder
+        assert "<p>one</p>" == soup.decode()
+        assert "<p>two</p>" == soup2.decode()
+
+        # Different features get different builders.
+        assert pool.acquire("html.parser", "html") is not builder
+
+    def test_busy_builder_is_not_reused(self):
+        pool = TreeBuilderPool()
+        builder = pool.acquire("html.parser")
+        parser = BeautifulSoup.incremental(builder=builder)
+        parser.feed("<p>one")
+
+        other = pool.acquire("html.parser")
+        assert other is not builder
+        assert "<p>two</p>" == BeautifulSoup("<p>two</p>", builder=other).decode()
+
+        parser.feed("</p>")
+        assert "<p>one</p>" == parser.close().decode()
+        assert pool.acquire("html.parser") is builder
+
+    def test_builder_is_released_when_markup_is_rejected(self):
+        class RejectingTreeBuilder(HTMLParserTreeBuilder):
+            features = ["rejecting"]
+
+            def feed(self, markup):
+                raise ValueError("I don't like it.")
+
+        registry = TreeBuilderRegistry()
+        registry.register(RejectingTreeBuilder)
+        pool = TreeBuilderPool(registry)
+        builder = pool.acquire("rejecting")
+        with pytest.raises(ValueError):
+            BeautifulSoup("<p>", builder=builder)
+        assert builder.soup is None
+        assert pool.acquire("rejecting") is builder
+
+    def test_each_thread_gets_its_own_builders(self):
+        pool = TreeBuilderPool()
+        builders = []
+
+        def acquire():
+            builders.append(pool.acquire("html.parser"))
+
+        acquire()
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        thread.join()
+        assert builders[0] is not builders[1]
+        assert pool.acquire("html.parser") is builders[0]
+
+    def test_unknown_feature(self):
+        with pytest.raises(FeatureNotFound):
+            TreeBuilderPool().acquire("no-such-feature")
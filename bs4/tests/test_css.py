@@ -15,6 +15,14 @@ from typing import (
 
 from packaging.version import Version
 
+import bs4.css
+from bs4.css import (
+    CSS,
+    NativeSelector,
+    SelectorCache,
+    SelectorCacheInfo,
+)
+
 from . import (
     SoupTest,
     SOUP_SIEVE_PRESENT,
@@ -534,3 +542,452 @@ class TestCSSSelectors(SoupTest):
         assert m(".foo#bar") == "\\.foo\\#bar"
         assert m("()[]{}") == "\\(\\)\\[\\]\\{\\}"
         assert m(".foo") == self._soup.css.escape(".foo")
+
+
+class FakeSoupSieve:
+    """Stands in for a compiled soupsieve pattern, so the selector
+    cache can be tested without soupsieve installed.
+    """
+
+    def __init__(self, pattern, namespaces, flags):
+        self.pattern = pattern
+        self.namespaces = namespaces
+        self.flags = flags
+
+    def select(self, tag, limit=0):
+        return [tag]
+
+    def iselect(self, tag, limit=0):
+        yield tag
+
+    def select_one(self, tag):
+        return tag
+
+    def closest(self, tag):
+        return tag
+
+    def match(self, tag):
+        return True
+
+    def filter(self, tag):
+        return [tag]
+
+
+class FakeSoupSieveModule:
+    SoupSieve = FakeSoupSieve
+
+    def __init__(self):
+        self.compiled: List[Tuple[Any, Any, int]] = []
+
+    def compile(self, pattern, namespaces=None, flags=0, **kwargs):
+        if isinstance(pattern, FakeSoupSieve):
+            return pattern
+        self.compiled.append((pattern, namespaces, flags))
+        return FakeSoupSieve(pattern, namespaces, flags)
+
+
+class TestSelectorCache:
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        cache = SelectorCache(maxsize=2)
+        monkeypatch.setattr(bs4.css, "selector_cache", cache)
+        monkeypatch.setattr(CSS, "NATIVE_SELECTORS", False)
+        return cache
+
+    def css(self, api, markup="<p>text</p>"):
+        soup = BeautifulSoup(markup, "html.parser")
+        return CSS(soup.p, api=api)
+
+    def test_every_method_uses_the_cache(self, cache):
+        api = FakeSoupSieveModule()
+        css = self.css(api)
+        p = css.tag
+        assert css.select("p") == [p]
+        assert isinstance(css.select("p"), ResultSet)
+        assert list(css.iselect("p")) == [p]
+        assert css.select_one("p") is p
+        assert css.closest("p") is p
+        assert css.match("p") is True
+        assert css.filter("p") == [p]
+        assert css.compile("p").pattern == "p"
+
+        # The selector was only compiled once, with the document's
+        # namespaces.
+        assert api.compiled == [("p", p._namespaces, 0)]
+        assert cache.info() == SelectorCacheInfo(
+            hits=7, misses=1, evictions=0, maxsize=2, currsize=1
+        )
+
+    def test_key(self, cache):
+        api = FakeSoupSieveModule()
+        css = self.css(api)
+        css.select("p")
+        css.select("p", flags=1)
+        css.select("p", namespaces={"a": "http://a/"})
+        assert len(api.compiled) == 3
+
+        # Another soupsieve module gets its own compiled selectors.
+        other_api = FakeSoupSieveModule()
+        self.css(other_api).select("p")
+        assert len(other_api.compiled) == 1
+
+    def test_eviction(self, cache):
+        api = FakeSoupSieveModule()
+        css = self.css(api)
+        css.select("a")
+        css.select("b")
+        css.select("a")
+        css.select("c")
+        assert cache.evictions == 1
+
+        # "b" was the least recently used selector, so it was evicted.
+        css.select("a")
+        assert [x[0] for x in api.compiled] == ["a", "b", "c"]
+        css.select("b")
+        assert [x[0] for x in api.compiled] == ["a", "b", "c", "b"]
+
+    def test_resize_and_clear(self, cache):
+        api = FakeSoupSieveModule()
+        css = self.css(api)
+        css.select("a")
+        css.select("b")
+        cache.resize(1)
+        assert cache.info().currsize == 1
+        assert cache.evictions == 1
+
+        # A cache of size 0 is disabled.
+        cache.resize(0)
+        assert len(cache) == 0
+        css.select("a")
+        css.select("a")
+        assert len(cache) == 0
+        assert [x[0] for x in api.compiled] == ["a", "b", "a", "a"]
+
+        cache.clear()
+        assert cache.info() == SelectorCacheInfo(0, 0, 0, 0, 0)
+
+        with pytest.raises(ValueError):
+            cache.resize(-1)
+        with pytest.raises(ValueError):
+            SelectorCache(-1)
+
+    def test_not_cached(self, cache):
+        api = FakeSoupSieveModule()
+        css = self.css(api)
+
+        # Custom selectors aren't cached.
+        css.select("p", custom={":--x": "p"})
+        css.select("p", custom={":--x": "p"})
+        assert len(api.compiled) == 2
+
+        # Neither is a selector with unhashable namespaces.
+        css.select("p", namespaces={"a": ["unhashable"]})
+        assert len(api.compiled) == 3
+
+        # A precompiled selector is used as-is.
+        compiled = FakeSoupSieve("p", None, 0)
+        assert css.select_one(compiled) is css.tag
+        assert len(api.compiled) == 3
+        assert len(cache) == 0
+
+
+# Selectors from TestCSSSelectors, plus a few more, used to check that
+# a NativeSelector finds exactly what soupsieve finds.
+SELECTOR_CORPUS = [
+    "div",
+    "title",
+    "nonexistenttag",
+    "div div",
+    "html div",
+    "html body div",
+    "body div",
+    "custom-dashed-tag",
+    ".onep",
+    "p.onep",
+    "html p.onep",
+    "div.onep",
+    "div#inner",
+    "#inner",
+    "div div#inner",
+    "#doesnotexist",
+    "div#inner p",
+    "div#main del",
+    "div#main div.oops",
+    "div div#main",
+    ".class1",
+    "p.class2",
+    "html p.class2",
+    "div#inner .class2",
+    ".class1.class3",
+    ".class3.class2",
+    ".class1.class2.class3",
+    ".s1 > a",
+    ".s1 > a span",
+    ".s1 > a#s1a2 span",
+    ".fancy #inner",
+    ".normal #inner",
+    "x, y",
+    "x,y",
+    "x,    y",
+    "x, x",
+    "x, y > z",
+    "div > x, y, z",
+    "div x,y,  z",
+    "body > div > x, y > z",
+    "[rel]",
+    "link[rel]",
+    "a[rel]",
+    "[lang]",
+    "p[class]",
+    "[blah]",
+    "p[blah]",
+    "div[data-tag]",
+    "body > custom-dashed-tag",
+    "*",
+    "* > p",
+    "* > html",
+    "html > body",
+    "div *",
+    "DIV.fancy",
+    "[HREF]",
+    "[ href ]",
+    "body>div>div",
+    "span a, span span",
+    # These need soupsieve.
+    "custom-dashed-tag[id=\"dash2\"]",
+    "div#inner p:nth-of-type(1)",
+    "#p1 + h2",
+    "#p1 ~ h2",
+    "p[lang|=\"en\"]",
+    " div",
+    "div ",
+]
+
+
+class TestNativeSelector:
+    HTML = TestCSSSelectors.HTML
+
+    def test_compile(self):
+        for supported in (
+            "div",
+            "*",
+            "#main",
+            "div.price",
+            "a[href]",
+            "ul > li",
+            "ul li",
+            "h1, h2 > a.x[title]",
+            "-x.--y",
+        ):
+            assert isinstance(NativeSelector.compile(supported), NativeSelector)
+
+        for unsupported in (
+            "",
+            " div",
+            "div ",
+            "a[href=x]",
+            "p:first-child",
+            "h1 + h2",
+            "h1 ~ h2",
+            "ns|p",
+            "#1a",
+            "div,",
+            "div >",
+            "p.\\31",
+            "dîv",
+        ):
+            assert NativeSelector.compile(unsupported) is None
+
+    def test_structure(self):
+        [first, second] = NativeSelector.compile("div > P.a.b[TITLE] #x, *").selectors
+        ((x, x_combinator), (p, p_combinator), (div, div_combinator)) = first
+        assert (x.name, x.ids, x_combinator) == (None, ("x",), " ")
+        assert (p.name, p.classes, p.attributes) == ("p", ("a", "b"), ("title",))
+        assert p_combinator == ">"
+        assert (div.name, div_combinator) == ("div", None)
+        [(universal, combinator)] = second
+        assert (universal.name, combinator) == (None, None)
+
+    def test_methods(self):
+        # These work whether or not soupsieve is installed.
+        soup = BeautifulSoup(self.HTML, "html.parser")
+        css = soup.css
+        assert isinstance(css._compile("p", None, 0, {}), NativeSelector)
+
+        results = soup.select("div#inner > p.class1")
+        assert isinstance(results, ResultSet)
+        assert [x["id"] for x in results] == ["pmulti"]
+        assert [x["id"] for x in soup.select("z", limit=2)] == ["zida", "zidab"]
+        assert soup.select_one("#nosuchid") is None
+        assert soup.select_one("span a")["id"] == "s1a1"
+        assert [x["id"] for x in css.iselect("y z")] == ["zidb"]
+
+        a = soup.find(id="s2a1")
+        assert a.css.match("span a")
+        assert not a.css.match("div > a")
+        assert a.css.closest(".s1")["class"] == ["s1"]
+        assert a.css.closest("a") is a
+        assert a.css.closest("nosuchtag") is None
+        assert [x["id"] for x in soup.find(id="xid").css.filter("z[id]")] == [
+            "zida",
+            "zidab",
+            "zidac",
+        ]
+
+        # The BeautifulSoup object is never matched, and never
+        # treated as a parent.
+        assert not css.match("*")
+        assert css.closest("*") is None
+        assert soup.select("* > html") == []
+        assert [x.name for x in soup.select("* > body")] == ["body"]
+
+    def test_scope(self):
+        # Only tags underneath the starting point are selected, but
+        # their ancestors outside it are still considered.
+        soup = BeautifulSoup(self.HTML, "html.parser")
+        inner = soup.find(id="inner")
+        assert [x["id"] for x in inner.select("div > h2")] == ["header2", "header3"]
+        assert inner.select("#inner") == []
+
+    def test_case_sensitivity(self):
+        soup = BeautifulSoup(
+            '<P ID="a" CLASS="Big"><b Data-X="1"></b></P>', "html.parser"
+        )
+        p = soup.p
+        tag = soup.new_tag("SVG")
+        p.append(tag)
+
+        # Tag and attribute names are case-insensitive; IDs and
+        # classes aren't.
+        assert soup.select("p") == [p]
+        assert soup.select("svg") == [tag]
+        assert soup.select("P#a.Big") == [p]
+        assert soup.select("#A") == []
+        assert soup.select(".big") == []
+        assert soup.select("[DATA-x]") == [soup.b]
+
+    def test_unsplit_class(self):
+        soup = BeautifulSoup(
+            '<p class="a  b">1</p><p class="a">2</p>',
+            "html.parser",
+            multi_valued_attributes=None,
+        )
+        assert soup.p["class"] == "a  b"
+        assert [x.string for x in soup.select(".b")] == ["1"]
+        assert [x.string for x in soup.select("p.a.b")] == ["1"]
+
+        soup.enable_index()
+        assert [x.string for x in soup.select(".b")] == ["1"]
+
+    def test_index(self):
+        soup = BeautifulSoup(self.HTML, "html.parser")
+        tag = soup.new_tag("DIV", id="new")
+        soup.body.append(tag)
+        expected = dict(
+            (selector, soup.select(selector)) for selector in SELECTOR_CORPUS[:59]
+        )
+        soup.enable_index()
+        for selector, results in expected.items():
+            assert soup.select(selector) == results
+
+        # The index is rebuilt when the tree changes.
+        tag["id"] = "newer"
+        assert soup.select("#new") == []
+        assert soup.select("#newer") == [tag]
+
+    def test_index_notices_changes_to_new_attribute_values(self):
+        soup = BeautifulSoup('<p class="a">1</p>', "html.parser")
+        soup.enable_index()
+        p = soup.p
+        p["class"] = ["b"]
+        assert NativeSelector.compile(".b").select(soup) == [p]
+        p["class"].append("z")
+        assert NativeSelector.compile(".z").select(soup) == [p]
+
+    def test_fallback(self, monkeypatch):
+        monkeypatch.setattr(bs4.css, "selector_cache", SelectorCache())
+        api = FakeSoupSieveModule()
+        soup = BeautifulSoup("<p>text</p>", "html.parser")
+        css = CSS(soup, api=api)
+
+        # Simple selectors don't touch soupsieve.
+        assert css.select("p") == [soup.p]
+        assert api.compiled == []
+
+        # Everything else goes to soupsieve.
+        css.select("p:first-child")
+        css.select("p", flags=1)
+        css.select("p", namespaces={"": "http://www.w3.org/1999/xhtml"})
+        css.select("p", custom={":--x": "p"})
+        CSS(soup, api=api).compile("p")
+        assert [x[0] for x in api.compiled] == ["p:first-child", "p", "p", "p", "p"]
+
+        # Including every selector on an XML document.
+        xml_soup = BeautifulSoup("<b>text</b>", "html.parser")
+        xml_soup.known_xml = xml_soup.b.known_xml = True
+        CSS(xml_soup, api=api).select("b")
+        assert api.compiled[-1][0] == "b"
+
+        # And every selector, if native selectors are turned off.
+        monkeypatch.setattr(CSS, "NATIVE_SELECTORS", False)
+        css.select("div")
+        assert api.compiled[-1][0] == "div"
+
+    @pytest.mark.skipif(SOUP_SIEVE_PRESENT, reason="Soup Sieve installed")
+    def test_soupsieve_needed(self):
+        soup = BeautifulSoup("<p>text</p>", "html.parser")
+        with pytest.raises(NotImplementedError):
+            soup.select("p:first-child")
+
+
+@pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+class TestNativeSelectorMatchesSoupsieve:
+    """Make sure a NativeSelector gets exactly the same results as
+    soupsieve.
+    """
+
+    DOCUMENTS = [
+        TestCSSSelectors.HTML,
+        '<P ID="a" CLASS="Big  small"><b Data-X="1" class="">x</b></P><p class>',
+    ]
+
+    def documents(self):
+        from . import HTML5LIB_PRESENT, LXML_PRESENT
+
+        parsers = ["html.parser"]
+        if LXML_PRESENT:
+            parsers.append("lxml")
+        if HTML5LIB_PRESENT:
+            parsers.append("html5lib")
+        for markup in self.DOCUMENTS:
+            for parser in parsers:
+                yield BeautifulSoup(markup, parser)
+                yield BeautifulSoup(markup, parser, multi_valued_attributes=None)
+
+    @pytest.mark.parametrize("selector", SELECTOR_CORPUS)
+    def test_same_results(self, selector, monkeypatch):
+        import soupsieve
+
+        try:
+            compiled = soupsieve.compile(selector)
+        except Exception:
+            # Make sure the error is still raised.
+            soup = BeautifulSoup("", "html.parser")
+            with pytest.raises(Exception):
+                soup.select(selector)
+            return
+        native = NativeSelector.compile(selector)
+        if native is None:
+            return
+
+        for soup in self.documents():
+            assert native.select(soup) == compiled.select(soup)
+            assert soup.select(selector) == compiled.select(soup)
+            for tag in soup.find_all(True):
+                assert native.select(tag) == compiled.select(tag)
+                assert native.select(tag, 1) == compiled.select(tag, 1)
+                assert native.match(tag) == compiled.match(tag)
+                assert native.closest(tag) is compiled.closest(tag)
+                assert native.filter(tag) == compiled.filter(tag)
+            soup.enable_index()
+            assert native.select(soup) == compiled.select(soup)
@@ -338,6 +338,77 @@ class TestEntitySubstitution(object):
         markup = "fjords &sqcups; penguins"
         assert self.sub.substitute_html(data) == markup
 
+    @pytest.mark.parametrize(
+        "data",
+        [
+            # Each of these characters starts a two-character entity
+            # as well as being an entity on its own.
+            "\u2267 \u2267\u0338 \u2267",
+            "<\u20d2 < > >\u20d2",
+            "=\u20e5 = \xf7",
+            "\u2294\ufe00\u2294",
+        ],
+    )
+    def test_multi_character_entities_with_single_character_prefixes(self, data):
+        # The fast path that replaces one character at a time can't be
+        # used on these strings, but the result is the same as it would
+        # be if the strings were handled character by character.
+        assert self.sub.MULTI_CHARACTER_ENTITY_RE.search(data) is not None
+        expect = self.sub.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(
+            self.sub._substitute_html_entity, data
+        )
+        assert self.sub.substitute_html(data) == expect
+
+    def test_translation_table_matches_regular_expression(self):
+        # Every character in the translation tables is turned into the
+        # same entity as it would be by the regular expressions.
+        table = self.sub.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE
+        for codepoint, entity in table.items():
+            character = chr(codepoint)
+            assert self.sub.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(
+                self.sub._substitute_html_entity, character
+            ) == entity
+            if character != "&":
+                assert self.sub.CHARACTER_TO_HTML_ENTITY_TABLE[codepoint] == entity
+        assert ord("&") not in self.sub.CHARACTER_TO_HTML_ENTITY_TABLE
+
+    def test_entity_tables_created_on_demand(self, monkeypatch):
+        # The entity tables aren't created when bs4.dammit is
+        # imported. Simulate that situation.
+        from bs4.dammit import _LazyEntityTable
+
+        for name in (
+            "MULTI_CHARACTER_ENTITY_RE",
+            "CHARACTER_TO_HTML_ENTITY",
+            "HTML_ENTITY_TO_CHARACTER",
+        ):
+            monkeypatch.setattr(EntitySubstitution, name, _LazyEntityTable(name))
+
+        # Using one of the tables creates all of them.
+        assert self.sub.substitute_html("caf\xe9") == "caf&eacute;"
+        assert EntitySubstitution.__dict__["CHARACTER_TO_HTML_ENTITY"]["\xe9"] == "eacute"
+        assert EntitySubstitution.__dict__["HTML_ENTITY_TO_CHARACTER"]["eacute"] == "\xe9"
+
+    def test_substitute_strings(self):
+        values = ["a<b", "", "caf\xe9 & \u2267\u0338", "&amp;", "x"]
+        for substitute in (
+            self.sub.substitute_xml,
+            self.sub.substitute_xml_containing_entities,
+            self.sub.substitute_html,
+            self.sub.substitute_html5,
+            self.sub.substitute_html5_raw,
+        ):
+            assert self.sub.substitute_strings(values, substitute) == [
+                substitute(x) for x in values
+            ]
+        assert self.sub.substitute_strings([], self.sub.substitute_xml) == []
+
+        # A string that contains a null character is handled
+        # separately.
+        assert self.sub.substitute_strings(
+            ["a\x00<", ">"], self.sub.substitute_xml
+        ) == ["a\x00&lt;", "&gt;"]
+
     def test_xml_converstion_includes_no_quotes_if_make_quoted_attribute_is_false(self):
         s = 'Welcome to "my bar"'
         assert self.sub.substitute_xml(s, False) == s
@@ -0,0 +1,128 @@
+import pytest
+import re
+
+from bs4 import BeautifulSoup
+from bs4.css import CSS
+from bs4.element import NavigableString, Tag
+from bs4.extract import Plan
+from bs4.filter import ElementFilter, SoupStrainer
+
+from . import (
+    LXML_PRESENT,
+    SoupTest,
+    SOUP_SIEVE_PRESENT,
+)
+
+
+class TestPlan(SoupTest):
+    HTML = """<html><head><title>Shop</title></head><body>
+<h1 id="top">Products</h1>
+<div class="content product">
+ <span class="price">1.00</span> <a href="/1">One</a>
+ <P CLASS="note">Sale</P>
+</div>
+<div class="content">
+ <span class="price special">2.00</span> <a>Two</a>
+ <span>No price</span>
+</div>
+<p>Sale</p>
+</body></html>"""
+
+    QUERIES = {
+        "title": "h1",
+        "by_id": "#top",
+        "links": "div.content a[href]",
+        "paragraphs": "p",
+        "anything": "*",
+        "list": "h1, span.price",
+        "prices": SoupStrainer("span", class_="price"),
+        "any_name": SoupStrainer(re.compile("^[ah]")),
+        "with_class": SoupStrainer(class_="content"),
+        "strings": SoupStrainer(string="Sale"),
+        "named_strings": SoupStrainer("p", string="Sale"),
+        "everything": SoupStrainer(),
+        "function": ElementFilter(lambda e: isinstance(e, NavigableString)),
+    }
+
+    def sequential(self, tag, queries):
+        results = {}
+        for name, query in queries.items():
+            if isinstance(query, str):
+                results[name] = tag.select(query)
+            else:
+                results[name] = tag.find_all(query)
+        return results
+
+    def assert_same_as_sequential(self, tag, queries):
+        results = Plan(queries).run(tag)
+        assert list(results) == list(queries)
+        expect = self.sequential(tag, queries)
+        for name in queries:
+            assert [id(x) for x in results[name]] == [
+                id(x) for x in expect[name]
+            ], name
+
+    def test_same_as_sequential(self):
+        soup = self.soup(self.HTML)
+        self.assert_same_as_sequential(soup, self.QUERIES)
+
+    def test_run_on_tag(self):
+        soup = self.soup(self.HTML)
+        div = soup.find("div", class_="product")
+        self.assert_same_as_sequential(div, self.QUERIES)
+
+    def test_plan_can_be_reused(self):
+        plan = Plan({"prices": "span.price"})
+        for price in ("1.00", "2.00"):
+            soup = self.soup('<span class="price">%s</span>' % price)
+            assert [x.string for x in plan.run(soup)["prices"]] == [price]
+
+    def test_result_sets(self):
+        strainer = SoupStrainer("h1")
+        results = Plan({"css": "h1", "strainer": strainer}).run(
+            self.soup(self.HTML)
+        )
+        assert results["css"].source is None
+        assert results["strainer"].source is strainer
+
+    def test_uppercase_tag_names(self):
+        # html.parser lowercases tag names, so build one by hand.
+        soup = self.soup("<div></div>")
+        soup.div.append(Tag(name="P"))
+        results = Plan({"css": "p", "strainer": SoupStrainer("P")}).run(soup)
+        assert [x.name for x in results["css"]] == ["P"]
+        assert [x.name for x in results["strainer"]] == ["P"]
+
+    def test_bad_query(self):
+        with pytest.raises(TypeError) as e:
+            Plan({"title": "h1", "bad": 5})
+        assert str(e.value) == (
+            "Query 'bad' is a int, not a CSS selector or an ElementFilter."
+        )
+
+    def test_no_native_selectors(self, monkeypatch):
+        monkeypatch.setattr(CSS, "NATIVE_SELECTORS", False)
+        plan = Plan({"title": "h1"})
+        if SOUP_SIEVE_PRESENT:
+            assert [x.string for x in plan.run(self.soup(self.HTML))["title"]] == [
+                "Products"
+            ]
+        assert plan._table(False).separate == {"title": "h1"}
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_complex_selectors(self):
+        queries = dict(self.QUERIES)
+        queries["child"] = "div > span:first-child"
+        queries["not"] = "span:not(.price)"
+        self.assert_same_as_sequential(self.soup(self.HTML), queries)
+        assert list(Plan(queries)._table(True).separate) == ["child", "not"]
+
+    @pytest.mark.skipif(
+        not (SOUP_SIEVE_PRESENT and LXML_PRESENT),
+        reason="Soup Sieve or lxml not installed",
+    )
+    def test_xml(self):
+        soup = BeautifulSoup("<root><P>Upper</P><p>lower</p></root>", "xml")
+        self.assert_same_as_sequential(
+            soup, {"css": "p", "strainer": SoupStrainer("p")}
+        )
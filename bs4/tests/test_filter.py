@@ -14,6 +14,7 @@ from bs4.element import Tag
 from bs4.filter import (
     AttributeValueMatchRule,
     ElementFilter,
+    ElementFilterUnion,
     MatchRule,
     SoupStrainer,
     StringMatchRule,
@@ -576,6 +577,76 @@ class TestSoupStrainer(SoupTest):
             string=["Wrong string", "Also wrong", re.compile("string")],
         ).matches_tag(tag)
 
+    def test_match_plan_is_reused_until_rules_change(self):
+        strainer = SoupStrainer("b", class_="main")
+        tag = Tag(name="b", attrs={"class": ["main"]})
+        assert strainer.matches_tag(tag)
+        plan = strainer._match_plan()
+        assert strainer.match(tag)
+        assert plan is strainer._match_plan()
+
+        # Modifying the rules in place causes the plan to be recompiled.
+        strainer.attribute_rules["class"][0] = AttributeValueMatchRule("other")
+        assert not strainer.matches_tag(tag)
+        assert plan is not strainer._match_plan()
+
+    def test_match_plan_notices_rule_modified_in_place(self):
+        soup = self.soup("<a>x</a><b>y</b>")
+        strainer = SoupStrainer("a")
+        assert [soup.a] == soup.find_all(strainer)
+        strainer.name_rules[0].string = "b"
+        assert [soup.b] == soup.find_all(strainer)
+        assert not strainer.match(soup.a)
+
+        # The same goes for a SoupStrainer used as parse_only.
+        strainer.name_rules[0].string = "a"
+        assert "<a>x</a>" == self.soup("<a>x</a><b>y</b>", parse_only=strainer).decode()
+        strainer.name_rules[0].string = "b"
+        assert "<b>y</b>" == self.soup("<a>x</a><b>y</b>", parse_only=strainer).decode()
+
+        # Modifying some other rule doesn't make the plan out of date.
+        plan = strainer._match_plan()
+        SoupStrainer("i").name_rules[0].string = "u"
+        assert plan is strainer._match_plan()
+
+    def test_subclass_can_override_matches_tag(self):
+        class OnlyB(SoupStrainer):
+            def matches_tag(self, tag):
+                return tag.name == "b"
+
+        soup = self.soup("<a>x</a><b>y</b>")
+        strainer = OnlyB("a")
+        assert strainer.match(soup.b)
+        assert not strainer.match(soup.a)
+        assert [soup.b] == soup.find_all(strainer)
+
+    def test_subclass_can_override_matches_any_string_rule(self):
+        class OnlyY(SoupStrainer):
+            def matches_any_string_rule(self, string):
+                return string == "y"
+
+        soup = self.soup("<a>x</a><b>y</b>")
+        assert [soup.b] == soup.find_all(OnlyY(["a", "b"], string="x"))
+
+    def test_match_plan_checks_cheap_rules_first(self):
+        # A function rule isn't called if a string rule or regular
+        # expression has already matched.
+        calls = []
+
+        def function(value):
+            calls.append(value)
+            return value == "c"
+
+        strainer = SoupStrainer(id=[function, "1", re.compile("^2")])
+        assert self.tag_matches(strainer, "a", dict(id="1"))
+        assert self.tag_matches(strainer, "a", dict(id="22"))
+        assert [] == calls
+
+        # matches_tag and allow_tag_creation both call the function.
+        assert self.tag_matches(strainer, "a", dict(id="c"))
+        assert not self.tag_matches(strainer, "a", dict(id="d"))
+        assert ["c", "c", "d"] == calls
+
     def test_allowing_tag_implies_allowing_its_contents(self):
         markup = "<a><b>one string<div>another string</div></b></a>"
 
@@ -655,3 +726,108 @@ and they lived at the bottom of a well.</p>
         )
         string_soup = self.soup(html_doc, parse_only=only_short_strings)
         assert "\n\n\nElsie,\nLacie and\nTillie\n...\n" == string_soup.decode()
+
+
+class TestElementFilterUnion(SoupTest):
+    MARKUP = (
+        '<html><head><meta name="author" content="me"><title>T</title></head>'
+        '<body><a href="1">one</a><p>Some <a href="2">two</a></p>text</body>'
+        "</html>"
+    )
+
+    def test_labels(self):
+        union = ElementFilterUnion(
+            {"links": SoupStrainer("a"), "meta": SoupStrainer("meta")}
+        )
+        assert ["links", "meta"] == list(union.filters)
+        assert ["links"] == union.labels_allowing_tag(None, "a", {})
+        assert [] == union.labels_allowing_tag(None, "p", {})
+        assert union.allow_tag_creation(None, "meta", {})
+        assert not union.allow_string_creation("text")
+
+        # A sequence of filters is labelled by position.
+        union = ElementFilterUnion([SoupStrainer("a"), SoupStrainer(string="x")])
+        assert [0, 1] == list(union.filters)
+        assert [1] == union.labels_allowing_string("x")
+
+    def test_match(self):
+        soup = self.soup(self.MARKUP)
+        union = ElementFilterUnion([SoupStrainer("meta"), SoupStrainer(string="two")])
+        assert [soup.meta, soup.find(string="two")] == union.find_all(
+            soup.descendants
+        )
+
+    def test_excludes_everything(self):
+        excluder = SoupStrainer("a", string="b")
+        assert ElementFilterUnion([excluder]).excludes_everything
+        assert ElementFilterUnion([]).excludes_everything
+        assert not ElementFilterUnion([excluder, SoupStrainer("a")]).excludes_everything
+
+    def test_not_an_element_filter(self):
+        with pytest.raises(TypeError) as e:
+            ElementFilterUnion({"links": "a"})
+        assert str(e.value) == "Filter 'links' is a str, not an ElementFilter."
+
+    def test_parse_only(self):
+        soup = self.soup(
+            self.MARKUP,
+            parse_only={
+                "links": SoupStrainer("a"),
+                "meta": SoupStrainer("meta"),
+                "strings": SoupStrainer(string="text"),
+            },
+        )
+        assert isinstance(soup.parse_only, ElementFilterUnion)
+        results = soup.parse_only_results
+        assert ["links", "meta", "strings"] == list(results)
+        assert ['<a href="1">one</a>', '<a href="2">two</a>'] == [
+            x.decode() for x in results["links"]
+        ]
+        assert [soup.meta] == results["meta"]
+        assert ["text"] == results["strings"]
+        assert results["links"].source is soup.parse_only.filters["links"]
+
+    def test_parse_only_nested_results(self):
+        # Once a filter lets in a tag, everything inside the tag is
+        # parsed without consulting the filters, so the results only
+        # contain the outermost elements that were let in.
+        soup = self.soup(
+            self.MARKUP,
+            parse_only={"p": SoupStrainer("p"), "links": SoupStrainer("a")},
+        )
+        assert [soup.p] == soup.parse_only_results["p"]
+        assert [soup.a] == soup.parse_only_results["links"]
+        assert 2 == len(soup.find_all("a"))
+
+    def test_parse_only_sequence(self):
+        soup = self.soup(
+            self.MARKUP, parse_only=[SoupStrainer("a"), SoupStrainer("meta")]
+        )
+        assert (
+            '<meta content="me" name="author"/><a href="1">one</a><a href="2">two</a>'
+            == soup.decode()
+        )
+        assert {0: ["a", "a"], 1: ["meta"]} == {
+            label: [x.name for x in results]
+            for label, results in soup.parse_only_results.items()
+        }
+
+    def test_single_filter_has_no_results(self):
+        soup = self.soup(self.MARKUP, parse_only=SoupStrainer("a"))
+        assert soup.parse_only_results is None
+        assert self.soup(self.MARKUP).parse_only_results is None
+
+    def test_results_are_reset(self):
+        soup = self.soup(self.MARKUP, parse_only=[SoupStrainer("a")])
+        soup.reset()
+        assert {0: []} == soup.parse_only_results
+
+    def test_parse_only_excludes_everything(self):
+        with warnings.catch_warnings(record=True) as w:
+            soup = self.soup(self.MARKUP, parse_only=[SoupStrainer("a", string="b")])
+        assert "" == soup.decode()
+        [warning] = w
+        assert warning.filename == __file__
+        assert str(warning.message).startswith(
+            "The given value for parse_only will exclude everything:"
+        )
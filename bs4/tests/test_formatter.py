@@ -131,6 +131,27 @@ class TestFormatter(SoupTest):
         assert HTMLFormatter.REGISTRY["html5"].substitute(s) == expect_html5
         assert HTMLFormatter.REGISTRY["html5-4.12"].substitute(s) == expect_html
 
+    def test_substitute_many(self):
+        soup = self.soup("<p>a < b</p><script>a < b</script>")
+        strings = ["x & y", soup.p.string, soup.script.string, "caf\xe9"]
+        for formatter in (
+            HTMLFormatter.REGISTRY["html"],
+            HTMLFormatter.REGISTRY["minimal"],
+            HTMLFormatter.REGISTRY[None],
+            HTMLFormatter(entity_substitution=lambda s: s.upper()),
+        ):
+            assert formatter.substitute_many(strings) == [
+                formatter.substitute(s) for s in strings
+            ]
+
+        # The contents of the <script> tag aren't substituted.
+        assert HTMLFormatter.REGISTRY["html"].substitute_many(strings) == [
+            "x &amp; y",
+            "a &lt; b",
+            "a < b",
+            "caf&eacute;",
+        ]
+
     def test_entity_round_trip(self):
         # This is more an explanatory test and a way to avoid regressions than a test of functionality.
 
@@ -3,12 +3,18 @@ trees."""
 
 import pickle
 import pytest
+import re
+import warnings
+from bs4 import BeautifulSoup
 from bs4.builder._htmlparser import (
     _DuplicateAttributeHandler,
+    _Prescanner,
     BeautifulSoupHTMLParser,
     HTMLParserTreeBuilder,
 )
 from bs4.exceptions import ParserRejectedMarkup
+from bs4.builder import XMLParsedAsHTMLWarning
+from bs4.filter import ElementFilter, SoupStrainer
 from typing import Any
 from . import HTMLTreeBuilderSmokeTest
 
@@ -159,3 +165,207 @@ class TestHTMLParserTreeBuilder(HTMLTreeBuilderSmokeTest):
         markup = "<p>a &nosuchentity; b</p>"
         soup = self.soup(markup)
         assert "<p>a &amp;nosuchentity b</p>" == soup.p.decode()
+
+    def test_incremental_parse_is_incremental(self):
+        # The tree is built as the pieces come in, not when the
+        # parser is closed.
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.feed("<p>one</p><p>tw")
+        assert "one" == parser.soup.p.string
+        parser.feed("o</p>")
+        soup = parser.close()
+        assert ["one", "two"] == [p.string for p in soup.find_all("p")]
+
+        # A closed parser can't be fed any more markup.
+        with pytest.raises(ValueError):
+            parser.feed("<p>three</p>")
+
+    def test_incremental_parse_detects_encoding(self):
+        # The encoding of an incrementally parsed bytestring is taken
+        # from the start of the document.
+        markup = (
+            '<html><head><meta charset="windows-1252"></head>'
+            "<body><p>Caf\N{LATIN SMALL LETTER E WITH ACUTE}</p></body></html>"
+        ).encode("windows-1252")
+        parser = BeautifulSoup.incremental("html.parser")
+        for i in range(0, len(markup), 10):
+            parser.feed(markup[i : i + 10])
+        soup = parser.close()
+        assert "windows-1252" == soup.original_encoding
+        assert "windows-1252" == soup.declared_html_encoding
+        assert "Caf\N{LATIN SMALL LETTER E WITH ACUTE}" == soup.p.string
+
+        # The user can specify the encoding instead.
+        parser = BeautifulSoup.incremental("html.parser", from_encoding="utf-8")
+        parser.feed("<p>\N{SNOWMAN}</p>".encode("utf-8"))
+        soup = parser.close()
+        assert "utf-8" == soup.original_encoding
+        assert "\N{SNOWMAN}" == soup.p.string
+
+    def test_drop_tags_with_bad_markup(self):
+        # A dropped tag ends where html.parser would have closed it,
+        # even if its own end tag is missing or out of place.
+        for markup, expect in (
+            ("<div><noscript><b>x</div>y", "<div></div>y"),
+            ("<div><noscript><b>x</noscript>y</div>", "<div>y</div>"),
+            ("<noscript>x</i></b>y</noscript>z", "z"),
+            ("<noscript><noscript>x</noscript>y</noscript>z", "z"),
+            ("<p>a<img src=x>b</p>", "<p>ab</p>"),
+        ):
+            soup = self.soup(markup, drop_tags=["noscript", "img"])
+            assert expect == soup.decode()
+
+        # The same goes for a document that comes in a piece at a time.
+        parser = BeautifulSoup.incremental("html.parser", drop_tags=["script"])
+        for piece in ("<p>a<scr", "ipt>if (a<b) {}</sc", "ript>b</p>"):
+            parser.feed(piece)
+        assert "<p>ab</p>" == parser.close().decode()
+
+
+class TestPrescanner:
+    """Test the _Prescanner, which lets html.parser skip over parts of
+    a document that parse_only would reject anyway.
+    """
+
+    MARKUP = """<!DOCTYPE html>
+<html><head><title>Links</title>
+<script>document.write('<a href="/script">no</a>');</script>
+<style>a { color: red; }</style>
+</head><body>
+<!-- <a href="/comment">no</a> -->
+<div title="<a href='/attribute'>no</a>">
+<p>Some <A HREF="/1">links</A> and <a href="/2">more <a href="/3">nested</a> links</a>.
+<br/><img src=/image.png> <textarea>text</textarea>
+<a href="/4"><br></a></br><br/>
+<meta name="a"></meta><meta name="b"/>
+<a href="/unclosed">and
+</body></html>"""
+
+    def parse(self, markup, parse_only, prescan, **kwargs):
+        old_value = HTMLParserTreeBuilder.PRESCAN_PARSE_ONLY
+        HTMLParserTreeBuilder.PRESCAN_PARSE_ONLY = prescan
+        try:
+            return BeautifulSoup(
+                markup, "html.parser", parse_only=parse_only, **kwargs
+            )
+        finally:
+            HTMLParserTreeBuilder.PRESCAN_PARSE_ONLY = old_value
+
+    def assert_same_result(self, markup, parse_only, **kwargs):
+        expect = self.parse(markup, parse_only, False, **kwargs)
+        soup = self.parse(markup, parse_only, True, **kwargs)
+        assert expect.decode() == soup.decode()
+        assert [(t.name, t.sourceline, t.sourcepos) for t in expect.find_all()] == [
+            (t.name, t.sourceline, t.sourcepos) for t in soup.find_all()
+        ]
+        return soup
+
+    @pytest.mark.parametrize(
+        "parse_only",
+        [
+            SoupStrainer("a"),
+            SoupStrainer(["a", "meta"]),
+            SoupStrainer("br"),
+            SoupStrainer("script"),
+            SoupStrainer("textarea"),
+            SoupStrainer("p"),
+            SoupStrainer("nosuchtag"),
+        ],
+    )
+    def test_same_result(self, parse_only):
+        self.assert_same_result(self.MARKUP, parse_only)
+
+    def test_labelled_filters(self):
+        parse_only = {"links": SoupStrainer("a"), "meta": SoupStrainer("meta")}
+        soup = self.assert_same_result(self.MARKUP, parse_only)
+        assert ["/1", "/2", "/4", "/unclosed"] == [
+            a["href"] for a in soup.parse_only_results["links"]
+        ]
+        assert 2 == len(soup.parse_only_results["meta"])
+
+    @pytest.mark.parametrize(
+        "drop_tags",
+        [["div"], ["p"], ["a"], ["script", "style"], ["textarea", "br"]],
+    )
+    def test_drop_tags(self, drop_tags):
+        # A tag that's being dropped takes everything inside it along
+        # with it, even tags that parse_only would have let in.
+        soup = self.assert_same_result(
+            self.MARKUP, SoupStrainer(["a", "meta"]), drop_tags=drop_tags
+        )
+        if "div" in drop_tags:
+            assert [] == soup.find_all("a")
+
+    def test_uncertain_markup(self):
+        # Different versions of html.parser disagree about these, so
+        # once one shows up, the rest of the document is parsed as
+        # usual.
+        for uncertain in (
+            "<!-- --!> <a>no</a> -->",
+            "<![CDATA[<a>no</a>]]>",
+            "<plaintext><a>no</a>",
+            "<title><a>no</a></title>",
+            "<div a=\"b\" c = '<a>no</a>'>",
+        ):
+            self.assert_same_result(
+                "<a>1</a>%s<a>2</a>" % uncertain, SoupStrainer("a")
+            )
+
+    def test_for_soup(self):
+        def prescanner(parse_only, **kwargs):
+            soup = BeautifulSoup("", "html.parser", parse_only=parse_only, **kwargs)
+            return _Prescanner.for_soup(soup)
+
+        assert {"a", "b"} == prescanner(SoupStrainer(["a", "b"])).names
+        assert {"a", "b"} == prescanner([SoupStrainer("a"), SoupStrainer("b")]).names
+        assert {"a", "b", "script"} == prescanner(
+            SoupStrainer(["a", "b"]), drop_tags=["script"]
+        ).names
+
+        # Only filters that look at nothing but tag names can be used.
+        assert prescanner(None) is None
+        assert prescanner(SoupStrainer("a", href=True)) is None
+        assert prescanner(SoupStrainer(re.compile("a"))) is None
+        assert prescanner(SoupStrainer(string="a")) is None
+        assert prescanner(ElementFilter(lambda x: True)) is None
+        assert prescanner([SoupStrainer("a"), SoupStrainer(id="b")]) is None
+
+    def test_markup_is_skipped(self):
+        # Tags that are going to be rejected never reach the
+        # BeautifulSoup object.
+        class CountingSoup(BeautifulSoup):
+            def handle_starttag(self, name, *args, **kwargs):
+                self.names.append(name)
+                return super(CountingSoup, self).handle_starttag(
+                    name, *args, **kwargs
+                )
+
+        CountingSoup.names = []
+        CountingSoup(self.MARKUP, "html.parser", parse_only=SoupStrainer("meta"))
+        assert ["meta", "meta"] == CountingSoup.names
+
+    def test_prescan_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(HTMLParserTreeBuilder, "PRESCAN_PARSE_ONLY", False)
+        monkeypatch.setattr(_Prescanner, "for_soup", None)
+        soup = BeautifulSoup(self.MARKUP, "html.parser", parse_only=SoupStrainer("a"))
+        assert 4 == len(soup.find_all("a", recursive=False))
+
+    def test_many_empty_element_tags(self):
+        # html.parser keeps track of empty-element tags that might
+        # later get redundant closing tags. This shouldn't slow
+        # things down when there are a lot of them.
+        markup = "<div><img src=x></div>" * 5000
+        soup = self.assert_same_result(markup, SoupStrainer("img"))
+        assert 5000 == len(soup.contents)
+
+    def test_detect_xml_parsed_as_html(self):
+        # The prescanner adds frames to the stack, but the warning is
+        # still attributed to the code that created the BeautifulSoup
+        # object.
+        markup = '<?xml version="1.0" encoding="utf-8"?><tag><a>string</a></tag>'
+        with warnings.catch_warnings(record=True) as w:
+            soup = self.parse(markup, SoupStrainer("a"), True)
+        assert "<a>string</a>" == soup.decode()
+        [warning] = w
+        assert isinstance(warning.message, XMLParsedAsHTMLWarning)
+        assert warning.filename == __file__
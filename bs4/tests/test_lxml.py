@@ -9,6 +9,7 @@ if LXML_PRESENT:
     from bs4.builder._lxml import LXMLTreeBuilder, LXMLTreeBuilderForXML
 
 from bs4 import (
+    BeautifulSoup,
     BeautifulStoneSoup,
 )
 from . import (
@@ -77,6 +78,60 @@ class TestLXMLTreeBuilder(HTMLTreeBuilderSmokeTest):
         assert None is soup.p.sourceline
         assert None is soup.p.sourcepos
 
+    def test_incremental_parse_detects_encoding(self):
+        # When bytestrings of unknown encoding are fed in, the
+        # encoding is guessed from the start of the document, just as
+        # it would be if the whole document were parsed at once.
+        utf8 = ("<p>" + "t\N{SNOWMAN}xt " * 500 + "</p>").encode("utf8")
+        declared = (
+            '<meta charset="windows-1252"><p>caf\N{LATIN SMALL LETTER E WITH ACUTE}</p>'
+        ).encode("windows-1252")
+        for data in (utf8, declared):
+            expect = self.soup(data)
+            parser = BeautifulSoup.incremental(builder=self.default_builder)
+            for i in range(len(data)):
+                parser.feed(data[i : i + 1])
+            soup = parser.close()
+            assert soup.decode() == expect.decode()
+            assert soup.original_encoding == expect.original_encoding
+
+    def test_parser_is_reused(self):
+        # Once an lxml parser has finished with a document, the
+        # builder uses it for the next document with the same encoding.
+        builder = LXMLTreeBuilder()
+        soup = BeautifulSoup("<p>one</p>", builder=builder)
+        parser = builder.parser
+        soup2 = BeautifulSoup("<p>two</p>", builder=builder)
+        assert builder.parser is parser
+        assert "<html><body><p>one</p></body></html>" == soup.decode()
+        assert "<html><body><p>two</p></body></html>" == soup2.decode()
+
+        data = '<meta charset="windows-1252"><p>caf\N{LATIN SMALL LETTER E WITH ACUTE}</p>'
+        soup3 = BeautifulSoup(data.encode("windows-1252"), builder=builder)
+        assert builder.parser is not parser
+        assert "windows-1252" == soup3.original_encoding
+        assert "caf\N{LATIN SMALL LETTER E WITH ACUTE}" == soup3.p.string
+
+        incremental = BeautifulSoup.incremental(builder=builder)
+        incremental.feed("<p>three")
+        assert builder.parser is parser
+        assert "<html><body><p>three</p></body></html>" == incremental.close().decode()
+
+    def test_parser_is_not_reused_after_error(self):
+        class FussyTreeBuilder(LXMLTreeBuilder):
+            def start(self, tag, *args, **kwargs):
+                if tag == "bad":
+                    raise ValueError("I don't like it.")
+                return super(FussyTreeBuilder, self).start(tag, *args, **kwargs)
+
+        builder = FussyTreeBuilder()
+        with pytest.raises(ValueError):
+            BeautifulSoup("<p><bad>", builder=builder)
+        parser = builder.parser
+        soup = BeautifulSoup("<p>good</p>", builder=builder)
+        assert builder.parser is not parser
+        assert "<html><body><p>good</p></body></html>" == soup.decode()
+
 
 @pytest.mark.skipif(
     not LXML_PRESENT,
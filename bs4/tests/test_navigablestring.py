@@ -50,6 +50,19 @@ class TestNavigableString(SoupTest):
         assert "foe" == comment.get_text(strip=True, types=Comment)
         assert "foe " == comment.get_text(types=(Comment, NavigableString))
 
+    def test_compact_layout(self):
+        # A string's linkage is stored in slots, so a freshly parsed
+        # string doesn't carry an instance dictionary around.
+        soup = self.soup("<p>text<!--comment--></p>")
+        string, comment = soup.p.contents
+        assert string.__dict__ == {}
+        assert comment.__dict__ == {}
+        assert soup.p == string.parent
+
+        # But arbitrary attributes can still be set on a string.
+        string.custom_attribute = "value"
+        assert "value" == string.custom_attribute
+
     def test_string_has_immutable_name_property(self):
         # string.name is defined as None and can't be modified
         string = self.soup("s").string
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Tests of Beautiful Soup as a whole."""
 
+import io
 import logging
 import pickle
 import pytest
@@ -10,8 +11,10 @@ from bs4 import (
     BeautifulSoup,
     GuessedAtParserWarning,
     dammit,
+    iterparse,
 )
 from bs4.builder import (
+    HTMLParserTreeBuilder,
     TreeBuilder,
 )
 from bs4.element import (
@@ -28,6 +31,7 @@ from bs4.exceptions import (
 )
 from bs4._warnings import (
     MarkupResemblesLocatorWarning,
+    XMLParsedAsHTMLWarning,
 )
 
 
@@ -242,6 +246,217 @@ class TestConstructor(SoupTest):
             in str(exc_info.value)
         )
 
+    def test_incremental_with_non_incremental_builder(self):
+        # If a TreeBuilder can't parse a document a piece at a time,
+        # the pieces are collected and parsed when the
+        # IncrementalParser is closed.
+        class Builder(HTMLParserTreeBuilder):
+            incremental = False
+
+        parser = BeautifulSoup.incremental(builder=Builder)
+        parser.feed(b"<p>caf\xc3\xa9")
+        assert parser.soup.p is None
+        parser.feed(b"</p>")
+        soup = parser.close()
+        assert "caf\N{LATIN SMALL LETTER E WITH ACUTE}" == soup.p.string
+        assert "utf-8" == soup.original_encoding
+
+        # Closing the parser again does nothing.
+        assert soup is parser.close()
+
+    def test_fragment(self):
+        soup = BeautifulSoup.fragment("<p>one</p>", "html.parser")
+        assert "<p>one</p>" == soup.decode()
+
+        # The TreeBuilder is reused.
+        soup2 = BeautifulSoup.fragment("<p>two</p>", "html.parser")
+        assert soup2.builder is soup.builder
+
+        # Unless the TreeBuilder needs to be configured differently.
+        soup3 = BeautifulSoup.fragment(
+            '<p class="a b">three</p>', "html.parser", multi_valued_attributes=None
+        )
+        assert soup3.builder is not soup.builder
+        assert "a b" == soup3.p["class"]
+
+        # Other arguments work the same way as in the constructor.
+        class TagPlus(Tag):
+            pass
+
+        soup4 = BeautifulSoup.fragment(
+            "<p>four</p><b>five</b>",
+            "html.parser",
+            parse_only=SoupStrainer("b"),
+            element_classes={Tag: TagPlus},
+        )
+        assert "<b>five</b>" == soup4.decode()
+        assert isinstance(soup4.b, TagPlus)
+
+    def test_fragment_issues_no_warnings(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            BeautifulSoup.fragment("http://www.crummy.com/")
+            BeautifulSoup.fragment("index.html")
+            BeautifulSoup.fragment("<p>no parser specified</p>")
+        assert [] == w
+
+    def test_fragment_xml_warning_points_at_caller(self):
+        # A fragment is parsed like any other markup, so an HTML
+        # parser may still notice that it's been given XML.
+        markup = '<?xml version="1.0" encoding="utf-8"?><tag>string</tag>'
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            BeautifulSoup.fragment(markup, "html.parser")
+        [warning] = w
+        assert isinstance(warning.message, XMLParsedAsHTMLWarning)
+        assert warning.filename == __file__
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(from_encoding="utf8"),
+            dict(exclude_encodings=["ascii"]),
+            dict(fromEncoding="utf8"),
+            dict(convertEntities=True),
+            dict(isHTML=True),
+        ],
+    )
+    def test_fragment_rejects_constructor_only_arguments(self, kwargs):
+        [name] = kwargs
+        with pytest.raises(TypeError) as exc_info:
+            BeautifulSoup.fragment("<p>", "html.parser", **kwargs)
+        assert (
+            "BeautifulSoup.fragment() doesn't accept the %r argument. "
+            "Use the BeautifulSoup constructor instead." % name
+        ) == str(exc_info.value)
+
+    def test_fragment_must_be_string(self):
+        with pytest.raises(TypeError) as exc_info:
+            BeautifulSoup.fragment(b"<p>", "html.parser")
+        assert "BeautifulSoup.fragment() can only parse a string, not bytes." == str(
+            exc_info.value
+        )
+
+    def test_whitespace_strings_are_collapsed(self):
+        # A string made of nothing but ASCII whitespace becomes a
+        # single space or newline, unless it's inside a tag like <pre>.
+        # Other kinds of whitespace are left alone.
+        soup = self.soup(
+            "<a> \t </a><a>\r\n  </a><a>\xa0</a><a>\x0b</a><a> x </a><pre> \t </pre>"
+        )
+        assert [" ", "\n", "\xa0", "\x0b", " x ", " \t "] == [
+            tag.string for tag in soup.find_all(["a", "pre"])
+        ]
+
+        # The same goes for a string that comes in several pieces.
+        soup = self.soup("<a>&#32;\n&#9;</a><a>&#32;x</a>")
+        assert ["\n", " x"] == [a.string for a in soup.find_all("a")]
+
+
+class TestIterparse(SoupTest):
+    def document(self, count):
+        return (
+            "<rss><channel><title>Items</title>\n"
+            + "".join(
+                "<item><name>%d</name><sub><item>inner</item></sub></item>\n" % i
+                if i == 1
+                else "<item><name>%d</name></item>\n" % i
+                for i in range(count)
+            )
+            + "</channel></rss>"
+        )
+
+    @pytest.mark.parametrize("chunk_size", [1, 50, 100000])
+    def test_iterparse(self, chunk_size):
+        markup = self.document(20)
+        names = []
+        for tag in iterparse(markup, "item", "html.parser", chunk_size=chunk_size):
+            # While a tag is being yielded, it's still part of the tree.
+            assert tag.parent is not None
+            name = tag.find("name")
+            names.append(name.string if name else tag.string)
+
+            # Earlier records have been removed from the tree.
+            assert tag.parent.index(tag) <= 2
+            channel = tag.parent
+        assert ["0", "inner", "1"] + [str(i) for i in range(2, 20)] == names
+
+        # Once iteration is complete, the records are gone, and the
+        # rest of the tree is still properly linked together.
+        root = channel.parent.parent
+        assert "<rss><channel>\n</channel></rss>" == root.decode()
+        self.linkage_validator(root)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 100000])
+    def test_iterparse_nested_matches(self, chunk_size):
+        # A tag that's inside another tag being yielded is left in
+        # the tree, so the outer tag is complete when it's yielded.
+        markup = "<root><cat n='1'><item>1</item><item>2</item></cat></root>"
+        yielded = [
+            tag.decode()
+            for tag in iterparse(
+                markup, ["item", "cat"], "html.parser", chunk_size=chunk_size
+            )
+        ]
+        assert [
+            "<item>1</item>",
+            "<item>2</item>",
+            '<cat n="1"><item>1</item><item>2</item></cat>',
+        ] == yielded
+
+        markup = "<r><div><div>inner</div>tail</div><div>next</div></r>"
+        yielded = []
+        for tag in iterparse(markup, "div", "html.parser", chunk_size=chunk_size):
+            yielded.append(tag.decode())
+            root = tag.find_parent("r")
+        assert [
+            "<div>inner</div>",
+            "<div><div>inner</div>tail</div>",
+            "<div>next</div>",
+        ] == yielded
+        assert "<r></r>" == root.decode()
+        self.linkage_validator(root.parent)
+
+    def test_iterparse_sources(self):
+        markup = self.document(5)
+        expect = [str(i) for i in range(5)]
+
+        def names(source):
+            return [
+                tag.find("name").string
+                for tag in iterparse(source, ["item"], "html.parser", chunk_size=7)
+                if tag.find("name")
+            ]
+
+        assert expect == names(markup)
+        assert expect == names(markup.encode("utf8"))
+        assert expect == names(io.StringIO(markup))
+        assert expect == names(io.BytesIO(markup.encode("utf8")))
+        assert expect == names([markup[:30], markup[30:]])
+
+    def test_iterparse_tag_removed_by_caller(self):
+        # If the caller removes a yielded tag from the tree, iterparse
+        # doesn't try to do it again.
+        markup = self.document(5)
+        names = []
+        for tag in iterparse(markup, "item", "html.parser", chunk_size=10):
+            names.append(tag.get_text())
+            if len(names) % 2:
+                tag.extract()
+            else:
+                tag.decompose()
+        assert ["0", "inner", "1", "2", "3", "4"] == names
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml seems not to be present")
+    def test_iterparse_lxml_xml(self):
+        markup = self.document(5).encode("utf8")
+        names = [
+            tag.find("name").string
+            for tag in iterparse(io.BytesIO(markup), "item", chunk_size=16)
+            if tag.find("name")
+        ]
+        assert [str(i) for i in range(5)] == names
+
 
 class TestOutput(SoupTest):
     @pytest.mark.parametrize(
@@ -545,6 +760,77 @@ class TestPickle(SoupTest):
         unpickled = pickle.loads(pickled)
         assert "some markup" == unpickled.string
 
+    def test_pickle_stores_tree_not_markup(self):
+        soup = self.soup("<a>some markup</a>")
+        state = soup.__getstate__()
+        assert state["markup"] is None
+        assert BeautifulSoup.from_bytes(state["tree"]).decode() == soup.decode()
+
+    def test_pickle_falls_back_to_markup(self):
+        # A Tag subclass with its own constructor can't be recreated
+        # from the binary format, so the markup is pickled instead.
+        class CustomTag(Tag):
+            def __init__(self, *args, **kwargs):
+                super(CustomTag, self).__init__(*args, **kwargs)
+
+        soup = self.soup("<a>some markup</a>", element_classes={Tag: CustomTag})
+        with pytest.raises(ValueError):
+            soup.to_bytes()
+        state = soup.__getstate__()
+        assert "tree" not in state
+        assert state["markup"] == "<a>some markup</a>"
+
+    def test_unpickle_old_state(self):
+        # State pickled by an older version contains markup rather
+        # than a tree.
+        soup = self.soup("<a>some markup</a>")
+        state = soup.__getstate__()
+        del state["tree"]
+        state["markup"] = soup.decode()
+        unpickled = BeautifulSoup.__new__(BeautifulSoup)
+        unpickled.__setstate__(state)
+        assert "some markup" == unpickled.a.string
+
+
+class TestBinarySerialization(SoupTest):
+    def test_round_trip_preserves_attributes(self):
+        soup = self.soup(
+            '<meta content="text/html; charset=ISO-Latin-1" http-equiv="Content-type"/>'
+            '<p class="a b" data-x="">\N{SNOWMAN}</p>'
+        )
+        loaded = BeautifulSoup.from_bytes(soup.to_bytes())
+        assert loaded.decode() == soup.decode()
+        assert type(loaded.meta["content"]) is type(soup.meta["content"])
+        assert isinstance(loaded.p["class"], AttributeValueList)
+        assert loaded.p["data-x"] == ""
+
+    def test_loaded_tree_can_be_modified(self):
+        soup = self.soup("<div><p>one</p><p>two</p></div>")
+        loaded = BeautifulSoup.from_bytes(soup.to_bytes())
+        loaded.p.extract()
+        loaded.div.append(loaded.new_tag("b", string="three"))
+        assert loaded.decode() == "<div><p>two</p><b>three</b></div>"
+        assert soup.decode() == "<div><p>one</p><p>two</p></div>"
+
+    def test_empty_document(self):
+        soup = self.soup("")
+        loaded = BeautifulSoup.from_bytes(soup.to_bytes())
+        assert loaded.decode() == ""
+        assert loaded.contents == []
+
+    def test_from_bytes_with_builder(self):
+        soup = self.soup("<a>foo</a>")
+        builder = HTMLParserTreeBuilder()
+        loaded = BeautifulSoup.from_bytes(soup.to_bytes(), builder=builder)
+        assert loaded.builder is builder
+
+    def test_garbage_rejected(self):
+        with pytest.raises(ValueError):
+            BeautifulSoup.from_bytes(b"not a parse tree")
+        data = self.soup("<a>foo</a>").to_bytes()
+        with pytest.raises(ValueError):
+            BeautifulSoup.from_bytes(data[: len(data) // 2])
+
 
 class TestEncodingConversion(SoupTest):
     # Test Beautiful Soup's ability to decode and encode from various
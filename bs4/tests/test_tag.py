@@ -1,8 +1,13 @@
+import io
+import pytest
 import warnings
 from bs4.element import (
     Comment,
     NavigableString,
+    Script,
+    Tag,
 )
+from bs4.formatter import HTMLFormatter
 from . import SoupTest
 
 
@@ -30,6 +35,81 @@ class TestTag(SoupTest):
         tag.preserve_whitespace_tags = ["some_other_tag", "a_tag"]
         assert False is tag._should_pretty_print(1)
 
+    def test_compact_layout(self):
+        # A Tag's state is stored in slots, so a freshly parsed tag
+        # doesn't carry an instance dictionary around.
+        soup = self.soup("<p class='a'>text</p>")
+        tag = soup.p
+        assert tag.__dict__ == {}
+
+        # But arbitrary attributes can still be set on a tag.
+        tag.custom_attribute = "value"
+        assert tag.__dict__ == {"custom_attribute": "value"}
+        assert "value" == tag.custom_attribute
+
+        # A copy of a tag gets a value for every slot.
+        copy = tag.__copy__()
+        assert copy == tag
+        assert copy.__dict__ == {}
+
+    def test_tag_descriptor_is_shared(self):
+        # Tags with the same name share a single TagDescriptor, created
+        # by the TreeBuilder.
+        soup = self.soup("<p>one</p><p>two</p><br><script>x</script>")
+        p1, p2 = soup.find_all("p")
+        assert p1._descriptor is p2._descriptor
+        assert p1._descriptor is soup.builder.tag_descriptor("p")
+        assert p1._descriptor is not soup.br._descriptor
+        assert False is p1.can_be_empty_element
+        assert True is soup.br.can_be_empty_element
+        assert soup.script.interesting_string_types == {Script}
+
+        # Modifying one tag's information doesn't affect other tags
+        # with the same name.
+        p1.can_be_empty_element = True
+        assert True is p1.can_be_empty_element
+        assert False is p2.can_be_empty_element
+        assert False is soup.builder.tag_descriptor("p").can_be_empty_element
+
+    def test_tag_descriptor_without_builder_support(self):
+        # A builder that doesn't implement tag_descriptor() still
+        # works; the TagDescriptor is calculated from its
+        # configuration.
+        real_builder = self.default_builder()
+
+        class OldBuilder(object):
+            def __getattr__(self, name):
+                if name == "tag_descriptor":
+                    raise AttributeError(name)
+                return getattr(real_builder, name)
+
+        builder = OldBuilder()
+        br = Tag(builder=builder, name="br")
+        script = Tag(builder=builder, name="script")
+        assert True is br.can_be_empty_element
+        assert False is script.can_be_empty_element
+        assert script.interesting_string_types == {Script}
+        assert script._descriptor is not Tag(builder=builder, name="script")._descriptor
+
+    def test_tag_descriptor_is_reused_until_builder_changes(self):
+        # A builder that's used for several documents keeps its
+        # TagDescriptors, unless its configuration changes in a way
+        # that would affect them.
+        builder = self.default_builder()
+        soup = self.soup("<p>one</p>", builder=builder)
+        soup2 = self.soup("<p>two</p>", builder=builder)
+        assert soup.p._descriptor is soup2.p._descriptor
+
+        builder.empty_element_tags = set(builder.empty_element_tags) | {"p"}
+        soup3 = self.soup("<p>", builder=builder)
+        assert soup3.p._descriptor is not soup.p._descriptor
+        assert True is soup3.p.can_be_empty_element
+
+        builder.string_containers = dict(builder.string_containers, b=Script)
+        soup4 = self.soup("<p><b>four</b>", builder=builder)
+        assert soup4.p._descriptor is not soup3.p._descriptor
+        assert isinstance(soup4.b.string, Script)
+
     def test_len(self):
         """The length of a Tag is its number of children."""
         soup = self.soup("<top>1<b>2</b>3</top>")
@@ -174,6 +254,127 @@ class TestTag(SoupTest):
         assert script.div.script.get_text() == "<!--a comment-->Some text"
         assert list(script.div.script.strings) == ["<!--a comment-->Some text"]
 
+    def test_iter_encode(self):
+        markup = (
+            "<div>"
+            + "<p class='a b'>Sacr\N{LATIN SMALL LETTER E WITH ACUTE} bleu</p>" * 20
+            + "</div>"
+        )
+        soup = self.soup(markup)
+        chunks = list(soup.div.iter_encode(buffer_size=100))
+        assert len(chunks) > 1
+        assert all(len(chunk) >= 100 for chunk in chunks[:-1])
+        assert b"".join(chunks) == soup.div.encode()
+
+        # The same encoder is used for every chunk, so a byte order
+        # mark only shows up once.
+        chunks = list(soup.div.iter_encode("utf-16", buffer_size=10))
+        assert b"".join(chunks) == soup.div.encode("utf-16")
+
+        # Pretty-printing works too.
+        chunks = list(soup.iter_encode(indent_level=0, buffer_size=1))
+        assert b"".join(chunks) == soup.encode(indent_level=0)
+
+    def test_iter_encode_errors(self):
+        soup = self.soup("<p>\N{SNOWMAN}</p>")
+        assert b"".join(soup.p.iter_encode("ascii")) == b"<p>&#9731;</p>"
+        assert b"".join(soup.p.iter_encode("ascii", errors="replace")) == b"<p>?</p>"
+        with pytest.raises(ValueError):
+            list(soup.p.iter_encode(buffer_size=0))
+
+    def test_attribute_string_is_memoized(self):
+        soup = self.soup('<p class="a b" id="x">text</p>')
+        p = soup.p
+        assert p.decode() == '<p class="a b" id="x">text</p>'
+        memo = p._attribute_string
+        assert memo is not None
+        assert p.decode() == '<p class="a b" id="x">text</p>'
+        assert p._attribute_string is memo
+
+        # A different formatter or encoding can't use the memo.
+        assert p.decode(formatter="html5") == '<p class="a b" id="x">text</p>'
+        assert p._attribute_string is not memo
+        p.decode()
+
+        # Any change to the attributes is picked up.
+        p["class"].append("c")
+        assert p.decode() == '<p class="a b c" id="x">text</p>'
+        p["class"].sort(reverse=True)
+        assert p.decode() == '<p class="c b a" id="x">text</p>'
+        p["id"] = "y"
+        assert p.decode() == '<p class="c b a" id="y">text</p>'
+        del p["class"]
+        assert p.decode() == '<p id="y">text</p>'
+        p.attrs = {"lang": "en"}
+        assert p.decode() == '<p lang="en">text</p>'
+        p.name = "div"
+        assert p.decode() == '<div lang="en">text</div>'
+
+    def test_attribute_string_not_memoized_for_plain_list(self):
+        # A plain list can be modified without Beautiful Soup
+        # noticing, so an attribute string that includes one isn't
+        # memoized.
+        soup = self.soup("<p>text</p>")
+        soup.p["class"] = ["a"]
+        assert soup.p.decode() == '<p class="a">text</p>'
+        soup.p["class"].append("b")
+        assert soup.p.decode() == '<p class="a b">text</p>'
+
+    def test_attribute_string_not_memoized_for_plain_dict(self):
+        soup = self.soup("<p>text</p>")
+        p = soup.p
+        p.attrs = {"a": "b"}
+        assert p.decode() == '<p a="b">text</p>'
+        p.attrs["a"] = "c"
+        assert p.decode() == '<p a="c">text</p>'
+
+    def test_attribute_string_shared_between_tags(self):
+        # If two tags share an attribute dictionary, a change made
+        # through either one shows up in both.
+        soup = self.soup("<p a='b'>1</p><p>2</p>")
+        p1, p2 = soup.find_all("p")
+        p2.attrs = p1.attrs
+        assert p1.decode() == '<p a="b">1</p>'
+        assert p2.decode() == '<p a="b">2</p>'
+        p2["a"] = "c"
+        assert p1.decode() == '<p a="c">1</p>'
+        assert p2.decode() == '<p a="c">2</p>'
+
+    def test_attribute_string_memo_tracks_formatter_configuration(self):
+        soup = self.soup('<p title="">text</p>')
+        formatter = HTMLFormatter()
+        assert soup.p.decode(formatter=formatter) == '<p title="">text</p>'
+        formatter.empty_attributes_are_booleans = True
+        assert soup.p.decode(formatter=formatter) == "<p title>text</p>"
+
+        # The memo isn't used at all with a formatter that changes
+        # the way attributes are formatted.
+        class UpperCaseFormatter(HTMLFormatter):
+            def attribute_value(self, value):
+                return value.upper()
+
+        formatter = UpperCaseFormatter()
+        soup.p["title"] = "x"
+        assert soup.p.decode(formatter=formatter) == '<p title="X">text</p>'
+        assert soup.p._attribute_string is None
+
+    def test_write_to(self):
+        soup = self.soup("<div><p>one</p><p>\N{SNOWMAN}</p></div>")
+        fp = io.BytesIO()
+        written = soup.write_to(fp, buffer_size=4)
+        assert fp.getvalue() == soup.encode()
+        assert written == len(soup.encode())
+
+        fp = io.BytesIO()
+        soup.div.write_to(fp, encoding="latin-1", formatter="html")
+        assert fp.getvalue() == soup.div.encode("latin-1", formatter="html")
+
+        # With no encoding, Unicode strings are written.
+        text = io.StringIO()
+        written = soup.write_to(text, encoding=None, indent_level=0)
+        assert text.getvalue() == soup.decode(indent_level=0)
+        assert written == len(text.getvalue())
+
 
 class TestMultiValuedAttributes(SoupTest):
     """Test the behavior of multi-valued attributes like 'class'.
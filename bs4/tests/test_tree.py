@@ -9,6 +9,7 @@ same markup, but all Beautiful Soup trees can be traversed with the
 methods tested here.
 """
 
+import pickle
 import pytest
 import re
 import warnings
@@ -383,6 +384,143 @@ class TestFindAllByAttribute(SoupTest):
         assert [] == soup.find_all(id=1, string="bar")
 
 
+class TestElementIndex(SoupTest):
+    """Test that an ElementIndex gives the same answers as a full
+    scan of the tree, even as the tree changes.
+    """
+
+    def indexed_soup(self, markup):
+        soup = self.soup(markup)
+        soup.enable_index()
+        return soup
+
+    def test_find_all_with_index(self):
+        markup = """<div id="main"><p class="a b">1</p><p class="b">2</p>
+        <a id="x" class="b">3</a><p id="y">4</p></div>"""
+        soup = self.indexed_soup(markup)
+        unindexed = self.soup(markup)
+        for args, kwargs in [
+            (("p",), {}),
+            (("a",), {}),
+            ((), dict(id="x")),
+            ((), dict(class_="b")),
+            ((), dict(class_="a b")),
+            (("p",), dict(class_="b")),
+            (("p",), dict(id="y")),
+            (("p",), dict(string="2")),
+            ((["a", "p"],), {}),
+            ((re.compile("^d"),), {}),
+            ((), dict(id=True)),
+            (("nosuchtag",), {}),
+        ]:
+            expect = [str(x) for x in unindexed.find_all(*args, **kwargs)]
+            assert expect == [str(x) for x in soup.find_all(*args, **kwargs)]
+        assert "2" == soup.find("p", class_="b", string="2").string
+        assert "4" == soup.find(id="y").string
+
+        # The index doesn't change anything about non-recursive searches.
+        assert [soup.div] == soup.find_all("div", recursive=False)
+        assert [] == soup.find_all("p", recursive=False)
+
+    def test_index_is_rebuilt_after_tree_changes(self):
+        soup = self.indexed_soup('<div><p id="1">1</p><p class="c">2</p></div>')
+        assert 2 == len(soup.find_all("p"))
+
+        # Inserting a tag.
+        new_p = soup.new_tag("p", id="3")
+        soup.div.append(new_p)
+        assert [new_p] == soup.find_all(id="3")
+        assert 3 == len(soup.find_all("p"))
+
+        # Removing a tag.
+        soup.find(id="1").extract()
+        assert None is soup.find(id="1")
+        assert 2 == len(soup.find_all("p"))
+
+        # Renaming a tag.
+        new_p.name = "section"
+        assert [new_p] == soup.find_all("section")
+        assert 1 == len(soup.find_all("p"))
+
+        # Changing an attribute.
+        new_p["id"] = "4"
+        assert [] == soup.find_all(id="3")
+        assert [new_p] == soup.find_all(id="4")
+        del new_p["id"]
+        assert [] == soup.find_all(id="4")
+
+        # Changing a multi-valued attribute in place.
+        p = soup.p
+        p["class"].append("d")
+        assert [p] == soup.find_all(class_="d")
+        assert [p] == soup.find_all(class_="c d")
+
+        # Replacing the attributes entirely.
+        p.attrs = {"id": "5"}
+        assert [p] == soup.find_all(id="5")
+        assert [] == soup.find_all(class_="c")
+
+    def test_index_notices_changes_to_new_attribute_values(self):
+        soup = self.indexed_soup('<div><p class="a">1</p></div>')
+        p = soup.p
+        p["class"] = ["b"]
+        assert [p] == soup.find_all(class_="b")
+        p["class"].append("z")
+        assert [p] == soup.find_all(class_="z")
+
+        p.attrs = {"id": "q"}
+        assert [p] == soup.find_all(id="q")
+        p.attrs["id"] = "r"
+        assert [p] == soup.find_all(id="r")
+        assert [] == soup.find_all(id="q")
+
+        # Two tags sharing a dictionary.
+        div = soup.div
+        div.attrs = p.attrs
+        assert [div, p] == soup.find_all(id="r")
+        div["id"] = "s"
+        assert [div, p] == soup.find_all(id="s")
+
+    def test_index_is_only_affected_by_changes_to_its_own_tree(self):
+        soup = self.indexed_soup("<div><p>1</p></div><p>2</p>")
+        soup.div.enable_index()
+        assert 2 == len(soup.find_all("p"))
+        assert 1 == len(soup.div.find_all("p"))
+        other = self.soup("<p>3</p>")
+        other.p["class"] = "x"
+        other.p.extract()
+        assert False is soup._element_index.stale
+        assert False is soup.div._element_index.stale
+
+        # A change outside a tag doesn't affect the tag's index.
+        soup.div.next_sibling.extract()
+        assert True is soup._element_index.stale
+        assert False is soup.div._element_index.stale
+
+    def test_index_not_used_when_matches_tag_is_overridden(self):
+        class OnlyB(SoupStrainer):
+            def matches_tag(self, tag):
+                return tag.name == "b"
+
+        soup = self.indexed_soup("<a>x</a><b>y</b>")
+        assert [soup.b] == soup.find_all(OnlyB("a"))
+
+    def test_index_on_a_tag_covers_only_its_descendants(self):
+        soup = self.soup('<p>outside</p><div><p>inside</p></div>')
+        soup.div.enable_index()
+        assert ["inside"] == [x.string for x in soup.div.find_all("p")]
+        soup.div.disable_index()
+        assert None is soup.div._element_index
+        assert ["inside"] == [x.string for x in soup.div.find_all("p")]
+
+    def test_index_is_not_pickled(self):
+        soup = self.indexed_soup("<p>1</p>")
+        soup.find_all("p")
+        loaded = pickle.loads(pickle.dumps(soup))
+        assert None is loaded._element_index
+        assert 1 == len(loaded.find_all("p"))
+
+
 class TestSmooth(SoupTest):
     """Test Tag.smooth."""
 
@@ -446,6 +584,46 @@ class TestIndex(SoupTest):
         with pytest.raises(ValueError):
             tree.index(1)
 
+    def assert_indexes(self, tag):
+        for i, element in enumerate(tag.contents):
+            assert i == tag.index(element)
+
+    def test_index_after_tree_changes(self):
+        # Tag.index remembers where each child is, and keeps track of
+        # how that changes as the tree is modified.
+        soup = self.soup("<div>" + "<a>1</a><b>2</b><br>text" * 5 + "</div>")
+        div = soup.div
+        self.assert_indexes(div)
+
+        for br in soup.find_all("br"):
+            br.extract()
+        self.assert_indexes(div)
+        assert 15 == len(div.contents)
+
+        div.b.replace_with("new", soup.new_tag("i"))
+        self.assert_indexes(div)
+
+        div.insert(3, div.contents[10])
+        div.append(div.contents[0])
+        div.a.insert_before("before")
+        div.a.insert_after("after")
+        div.find_all("b")[-1].wrap(soup.new_tag("span")).unwrap()
+        self.assert_indexes(div)
+
+        for a in reversed(div.find_all("a")):
+            a.decompose()
+        self.assert_indexes(div)
+        assert 13 == len(div.contents)
+
+        # If .contents is modified directly, the positions Tag.index
+        # remembers are no longer trusted.
+        div.contents.reverse()
+        self.assert_indexes(div)
+        div.contents = div.contents[::2]
+        self.assert_indexes(div)
+        with pytest.raises(ValueError):
+            div.index(soup.new_tag("a"))
+
 
 class TestParentOperations(SoupTest):
     """Test navigation and searching through an element's parents."""
@@ -1359,6 +1537,12 @@ class TestTreeModification(SoupTest):
         # p2 is unaffected.
         assert False is p2.decomposed
 
+        # The decomposed objects no longer hold references to the
+        # rest of the tree.
+        for i in [p1, a, text]:
+            with pytest.raises(AttributeError):
+                object.__getattribute__(i, "next_element")
+
     def test_decompose_string(self):
         soup = self.soup("<div><p>String 1</p><p>String 2</p></p>")
         div = soup.div
@@ -1368,6 +1552,78 @@ class TestTreeModification(SoupTest):
         assert True is text.decomposed
         assert "<div><p></p><p>String 2</p></div>" == div.decode()
 
+    def test_remove_all(self):
+        soup = self.soup(
+            "<div>a<script>1</script><script>2</script>b<p>c<script>3</script></p>"
+            "<script>4</script></div>"
+        )
+        div = soup.div
+        scripts = soup.find_all("script")
+        div.remove_all(scripts)
+        assert "<div>ab<p>c</p></div>" == div.decode()
+
+        # The document was stitched back together around the gaps.
+        a, b = div.contents[0], div.contents[1]
+        assert a.next_element is b and b.previous_element is a
+        assert a.next_sibling is b and b.previous_sibling is a
+        assert div.p.next_sibling is None
+        assert div.p.string.next_element is None
+
+        # The elements are now orphans, just as if each one had been
+        # extracted.
+        for script in scripts:
+            assert script.parent is None
+            assert script.previous_element is None
+            assert script.next_sibling is None
+            assert script.string.next_element is None
+            assert not script.decomposed
+
+    def test_remove_all_decompose(self):
+        soup = self.soup("<div><b>1<i>2</i></b><b>3</b>4</div>")
+        tags = soup.find_all(["b", "i"])
+        soup.div.remove_all(tags, decompose=True)
+        assert "<div>4</div>" == soup.div.decode()
+        for element in tags:
+            assert element.decomposed
+
+    def test_remove_all_nested_elements(self):
+        # An element inside another element that's being removed ends
+        # up on its own, as it would if each one were extracted in
+        # turn.
+        soup = self.soup("<div><p>a<b>b</b>c</p></div>")
+        p, b = soup.p, soup.b
+        soup.remove_all([b, p])
+        assert "<div></div>" == soup.div.decode()
+        assert "<p>ac</p>" == p.decode()
+        assert b.parent is None
+        a, c = p.contents
+        assert a.next_element is c and c.previous_element is a
+        assert c.next_element is None
+
+    def test_remove_all_requires_descendants(self):
+        soup = self.soup("<div><b>1</b></div><p><i>2</i></p>")
+        with pytest.raises(ValueError):
+            soup.div.remove_all([soup.b, soup.i])
+        with pytest.raises(ValueError):
+            soup.div.remove_all([soup.div])
+        # Nothing was removed.
+        assert "<div><b>1</b></div><p><i>2</i></p>" == soup.decode()
+
+    def test_resultset_extract(self):
+        soup = self.soup("<a>1</a><b><a>2</a></b><a>3</a>")
+        links = soup.find_all("a")
+        assert links is links.extract()
+        assert "<b></b>" == soup.decode()
+        assert ["1", "2", "3"] == [a.string for a in links]
+        assert all(a.parent is None for a in links)
+
+    def test_resultset_decompose(self):
+        soup = self.soup("<a>1</a><b><a>2</a></b><a>3</a>")
+        links = soup.find_all("a")
+        links.decompose()
+        assert "<b></b>" == soup.decode()
+        assert all(a.decomposed for a in links)
+
     def test_string_set(self):
         """Tag.string = 'string'"""
         soup = self.soup("<a></a> <b><c></c></b>")